@@ -1,12 +1,28 @@
+# Exports load on first access: importing agno and its model / tool clients takes
+# over a second, and `from agents.registry import get_coordinator` or
+# `from agents.usage import ...` should not pay for it before an analysis runs.
+from importlib import import_module
 
-from .launch_analyst import LaunchAnalyst
-from .sentiment_analyst import SentimentAnalyst
-from .metrics_analyst import MetricsAnalyst
-from .team_coordinator import TeamCoordinator
+_EXPORTS = {
+    "LaunchAnalyst": ".launch_analyst",
+    "SentimentAnalyst": ".sentiment_analyst",
+    "MetricsAnalyst": ".metrics_analyst",
+    "TeamCoordinator": ".team_coordinator",
+    "get_coordinator": ".registry",
+}
 
 __all__ = [
     "LaunchAnalyst",
     "SentimentAnalyst", 
     "MetricsAnalyst",
-    "TeamCoordinator"
-]
\ No newline at end of file
+    "TeamCoordinator",
+    "get_coordinator"
+]
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,143 @@
+# agents/agent_pool.py
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+
+class AgentPool:
+    """Checkout/return pool of analyst instances for a single role
+
+    agno agents keep per-run state, so an instance must only serve one run at a
+    time. The pool builds instances lazily with `factory` up to `size`, hands an
+    idle one to each caller and makes further callers wait in line. Wait-queue
+    metrics are exposed through stats().
+    """
+
+    def __init__(self, factory, size: int = 4):
+        if size < 1:
+            raise ValueError("Agent pool size must be at least 1")
+        self.factory = factory
+        self.size = size
+        self._idle = []
+        self._created = 0
+        self._cond = threading.Condition()
+
+        # Wait-queue metrics
+        self.checkouts = 0
+        self.waits = 0
+        self.waiting = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _take(self):
+        """Claim an idle instance or a free construction slot (caller holds the lock)
+
+        Returns (agent, build): `agent` is an idle instance, or None together with
+        build=True when the caller should construct a new one.
+        """
+        if self._idle:
+            return self._idle.pop(), False
+        if self._created < self.size:
+            self._created += 1
+            return None, True
+        return None, False
+
+    def _build(self):
+        """Construct a new instance for a slot already reserved by _take()"""
+        try:
+            return self.factory()
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+    def _record_wait(self, waited: float):
+        """Update wait metrics for a completed checkout (caller holds the lock)"""
+        self.checkouts += 1
+        if waited > 0:
+            self.waits += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def acquire(self, timeout: float = None):
+        """Check out an instance, blocking up to `timeout` seconds for one to be returned"""
+        start = time.monotonic()
+        with self._cond:
+            agent, build = self._take()
+            waited = agent is None and not build
+            if waited:
+                self.waiting += 1
+                try:
+                    while agent is None and not build:
+                        remaining = None if timeout is None else timeout - (time.monotonic() - start)
+                        if remaining is not None and remaining <= 0:
+                            raise TimeoutError(f"No agent became available within {timeout}s")
+                        self._cond.wait(remaining)
+                        agent, build = self._take()
+                finally:
+                    self.waiting -= 1
+            self._record_wait(time.monotonic() - start if waited else 0.0)
+
+        return self._build() if build else agent
+
+    def release(self, agent):
+        """Return a checked-out instance to the pool"""
+        with self._cond:
+            self._idle.append(agent)
+            self._cond.notify()
+
+    @contextmanager
+    def checkout(self, timeout: float = None):
+        """Context manager that checks an instance out and always returns it"""
+        agent = self.acquire(timeout)
+        try:
+            yield agent
+        finally:
+            self.release(agent)
+
+    @asynccontextmanager
+    async def acheckout(self, timeout: float = None, poll_interval: float = 0.02):
+        """Async checkout that waits on the event loop instead of blocking a thread"""
+        start = time.monotonic()
+        with self._cond:
+            agent, build = self._take()
+            waited = agent is None and not build
+            if waited:
+                self.waiting += 1
+        try:
+            while agent is None and not build:
+                if timeout is not None and time.monotonic() - start >= timeout:
+                    raise TimeoutError(f"No agent became available within {timeout}s")
+                await asyncio.sleep(poll_interval)
+                with self._cond:
+                    agent, build = self._take()
+        finally:
+            with self._cond:
+                if waited:
+                    self.waiting -= 1
+                if agent is not None or build:
+                    self._record_wait(time.monotonic() - start if waited else 0.0)
+
+        if build:
+            agent = self._build()
+        try:
+            yield agent
+        finally:
+            self.release(agent)
+
+    def stats(self) -> dict:
+        """Return pool occupancy and wait-queue metrics"""
+        with self._cond:
+            return {
+                "size": self.size,
+                "created": self._created,
+                "idle": len(self._idle),
+                "in_use": self._created - len(self._idle),
+                "waiting": self.waiting,
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "avg_wait": self.total_wait / self.waits if self.waits else 0.0,
+                "max_wait": self.max_wait,
+            }
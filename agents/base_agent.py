@@ -1,17 +1,84 @@
 # agents/base_agent.py
+import asyncio
+import time
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from agno.agent import Agent
-from agno.models.google import Gemini
-from agno.tools.firecrawl import FirecrawlTools
 from textwrap import dedent
+from models.config import ResiliencePolicy
+from services.metrics import counter, histogram
+from services.response_cache import get_response_cache
+from services.tracing import trace_run
+from .cached_firecrawl import CachedFirecrawlTools
+from .context_budget import ContextBudget
+from .limited_gemini import RateLimitedGemini
+from .resilience import get_circuit_breaker, guarded
+from .usage import record_cached, record_context_saved, record_run, token_counts
+
+# Stream events that carry a chunk of generated answer text (agno 1.x and 2.x names)
+CONTENT_EVENTS = {"RunContent", "RunResponseContent", "RunResponse", "TeamRunContent", "TeamRunResponseContent"}
+# Stream events that close a run and carry its token metrics
+COMPLETED_EVENTS = {"RunCompleted", "TeamRunCompleted"}
+# Stream events agno emits instead of raising when a run fails
+ERROR_EVENTS = {"RunError", "TeamRunError"}
+
+AGENT_RUNS = counter("agent_runs_total", "Analyst runs by outcome (ok, error, cancelled, cached)",
+                     ("agent", "outcome"))
+AGENT_SECONDS = histogram("agent_run_seconds", "Latency of analyst runs that reached the model", ("agent", "tools"))
+AGENT_TOKENS = counter("agent_tokens_total", "Model tokens of analyst and team runs", ("agent", "direction"))
+AGENT_TOOL_CALLS = histogram("agent_tool_calls", "Crawl tool calls per analyst run", ("agent",),
+                             buckets=(0, 1, 2, 3, 5, 8, 13, 21))
+
+def stream_content(events, on_completed=None):
+    """Yield the text chunks from an agno streaming run, skipping tool and lifecycle events
+
+    `on_completed` receives the event that closes the run (it carries the token metrics);
+    agno agents only emit it when run with `stream_events=True`.
+    """
+    for event in events:
+        event_type = getattr(event, "event", None)
+        if isinstance(event, str):
+            chunk = event
+        elif event_type in CONTENT_EVENTS:
+            chunk = getattr(event, "content", None)
+        else:
+            if event_type in ERROR_EVENTS:
+                raise Exception(f"Agent run failed: {getattr(event, 'content', None) or event_type}")
+            if event_type in COMPLETED_EVENTS:
+                record_run(event)
+                if on_completed:
+                    on_completed(event)
+            continue
+        if isinstance(chunk, str) and chunk:
+            yield chunk
+
+def check_run(response, name: str):
+    """Raise if agno reported the run as failed (it returns the error as content instead of raising)"""
+    status = getattr(response, "status", None)
+    if getattr(status, "value", status) == "ERROR":
+        raise Exception(f"{name} run failed: {getattr(response, 'content', None)}")
+    return response
 
 class BaseAgent(ABC):
     """Base class for all specialized agents with common configuration"""
+
+    # Crawled-content token budget per page and per run (CONTEXT_*_TOKENS env vars override)
+    CONTEXT_PAGE_TOKENS = 2000
+    CONTEXT_RUN_TOKENS = 12000
     
-    def __init__(self, google_api_key: str, firecrawl_api_key: str):
+    def __init__(self, google_api_key: str, firecrawl_api_key: str, model_id: str = "gemini-2.5-flash",
+                 policy: ResiliencePolicy = None):
         self.google_api_key = google_api_key
         self.firecrawl_api_key = firecrawl_api_key
+        self.model_id = model_id
+        self.policy = policy or ResiliencePolicy.from_env()
         self.agent = None
+        # Same analyst without tools, for prompts that already carry their research corpus
+        self.corpus_agent = None
+        # Whether the last analyze*() call was answered from the response cache
+        self.served_from_cache = False
+        self.context_budget = ContextBudget.from_env(self.CONTEXT_PAGE_TOKENS, self.CONTEXT_RUN_TOKENS)
+        self.response_cache = get_response_cache()
         self._initialize_agent()
     
     @abstractmethod
@@ -27,11 +94,20 @@ class BaseAgent(ABC):
     def _initialize_agent(self):
         """Initialize the agent with common configuration"""
         try:
+            self.crawl_tools = CachedFirecrawlTools(api_key=self.firecrawl_api_key, budget=self.context_budget)
             self.agent = Agent(
                 name=self.get_agent_name(),
                 description=dedent(self.get_agent_description()),
-                model=Gemini(id="gemini-2.5-flash"),
-                tools=[FirecrawlTools(api_key=self.firecrawl_api_key)],
+                model=RateLimitedGemini(id=self.model_id, api_key=self.google_api_key),
+                tools=[self.crawl_tools],
+                markdown=True,
+                exponential_backoff=True,
+                delay_between_retries=2,
+            )
+            self.corpus_agent = Agent(
+                name=self.get_agent_name(),
+                description=dedent(self.get_agent_description()),
+                model=RateLimitedGemini(id=self.model_id, api_key=self.google_api_key),
                 markdown=True,
                 exponential_backoff=True,
                 delay_between_retries=2,
@@ -43,9 +119,156 @@ class BaseAgent(ABC):
         """Check if agent is properly initialized"""
         return self.agent is not None
     
-    def analyze(self, prompt: str):
-        """Execute analysis with the agent"""
+    def _run_agent(self, use_tools: bool = True) -> Agent:
+        """The agno agent for a run: with crawl tools, or the tool-less corpus agent"""
+        return self.agent if use_tools else self.corpus_agent
+
+    def _cache_key(self, prompt: str, use_tools: bool = True) -> str:
+        """Response cache key for `prompt` under this agent's current configuration"""
+        if use_tools:
+            tool_config = ",".join(
+                f"{getattr(tool, 'name', type(tool).__name__)}:{','.join(sorted(getattr(tool, 'functions', {})))}"
+                for tool in self.agent.tools or []
+            ) + f";{self.context_budget.describe()}"
+        else:
+            tool_config = "none"
+        return self.response_cache.make_key(
+            self.get_agent_name(), self.model_id, self.get_agent_description(), tool_config, prompt
+        )
+
+    def _start_run(self, force_refresh: bool = False):
+        """Reset per-run state: context budget, crawl counters, and page revalidation on forced refreshes"""
+        self.served_from_cache = False
+        self.context_budget.reset()
+        self.crawl_tools.reset_crawl_stats()
+        self.crawl_tools.revalidate = force_refresh
+
+    def _trace(self, use_tools: bool):
+        """Tracing span around one model run of this analyst"""
+        return trace_run("agent.run", agent=self.get_agent_name(), model=self.model_id, tools=use_tools)
+
+    def _record_tokens(self, span, response):
+        """Token counts of a finished run, on its span and in the metrics"""
+        input_tokens, output_tokens = token_counts(response)
+        span.set(input_tokens=input_tokens, output_tokens=output_tokens)
+        AGENT_TOKENS.inc(input_tokens, agent=self.get_agent_name(), direction="input")
+        AGENT_TOKENS.inc(output_tokens, agent=self.get_agent_name(), direction="output")
+
+    @contextmanager
+    def _metered(self, use_tools: bool):
+        """Latency, outcome and tool calls of one model run in the metrics"""
+        name = self.get_agent_name()
+        start = time.perf_counter()
+        try:
+            yield
+        except GeneratorExit:
+            AGENT_RUNS.inc(agent=name, outcome="cancelled")
+            raise
+        except Exception:
+            AGENT_RUNS.inc(agent=name, outcome="error")
+            raise
+        AGENT_SECONDS.observe(time.perf_counter() - start, agent=name, tools=str(use_tools).lower())
+        AGENT_RUNS.inc(agent=name, outcome="ok")
+        AGENT_TOOL_CALLS.observe(self.crawl_tools.crawl_stats()["calls"] if use_tools else 0, agent=name)
+
+    def _from_cache(self, key: str):
+        """The cached answer for `key`, counted as a cached run; None on a miss"""
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            record_cached()
+            AGENT_RUNS.inc(agent=self.get_agent_name(), outcome="cached")
+            self.served_from_cache = True
+        return cached
+
+    def _guarded(self):
+        """Fail fast while Gemini is degraded for this key; run outcomes feed the shared breaker"""
+        return guarded(get_circuit_breaker("gemini", self.google_api_key), self.policy)
+
+    def _store_response(self, key: str, response):
+        """Cache the final text of a successful run"""
+        content = response if isinstance(response, str) else getattr(response, "content", None)
+        if isinstance(content, str) and content:
+            self.response_cache.set(key, content, agent_name=self.get_agent_name(), model_id=self.model_id)
+
+    def analyze(self, prompt: str, force_refresh: bool = False, use_tools: bool = True):
+        """Execute analysis with the agent
+
+        Answers are served from the response cache when possible; pass
+        `force_refresh=True` to bypass it and overwrite the cached entry.
+        With `use_tools=False` the analyst answers from the prompt alone
+        (e.g. a research corpus) and makes no crawl calls.
+        """
+        if not self.is_ready():
+            raise ValueError(f"{self.get_agent_name()} is not initialized")
+
+        key = self._cache_key(prompt, use_tools)
+        if not force_refresh:
+            cached = self._from_cache(key)
+            if cached is not None:
+                return cached
+
+        self._start_run(force_refresh)
+        with self._trace(use_tools) as span, self._metered(use_tools), self._guarded():
+            response = check_run(self._run_agent(use_tools).run(prompt), self.get_agent_name())
+            self._record_tokens(span, response)
+        record_run(response)
+        record_context_saved(self.context_budget.tokens_saved)
+        self._store_response(key, response)
+        return response
+    
+    def analyze_stream(self, prompt: str, force_refresh: bool = False, use_tools: bool = True):
+        """Execute analysis and yield content chunks as the model generates them
+
+        A cached answer is yielded as a single chunk; a completed stream is
+        cached like a regular run.
+        """
         if not self.is_ready():
             raise ValueError(f"{self.get_agent_name()} is not initialized")
-        
-        return self.agent.run(prompt)
\ No newline at end of file
+
+        key = self._cache_key(prompt, use_tools)
+        if not force_refresh:
+            cached = self._from_cache(key)
+            if cached is not None:
+                yield cached
+                return
+
+        self._start_run(force_refresh)
+        chunks = []
+        with self._trace(use_tools) as span, self._metered(use_tools), self._guarded():
+            # Agents only emit RunCompleted (and its token metrics) when lifecycle events are streamed
+            events = self._run_agent(use_tools).run(prompt, stream=True, stream_events=True)
+            for chunk in stream_content(events, on_completed=lambda event: self._record_tokens(span, event)):
+                chunks.append(chunk)
+                yield chunk
+            span.set(output_chars=sum(len(chunk) for chunk in chunks))
+        record_context_saved(self.context_budget.tokens_saved)
+        self._store_response(key, "".join(chunks))
+    
+    async def aanalyze(self, prompt: str, timeout: float = None, force_refresh: bool = False,
+                       use_tools: bool = True):
+        """Execute analysis with the agent's native async run
+
+        `timeout` is a per-call deadline in seconds; cancelling the awaiting task
+        cancels the underlying model and tool calls as well.
+        """
+        if not self.is_ready():
+            raise ValueError(f"{self.get_agent_name()} is not initialized")
+
+        key = self._cache_key(prompt, use_tools)
+        if not force_refresh:
+            cached = self._from_cache(key)
+            if cached is not None:
+                return cached
+
+        self._start_run(force_refresh)
+        with self._trace(use_tools) as span, self._metered(use_tools), self._guarded():
+            try:
+                response = await asyncio.wait_for(self._run_agent(use_tools).arun(prompt), timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"{self.get_agent_name()} did not respond within {timeout}s")
+            check_run(response, self.get_agent_name())
+            self._record_tokens(span, response)
+        record_run(response)
+        record_context_saved(self.context_budget.tokens_saved)
+        self._store_response(key, response)
+        return response
@@ -0,0 +1,195 @@
+# agents/cached_firecrawl.py
+import json
+import threading
+from datetime import datetime
+from typing import Optional
+from agno.tools.firecrawl import FirecrawlTools
+from models.config import ResiliencePolicy
+from services.crawl_cache import CrawlCache, get_crawl_cache
+from services.metrics import counter
+from services.page_fingerprints import FingerprintStore, content_hash, get_fingerprint_store, response_validators
+from services.tracing import annotate, span
+from .context_budget import ContextBudget, estimate_tokens, page_text
+from .rate_limiter import get_rate_limiter
+from .resilience import get_circuit_breaker, guarded
+
+FIRECRAWL_FETCHED_BYTES = counter("firecrawl_fetched_bytes_total", "Bytes of content fetched from Firecrawl")
+
+class CachedFirecrawlTools(FirecrawlTools):
+    """FirecrawlTools backed by the shared on-disk crawl cache
+
+    Scrape, crawl, map and search results are keyed on the normalized URL or
+    query, so repeat runs and other agents asking for the same page are served
+    locally without spending crawl quota. Failed calls are never cached, and
+    cache misses go through the shared Firecrawl rate limiter and circuit breaker.
+    With a `budget`, raw results are cached but the agent only sees the
+    trimmed page text that fits its context budget.
+
+    Scraped pages are refreshed incrementally: once a cached page expires (or
+    `revalidate` is set for a forced refresh), its fingerprint decides whether
+    the site is asked for changes or Firecrawl re-fetches it, and unchanged
+    pages are served from the digest of the previous crawl.
+
+    crawl_stats() reports the crawl volume since reset_crawl_stats(): tool
+    calls, the ones Firecrawl actually served, and tokens of content returned.
+    """
+
+    def __init__(self, cache: CrawlCache = None, search_ttl: float = 6 * 3600,
+                 budget: ContextBudget = None, fingerprints: FingerprintStore = None, **kwargs):
+        self.cache = cache or get_crawl_cache()
+        self.search_ttl = search_ttl
+        self.budget = budget
+        self.fingerprints = fingerprints or get_fingerprint_store()
+        # Set per run by the owning agent: revalidate cached pages instead of trusting their TTL
+        self.revalidate = False
+        self.policy = ResiliencePolicy.from_env()
+        self._stats_lock = threading.Lock()
+        self.reset_crawl_stats()
+        super().__init__(**kwargs)
+
+    def reset_crawl_stats(self):
+        with self._stats_lock:
+            self._crawl_stats = {"calls": 0, "fetches": 0, "tokens": 0}
+
+    def crawl_stats(self) -> dict:
+        """Tool calls, Firecrawl fetches (cache misses) and raw content tokens since the last reset"""
+        with self._stats_lock:
+            return dict(self._crawl_stats)
+
+    def _count(self, name: str, amount: int = 1):
+        with self._stats_lock:
+            self._crawl_stats[name] += amount
+
+    def _fit(self, result):
+        """Fit a result into the agent's context budget, if it has one"""
+        # Every tool call returns through here exactly once
+        self._count("calls")
+        if isinstance(result, str):
+            self._count("tokens", estimate_tokens(result))
+        return self.budget.compress(result) if self.budget else result
+
+    def _cached(self, key: str, fetch, ttl: float = None):
+        """Return the result for `key` (cached or fetched) fitted to the context budget"""
+        return self._fit(self._fetch_cached(key, fetch, ttl))
+
+    def _fetch_cached(self, key: str, fetch, ttl: float = None):
+        """Return the raw cached result for `key`, fetching and storing it on a miss"""
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+        return self._fetch(key, fetch, ttl)
+
+    def _fetch(self, key: str, fetch, ttl: float = None):
+        """Call Firecrawl through the breaker and rate limiter, caching successful results"""
+        breaker = get_circuit_breaker("firecrawl", self.api_key)
+        with guarded(breaker, self.policy), get_rate_limiter("firecrawl", self.api_key).slot():
+            result = fetch()
+        self._count("fetches")
+        annotate(fetched=True)
+        if isinstance(result, str):
+            FIRECRAWL_FETCHED_BYTES.inc(len(result.encode("utf-8")))
+        if isinstance(result, str) and not result.startswith("Error"):
+            self.cache.set(key, result, ttl=ttl)
+        return result
+
+    def scrape_website(self, url: str) -> str:
+        """Use this function to scrape a website using Firecrawl.
+
+        Args:
+            url (str): The URL to scrape.
+        """
+        with span("firecrawl.scrape", url=url):
+            return self._scrape(url)
+
+    def _scrape(self, url: str) -> str:
+        key = self.cache.make_key("scrape", url, formats=self.formats and ",".join(self.formats))
+        result = None if self.revalidate else self.cache.get(key)
+        if result is not None:
+            return self._fit(result)
+        return self._refresh_page(url, key)
+
+    def _digest(self, result: str) -> str:
+        """Run-independent digest of one page, reused while the page stays unchanged"""
+        return page_text(result, self.budget.page_tokens if self.budget else None)
+
+    def _unchanged_page(self, url: str, fingerprint: dict, result: str) -> str:
+        since = datetime.fromtimestamp(fingerprint["fetched_at"]).strftime("%Y-%m-%d")
+        digest = fingerprint.get("digest")
+        page = json.dumps({"url": url, "markdown": digest}) if digest else result
+        return f"[Unchanged since {since}; content from the previous crawl]\n" + self._fit(page)
+
+    def _refresh_page(self, url: str, key: str):
+        """Re-fetch a page only if it changed since its fingerprinted version"""
+        fingerprint = self.fingerprints.get(url)
+        stale = self.cache.get(key, allow_stale=True)
+        etag = last_modified = None
+        if fingerprint and stale is not None:
+            unchanged, etag, last_modified = self.fingerprints.validators(url, fingerprint)
+            if unchanged:
+                self.fingerprints.count("unchanged")
+                self.fingerprints.record(url, fingerprint["content_hash"], etag=etag,
+                                         last_modified=last_modified, fetched=False)
+                self.cache.set(key, stale)
+                return self._unchanged_page(url, fingerprint, stale)
+
+        result = self._fetch(key, lambda: super(CachedFirecrawlTools, self).scrape_website(url))
+        if not isinstance(result, str) or result.startswith("Error"):
+            return self._fit(result)
+
+        if etag is None and last_modified is None:
+            # No HEAD request on the fetch path: validators the site sent with the page, else none
+            # until the first revalidation collects them
+            etag, last_modified = response_validators(result)
+        page_hash = content_hash(result)
+        if fingerprint and fingerprint["content_hash"] == page_hash:
+            # Re-fetched, but the text is identical: keep the previous digest and fetch date
+            self.fingerprints.count("unchanged_content")
+            self.fingerprints.record(url, page_hash, etag=etag, last_modified=last_modified, fetched=False)
+            return self._unchanged_page(url, fingerprint, result)
+
+        self.fingerprints.count("changed" if fingerprint else "new")
+        self.fingerprints.record(url, page_hash, self._digest(result), etag, last_modified)
+        if fingerprint:
+            since = datetime.fromtimestamp(fingerprint["fetched_at"]).strftime("%Y-%m-%d")
+            return f"[Changed since the previous crawl on {since}]\n" + self._fit(result)
+        return self._fit(result)
+
+    def crawl_website(self, url: str, limit: Optional[int] = None) -> str:
+        """Use this function to Crawls a website using Firecrawl.
+
+        Args:
+            url (str): The URL to crawl.
+            limit (int, optional): The maximum number of pages to crawl. Defaults to the limit set on the toolkit.
+
+        Returns:
+            The results of the crawling.
+        """
+        key = self.cache.make_key("crawl", url, limit=limit or self.limit,
+                                  formats=self.formats and ",".join(self.formats))
+        with span("firecrawl.crawl", url=url):
+            return self._cached(key, lambda: super(CachedFirecrawlTools, self).crawl_website(url, limit))
+
+    def map_website(self, url: str) -> str:
+        """Use this function to Map a website using Firecrawl.
+
+        Args:
+            url (str): The URL to map.
+
+        """
+        key = self.cache.make_key("map", url)
+        with span("firecrawl.map", url=url):
+            return self._cached(key, lambda: super(CachedFirecrawlTools, self).map_website(url))
+
+    def search_web(self, query: str, limit: Optional[int] = None):
+        """Use this function to search for the web using Firecrawl.
+
+        Args:
+            query (str): The query to search for.
+            limit (int, optional): The maximum number of results to return. Defaults to the limit set on the toolkit.
+        """
+        key = self.cache.make_key("search", query, limit=limit or self.limit,
+                                  formats=self.formats and ",".join(self.formats))
+        with span("firecrawl.search", query=query):
+            return self._cached(
+                key, lambda: super(CachedFirecrawlTools, self).search_web(query, limit), ttl=self.search_ttl
+            )
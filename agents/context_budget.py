@@ -0,0 +1,168 @@
+# agents/context_budget.py
+import json
+import os
+import re
+import threading
+
+# Rough tokens-per-character ratio for English web text; good enough for budgeting
+CHARS_PER_TOKEN = 4
+
+# Result fields worth passing to the model; html, links, screenshots etc. are dropped
+TEXT_FIELDS = ("markdown", "content", "description")
+
+IMAGE_LINE = re.compile(r"^\s*!\[[^\]]*\]\([^)]*\)\s*$")
+MARKDOWN_LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+BARE_URL = re.compile(r"https?://\S+")
+BOILERPLATE = re.compile(
+    r"cookie|privacy policy|terms of (use|service)|all rights reserved|subscribe|newsletter|"
+    r"sign (in|up)|log ?in|skip to (main )?content|accept all|back to top|follow us",
+    re.IGNORECASE,
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN
+
+
+def clean_markdown(text: str) -> str:
+    """Strip navigation, images, link targets and boilerplate lines from page markdown"""
+    lines = []
+    for line in text.splitlines():
+        if IMAGE_LINE.match(line):
+            continue
+        links = MARKDOWN_LINK.findall(line)
+        plain = MARKDOWN_LINK.sub(r"\1", line)
+        outside_links = re.sub(r"[\W_]+", "", MARKDOWN_LINK.sub("", line))
+        # Menus, breadcrumbs and footers: lines made (almost) only of links
+        if links and len(outside_links) < 20 and (len(links) >= 2 or not outside_links):
+            continue
+        if len(plain) < 120 and BOILERPLATE.search(plain):
+            continue
+        if plain.strip() and not re.sub(r"[\W_]+", "", plain):
+            # Separators and stray symbols
+            continue
+        lines.append(BARE_URL.sub("", plain).rstrip())
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def _documents(node, found: list):
+    """Collect (url, title, text) from any nesting of Firecrawl scrape/crawl/search results"""
+    if isinstance(node, list):
+        for item in node:
+            _documents(item, found)
+    elif isinstance(node, dict):
+        text = next((node[f] for f in TEXT_FIELDS if isinstance(node.get(f), str) and node[f].strip()), None)
+        if text is not None:
+            metadata = node.get("metadata") if isinstance(node.get("metadata"), dict) else {}
+            url = node.get("url") or metadata.get("sourceURL") or metadata.get("url")
+            title = node.get("title") or metadata.get("title")
+            found.append((url, title, text))
+            return
+        for value in node.values():
+            if isinstance(value, (dict, list)):
+                _documents(value, found)
+
+
+def page_documents(result: str) -> list:
+    """(url, title, text) of every page in a Firecrawl result; non-JSON results are one untitled page"""
+    try:
+        documents = []
+        _documents(json.loads(result), documents)
+    except ValueError:
+        documents = [(None, None, result)]
+    return documents
+
+
+def page_text(result: str, max_tokens: int = None) -> str:
+    """Cleaned text of the pages in a Firecrawl result, optionally capped, without run state"""
+    documents = page_documents(result)
+    text = "\n\n".join(clean_markdown(text) for _, _, text in documents)
+    if max_tokens is not None and estimate_tokens(text) > max_tokens:
+        text = text[:max_tokens * CHARS_PER_TOKEN].rsplit(" ", 1)[0] + " …"
+    return text
+
+
+class ContextBudget:
+    """Per-agent token budget applied to crawled content before it reaches the model
+
+    Each Firecrawl result is reduced to the text of its pages (navigation,
+    boilerplate and link targets stripped), passages already seen in the
+    current run are dropped, and every page is capped at `page_tokens` while
+    the run as a whole stays within `run_tokens`. reset() starts a new run;
+    tokens_saved reports what was kept out of the model's context.
+    """
+
+    def __init__(self, page_tokens: int = 2000, run_tokens: int = 12000):
+        self.page_tokens = page_tokens
+        self.run_tokens = run_tokens
+        self._lock = threading.Lock()
+        self.reset()
+
+    @classmethod
+    def from_env(cls, page_tokens: int = 2000, run_tokens: int = 12000):
+        """Budget from CONTEXT_PAGE_TOKENS / CONTEXT_RUN_TOKENS, falling back to the given defaults"""
+        return cls(
+            page_tokens=int(os.getenv("CONTEXT_PAGE_TOKENS", page_tokens)),
+            run_tokens=int(os.getenv("CONTEXT_RUN_TOKENS", run_tokens)),
+        )
+
+    def reset(self):
+        """Start a new run: forget seen passages and zero the counters"""
+        with self._lock:
+            self._seen = set()
+            self.raw_tokens = 0
+            self.kept_tokens = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.raw_tokens - self.kept_tokens)
+
+    def describe(self) -> str:
+        """Short description of the limits, for cache keys"""
+        return f"budget={self.page_tokens}/{self.run_tokens}"
+
+    def _page(self, url: str, title: str, text: str, limit: int) -> str:
+        """Cleaned, deduplicated and capped text of one page (caller holds the lock)"""
+        header = "\n".join(part for part in (f"URL: {url}" if url else "", f"Title: {title}" if title else "") if part)
+        if limit <= 0:
+            return f"{header}\n[Context budget for this run is exhausted; page content omitted]".strip()
+
+        kept, used = [], estimate_tokens(header)
+        for passage in clean_markdown(text).split("\n\n"):
+            key = re.sub(r"\W+", " ", passage.lower()).strip()
+            if not key or key in self._seen:
+                continue
+            self._seen.add(key)
+            tokens = estimate_tokens(passage)
+            if used + tokens > limit:
+                remaining = (limit - used) * CHARS_PER_TOKEN
+                if remaining > 200:
+                    kept.append(passage[:remaining].rsplit(" ", 1)[0] + " …")
+                kept.append("[…truncated to fit the context budget]")
+                break
+            kept.append(passage)
+            used += tokens
+        if not kept and text.strip():
+            kept.append("[Content already provided earlier in this run]")
+        return "\n\n".join(part for part in [header] + kept if part)
+
+    def compress(self, result):
+        """Return the budgeted text for a Firecrawl tool result
+
+        Error strings and results without page text pass through unchanged.
+        """
+        if not isinstance(result, str) or result.startswith("Error"):
+            return result
+        documents = page_documents(result)
+        if not documents:
+            return result
+
+        with self._lock:
+            pages = []
+            for url, title, text in documents:
+                remaining = self.run_tokens - self.kept_tokens - sum(estimate_tokens(p) for p in pages)
+                pages.append(self._page(url, title, text, min(self.page_tokens, remaining)))
+            compressed = "\n\n---\n\n".join(pages)
+            self.raw_tokens += estimate_tokens(result)
+            self.kept_tokens += estimate_tokens(compressed)
+        return compressed
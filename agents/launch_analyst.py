@@ -3,6 +3,9 @@ from .base_agent import BaseAgent
 
 class LaunchAnalyst(BaseAgent):
     """Specialized agent for competitor launch analysis"""
+
+    # Launch reviews draw on the widest set of pages (announcements, pricing, press)
+    CONTEXT_RUN_TOKENS = 16000
     
     def get_agent_name(self) -> str:
         return "Product Launch Analyst"
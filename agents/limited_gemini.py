@@ -0,0 +1,32 @@
+# agents/limited_gemini.py
+from agno.models.google import Gemini
+from .rate_limiter import get_rate_limiter
+
+
+class RateLimitedGemini(Gemini):
+    """Gemini model whose every request goes through the shared per-key rate limiter
+
+    Agents and the Team coordinator of all sessions draw from the same limiter,
+    so a 429 seen by one pauses the others instead of each backing off blindly;
+    agno's own retries then queue behind the limiter rather than piling up.
+    """
+
+    def _limiter(self):
+        return get_rate_limiter("gemini", self.api_key)
+
+    def invoke(self, *args, **kwargs):
+        with self._limiter().slot():
+            return super().invoke(*args, **kwargs)
+
+    def invoke_stream(self, *args, **kwargs):
+        with self._limiter().slot():
+            yield from super().invoke_stream(*args, **kwargs)
+
+    async def ainvoke(self, *args, **kwargs):
+        async with self._limiter().aslot():
+            return await super().ainvoke(*args, **kwargs)
+
+    async def ainvoke_stream(self, *args, **kwargs):
+        async with self._limiter().aslot():
+            async for response in super().ainvoke_stream(*args, **kwargs):
+                yield response
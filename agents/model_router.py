@@ -0,0 +1,69 @@
+# agents/model_router.py
+import threading
+import time
+from models.config import STAGES, AgentConfig
+from .resilience import LatencyTracker
+
+
+class ModelRouter:
+    """Pick the model for each pipeline stage from an AgentConfig
+
+    Stages map to models through `config.stage_models` (default `model_id`).
+    With `fallback_model_id` and `latency_slo` set, a model whose observed p95
+    run latency exceeds the SLO is swapped for the fallback; after
+    `recheck_after` seconds its samples are dropped and it is tried again.
+    """
+
+    def __init__(self, config: AgentConfig, min_samples: int = 5, recheck_after: float = 300.0):
+        self.config = config
+        self.min_samples = min_samples
+        self.recheck_after = recheck_after
+        self._latency = {}
+        self._fallback_since = {}
+        self._lock = threading.Lock()
+
+    def _tracker(self, model_id: str) -> LatencyTracker:
+        with self._lock:
+            return self._latency.setdefault(model_id, LatencyTracker(window=50))
+
+    def record(self, model_id: str, seconds: float):
+        """Feed the latency of an uncached run on `model_id`"""
+        self._tracker(model_id).record(seconds)
+
+    def _breaks_slo(self, model_id: str) -> bool:
+        tracker = self._tracker(model_id)
+        with self._lock:
+            since = self._fallback_since.get(model_id)
+            if since is not None:
+                if time.monotonic() - since < self.recheck_after:
+                    return True
+                # Give the primary model another chance with a fresh window
+                del self._fallback_since[model_id]
+                tracker.clear()
+                return False
+            p95 = tracker.percentile(0.95, self.min_samples)
+            if p95 is not None and p95 > self.config.latency_slo:
+                self._fallback_since[model_id] = time.monotonic()
+                return True
+            return False
+
+    def model_for(self, stage: str) -> str:
+        """Model to use for `stage` right now"""
+        if stage not in STAGES:
+            raise ValueError(f"Unknown pipeline stage: {stage}")
+        model_id = self.config.model_for(stage)
+        fallback = self.config.fallback_model_id
+        if fallback and self.config.latency_slo and model_id != fallback and self._breaks_slo(model_id):
+            return fallback
+        return model_id
+
+    def stats(self) -> dict:
+        """Routed model per stage plus p95 latency of every model seen so far"""
+        with self._lock:
+            trackers = dict(self._latency)
+            degraded = sorted(self._fallback_since)
+        return {
+            "stages": {stage: self.model_for(stage) for stage in STAGES},
+            "p95": {model_id: tracker.percentile(0.95) for model_id, tracker in trackers.items()},
+            "degraded": degraded,
+        }
@@ -0,0 +1,242 @@
+# agents/rate_limiter.py
+import asyncio
+import hashlib
+import os
+import re
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from services.metrics import counter, gauge, histogram
+
+# Markers of a provider rejecting a request for quota reasons
+RATE_LIMIT_MARKERS = ("429", "resource_exhausted", "rate limit", "rate-limit", "too many requests", "quota")
+# Gemini puts the server-suggested wait in the error body ("retryDelay": "37s" / "Please retry in 37.2s")
+RETRY_DELAY_PATTERN = re.compile(r"retry(?:Delay\"?:\s*\"|\s+in\s+)(\d+(?:\.\d+)?)s", re.IGNORECASE)
+
+# Failed requests include the ones agno's backoff and the hedges retry
+PROVIDER_REQUESTS = counter("provider_requests_total", "Provider requests by outcome (ok, rate_limited, error)",
+                            ("provider", "outcome"))
+PROVIDER_WAIT = histogram("provider_wait_seconds", "Time requests waited for a rate limiter slot", ("provider",),
+                          buckets=(0, 0.01, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60))
+PROVIDER_IN_FLIGHT = gauge("provider_requests_in_flight", "Provider requests currently holding a slot", ("provider",))
+
+
+def is_rate_limit_error(error) -> bool:
+    """True when an exception (or an error string returned by a tool) signals a 429 / quota error"""
+    for attr in ("status_code", "code", "status"):
+        if getattr(error, attr, None) == 429:
+            return True
+    text = str(error).lower()
+    return any(marker in text for marker in RATE_LIMIT_MARKERS)
+
+
+def retry_delay(error) -> float:
+    """Server-suggested wait in seconds from a rate-limit error, or None"""
+    match = RETRY_DELAY_PATTERN.search(str(error))
+    return float(match.group(1)) if match else None
+
+
+class RateLimiter:
+    """Token bucket plus AIMD concurrency window for one provider credential
+
+    The bucket paces request starts at `requests_per_minute`. The concurrency
+    window grows by one slot per window of successful calls and halves on a
+    429 (at most once per cooldown), while all callers pause until the
+    cooldown or the server-suggested retry delay has passed. When
+    `latency_target` is set, calls slower than it shrink the window gently.
+    """
+
+    def __init__(self, name: str, requests_per_minute: float = 60, max_concurrency: int = 8,
+                 min_concurrency: int = 1, latency_target: float = None, cooldown: float = 10.0):
+        if requests_per_minute <= 0 or max_concurrency < 1:
+            raise ValueError("Rate limiter needs a positive rate and at least one concurrent slot")
+        self.name = name
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min(min_concurrency, max_concurrency)
+        self.latency_target = latency_target
+        self.cooldown = cooldown
+        self._cond = threading.Condition()
+
+        self._tokens = self.capacity
+        self._refilled_at = time.monotonic()
+        self._limit = float(max_concurrency)
+        self._in_flight = 0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+
+        # Metrics
+        self.requests = 0
+        self.rate_limited = 0
+        self.waits = 0
+        self.total_wait = 0.0
+
+    def _try_acquire(self, now: float):
+        """Take a slot and a token if possible (caller holds the lock)
+
+        Returns 0 on success, otherwise the seconds to wait before retrying
+        (None when only a release can free capacity).
+        """
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if self._in_flight >= int(self._limit):
+            return None
+        self._tokens = min(self.capacity, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+        if self._tokens < 1:
+            return (1 - self._tokens) / self.rate
+        self._tokens -= 1
+        self._in_flight += 1
+        self.requests += 1
+        PROVIDER_IN_FLIGHT.set(self._in_flight, provider=self.name)
+        return 0
+
+    def _record_wait(self, waited: float):
+        PROVIDER_WAIT.observe(waited, provider=self.name)
+        if waited > 0:
+            self.waits += 1
+            self.total_wait += waited
+
+    def acquire(self, timeout: float = None):
+        """Block until a request may start, up to `timeout` seconds"""
+        start = time.monotonic()
+        waited = False
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                delay = self._try_acquire(now)
+                if delay == 0:
+                    self._record_wait(now - start if waited else 0.0)
+                    return
+                waited = True
+                remaining = None if timeout is None else timeout - (now - start)
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"{self.name} rate limiter gave no slot within {timeout}s")
+                waits = [w for w in (delay, remaining) if w is not None]
+                self._cond.wait(min(waits) if waits else None)
+
+    async def aacquire(self, timeout: float = None, poll_interval: float = 0.05):
+        """Async acquire that waits on the event loop instead of blocking a thread"""
+        start = time.monotonic()
+        waited = False
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                delay = self._try_acquire(now)
+                if delay == 0:
+                    self._record_wait(now - start if waited else 0.0)
+                    return
+            waited = True
+            if timeout is not None and now - start >= timeout:
+                raise TimeoutError(f"{self.name} rate limiter gave no slot within {timeout}s")
+            await asyncio.sleep(min(delay, 1.0) if delay else poll_interval)
+
+    def release(self, latency: float = None, error: Exception = None):
+        """Return a slot and adapt the window to the call's outcome"""
+        with self._cond:
+            now = time.monotonic()
+            self._in_flight -= 1
+            PROVIDER_IN_FLIGHT.set(self._in_flight, provider=self.name)
+            if error is not None and is_rate_limit_error(error):
+                self.rate_limited += 1
+                PROVIDER_REQUESTS.inc(provider=self.name, outcome="rate_limited")
+                self._blocked_until = max(self._blocked_until, now + (retry_delay(error) or self.cooldown))
+                self._tokens = 0.0
+                self._decrease(now, 0.5)
+            elif error is None:
+                PROVIDER_REQUESTS.inc(provider=self.name, outcome="ok")
+                if self.latency_target and latency is not None and latency > self.latency_target:
+                    self._decrease(now, 0.9)
+                else:
+                    self._limit = min(self.max_concurrency, self._limit + 1.0 / self._limit)
+            else:
+                PROVIDER_REQUESTS.inc(provider=self.name, outcome="error")
+            self._cond.notify_all()
+
+    def _decrease(self, now: float, factor: float):
+        """Multiplicative decrease, once per cooldown so a burst of failures counts as one signal"""
+        if now - self._last_decrease >= self.cooldown:
+            self._limit = max(self.min_concurrency, self._limit * factor)
+            self._last_decrease = now
+
+    @contextmanager
+    def slot(self, timeout: float = None):
+        """Hold a request slot for the duration of the block"""
+        self.acquire(timeout)
+        start = time.monotonic()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.release(time.monotonic() - start, error)
+
+    @asynccontextmanager
+    async def aslot(self, timeout: float = None):
+        """Async variant of slot()"""
+        await self.aacquire(timeout)
+        start = time.monotonic()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.release(time.monotonic() - start, error)
+
+    def stats(self) -> dict:
+        """Return the current window and limiter metrics"""
+        with self._cond:
+            return {
+                "limit": round(self._limit, 2),
+                "in_flight": self._in_flight,
+                "requests": self.requests,
+                "rate_limited": self.rate_limited,
+                "waits": self.waits,
+                "avg_wait": self.total_wait / self.waits if self.waits else 0.0,
+                "cooling_down": max(0.0, self._blocked_until - time.monotonic()),
+            }
+
+
+# provider -> (env prefix, default requests/minute, default max concurrency)
+PROVIDER_DEFAULTS = {
+    "gemini": ("GEMINI", 60, 8),
+    "firecrawl": ("FIRECRAWL", 60, 4),
+}
+
+# Process-wide limiters keyed by (provider, hash of the API key)
+_limiters = {}
+_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, api_key: str = None) -> RateLimiter:
+    """Return the shared limiter for a provider credential, creating it on first use
+
+    Quotas come from <PREFIX>_RPM, <PREFIX>_MAX_CONCURRENCY and
+    <PREFIX>_LATENCY_TARGET (GEMINI_* / FIRECRAWL_*).
+    """
+    key_hash = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+    with _lock:
+        limiter = _limiters.get((provider, key_hash))
+        if limiter is None:
+            prefix, rpm, concurrency = PROVIDER_DEFAULTS.get(provider, (provider.upper(), 60, 4))
+            latency_target = os.getenv(f"{prefix}_LATENCY_TARGET")
+            limiter = RateLimiter(
+                name=provider,
+                requests_per_minute=float(os.getenv(f"{prefix}_RPM", rpm)),
+                max_concurrency=int(os.getenv(f"{prefix}_MAX_CONCURRENCY", concurrency)),
+                latency_target=float(latency_target) if latency_target else None,
+            )
+            _limiters[(provider, key_hash)] = limiter
+        return limiter
+
+
+def get_limiter_stats() -> dict:
+    """Stats of every limiter created so far, keyed by provider and key hash"""
+    with _lock:
+        limiters = dict(_limiters)
+    return {f"{provider}:{key_hash[:8]}": limiter.stats() for (provider, key_hash), limiter in limiters.items()}
@@ -0,0 +1,70 @@
+# agents/registry.py
+import hashlib
+import json
+import os
+import threading
+from dataclasses import asdict, replace
+from typing import TYPE_CHECKING
+from models.config import AgentConfig
+
+if TYPE_CHECKING:
+    from .team_coordinator import TeamCoordinator
+
+# Process-wide cache of fully built coordinators, keyed by a hash of keys + model config
+_coordinators = {}
+# One build lock per key, so a slow build only holds up sessions waiting for the same coordinator
+_build_locks = {}
+# Guards the two dicts above; never held while a coordinator is being built
+_lock = threading.Lock()
+
+
+def _registry_key(config: AgentConfig, pool_size: int) -> str:
+    """Hash credentials and model configuration so raw keys are never held as dict keys"""
+    raw = json.dumps([asdict(config), pool_size], sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def get_coordinator(google_api_key: str, firecrawl_api_key: str, model_id: str = None,
+                    pool_size: int = None, config: AgentConfig = None) -> "TeamCoordinator":
+    """Return a warm TeamCoordinator for these credentials, building it only once per process
+
+    Streamlit re-executes the script on every interaction; handing back the same
+    instance keeps the agents, model clients and their HTTP connection pools alive
+    across reruns and sessions. Concurrent sessions share it safely: direct
+    analyses check analysts out of per-role pools of `pool_size` instances
+    (AGENT_POOL_SIZE by default). Model routing comes from `config`
+    (AgentConfig.from_env() by default), with `model_id` overriding its default model.
+
+    agno, the Gemini client and the Firecrawl tools are imported on the first
+    call, so importing this module stays cheap for pages that never analyse.
+    """
+    from .team_coordinator import TeamCoordinator
+
+    pool_size = pool_size or int(os.getenv("AGENT_POOL_SIZE", 4))
+    config = config or AgentConfig.from_env(google_api_key, firecrawl_api_key)
+    if model_id:
+        config = replace(config, model_id=model_id)
+    key = _registry_key(config, pool_size)
+    with _lock:
+        coordinator = _coordinators.get(key)
+        if coordinator is not None and coordinator.is_ready():
+            return coordinator
+        build_lock = _build_locks.setdefault(key, threading.Lock())
+
+    with build_lock:
+        # Another session may have finished building it while we waited
+        with _lock:
+            coordinator = _coordinators.get(key)
+        if coordinator is None or not coordinator.is_ready():
+            coordinator = TeamCoordinator(
+                google_api_key, firecrawl_api_key, pool_size=pool_size, config=config
+            )
+            with _lock:
+                _coordinators[key] = coordinator
+        return coordinator
+
+
+def clear_coordinators():
+    """Drop every cached coordinator (e.g. after rotating API keys)"""
+    with _lock:
+        _coordinators.clear()
@@ -0,0 +1,190 @@
+# agents/research.py
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from services.crawl_cache import normalize_url
+from services.result_store import company_key
+from services.tracing import span
+from .cached_firecrawl import CachedFirecrawlTools
+from .context_budget import ContextBudget, estimate_tokens, page_documents
+from .single_flight import SingleFlight
+
+# Analysis type -> web search feeding the shared corpus, so every analyst finds its kind of evidence
+RESEARCH_QUERIES = {
+    "competitor": "{company_name} product launch announcement pricing",
+    "sentiment": "{company_name} customer reviews reddit G2",
+    "metrics": "{company_name} launch users revenue growth metrics",
+}
+
+
+@dataclass
+class Corpus:
+    """Deduplicated research documents about one company"""
+    company_name: str
+    # (url, title, text) per page, in search rank order
+    documents: list = field(default_factory=list)
+    searches: int = 0
+    pages: int = 0
+    # Crawled content before cleaning / deduplication, and what the corpus kept of it
+    raw_tokens: int = 0
+    tokens: int = 0
+    seconds: float = 0.0
+    built_at: float = field(default_factory=time.time)
+
+    def render(self) -> str:
+        """Corpus text for an analyst prompt, one numbered document per page"""
+        return "\n\n---\n\n".join(
+            f"[{number}] URL: {url}" + (f"\nTitle: {title}" if title else "") + f"\n{text}"
+            for number, (url, title, text) in enumerate(self.documents, start=1)
+        )
+
+
+def corpus_prompt(prompt: str, corpus: Corpus) -> str:
+    """An analysis prompt that must be answered from `corpus` alone"""
+    return (
+        f"{prompt}\n\n"
+        f"Work only from the research corpus below, collected for {corpus.company_name}; you have no browsing tools. "
+        "Cite the URLs of the documents you rely on and list them in the closing 'Sources:' section. "
+        "Where the corpus has no evidence for a point, say so instead of guessing.\n\n"
+        f"=== RESEARCH CORPUS ===\n{corpus.render()}\n=== END OF CORPUS ==="
+    )
+
+
+class ResearchStage:
+    """Search and crawl once per company, producing one corpus for every analyst
+
+    One search per RESEARCH_QUERIES entry; the result URLs are normalized and
+    deduplicated, and the top `max_pages` are scraped in parallel through the
+    shared crawl cache. Page text is cleaned, passages repeated across pages
+    are dropped, and each page and the whole corpus are capped in tokens.
+    Concurrent requests for the same company share one build, and a corpus is
+    reused for `ttl` seconds unless a refresh is forced.
+    """
+
+    def __init__(self, firecrawl_api_key: str, search_limit: int = 5, max_pages: int = 8,
+                 page_tokens: int = 1500, corpus_tokens: int = 15000, ttl: float = 3600):
+        self.firecrawl_api_key = firecrawl_api_key
+        self.search_limit = search_limit
+        self.max_pages = max_pages
+        self.page_tokens = page_tokens
+        self.corpus_tokens = corpus_tokens
+        self.ttl = ttl
+        self.flights = SingleFlight()
+        self._lock = threading.Lock()
+        self._corpora = {}
+        # Metrics
+        self.builds = 0
+        self.seconds = 0.0
+        self.crawl = {"calls": 0, "fetches": 0, "tokens": 0}
+
+    @classmethod
+    def from_env(cls, firecrawl_api_key: str):
+        """Stage configured from RESEARCH_SEARCH_LIMIT, RESEARCH_MAX_PAGES, RESEARCH_PAGE_TOKENS,
+        RESEARCH_CORPUS_TOKENS and RESEARCH_TTL"""
+        return cls(
+            firecrawl_api_key,
+            search_limit=int(os.getenv("RESEARCH_SEARCH_LIMIT", 5)),
+            max_pages=int(os.getenv("RESEARCH_MAX_PAGES", 8)),
+            page_tokens=int(os.getenv("RESEARCH_PAGE_TOKENS", 1500)),
+            corpus_tokens=int(os.getenv("RESEARCH_CORPUS_TOKENS", 15000)),
+            ttl=float(os.getenv("RESEARCH_TTL", 3600)),
+        )
+
+    def corpus(self, company_name: str, force_refresh: bool = False) -> Corpus:
+        """Return the company's corpus, building it on first use or when `force_refresh` is set"""
+        key = company_key(company_name)
+        if not force_refresh:
+            with self._lock:
+                corpus = self._corpora.get(key)
+            if corpus is not None and time.time() - corpus.built_at < self.ttl:
+                return corpus
+        return self.flights.do((key, force_refresh), lambda: self._build(company_name, force_refresh))
+
+    def _search(self, tools: CachedFirecrawlTools, company_name: str) -> list:
+        """Search results as (url, title, snippet), interleaved across queries and deduplicated by URL"""
+        ranked = []
+        for query in RESEARCH_QUERIES.values():
+            result = tools.search_web(query.format(company_name=company_name), self.search_limit)
+            if isinstance(result, str) and not result.startswith("Error"):
+                ranked.append([doc for doc in page_documents(result) if doc[0]])
+
+        found, seen = [], set()
+        for rank in range(max((len(results) for results in ranked), default=0)):
+            for results in ranked:
+                if rank < len(results) and normalize_url(results[rank][0]) not in seen:
+                    seen.add(normalize_url(results[rank][0]))
+                    found.append(results[rank])
+        return found
+
+    @staticmethod
+    def _page_body(result) -> str:
+        """Scrape result without the unchanged/changed note the crawl tools prepend"""
+        if not isinstance(result, str) or result.startswith("Error"):
+            return None
+        if result.startswith("[Unchanged since") or result.startswith("[Changed since"):
+            result = result.split("\n", 1)[1] if "\n" in result else ""
+        return result
+
+    def _build(self, company_name: str, force_refresh: bool) -> Corpus:
+        with span("research.build", company=company_name, force_refresh=force_refresh) as build_span:
+            corpus = self._collect(company_name, force_refresh)
+            build_span.set(pages=corpus.pages, raw_tokens=corpus.raw_tokens, corpus_tokens=corpus.tokens)
+            return corpus
+
+    def _collect(self, company_name: str, force_refresh: bool) -> Corpus:
+        start = time.perf_counter()
+        tools = CachedFirecrawlTools(api_key=self.firecrawl_api_key, enable_search=True, limit=self.search_limit)
+        tools.revalidate = force_refresh
+        corpus = Corpus(company_name, searches=len(RESEARCH_QUERIES))
+
+        hits = self._search(tools, company_name)[:self.max_pages]
+        with ThreadPoolExecutor(max_workers=min(4, len(hits) or 1), thread_name_prefix="research") as executor:
+            # Scrapes keep the caller's usage tracker and trace run
+            futures = [executor.submit(contextvars.copy_context().run, tools.scrape_website, url) for url, _, _ in hits]
+            pages = [future.result() for future in futures]
+
+        # Compressed in search order, so the corpus (and the analysts' cache keys) is stable
+        budget = ContextBudget(self.page_tokens, self.corpus_tokens)
+        for (url, title, snippet), page in zip(hits, pages):
+            body = self._page_body(page)
+            if body is None:
+                # Scrape failed: the search snippet is still evidence
+                text = snippet
+            else:
+                # Drop the URL / Title header compress() adds; render() writes its own
+                text = "\n".join(
+                    line for line in budget.compress(body).splitlines()
+                    if not line.startswith(("URL: ", "Title: "))
+                ).strip()
+            if text and not text.startswith(("[Content already provided", "[Context budget")):
+                corpus.documents.append((url, title, text))
+                corpus.pages += body is not None
+        corpus.raw_tokens = budget.raw_tokens
+        corpus.tokens = sum(estimate_tokens(text) for _, _, text in corpus.documents)
+        corpus.seconds = time.perf_counter() - start
+        if not corpus.documents:
+            raise Exception(f"Research stage found no pages about {company_name}")
+
+        crawl = tools.crawl_stats()
+        with self._lock:
+            self._corpora[company_key(company_name)] = corpus
+            self.builds += 1
+            self.seconds += corpus.seconds
+            for name, value in crawl.items():
+                self.crawl[name] += value
+        return corpus
+
+    def stats(self) -> dict:
+        """Corpus builds, their total seconds and crawl volume, and corpora held in memory"""
+        with self._lock:
+            return {
+                "builds": self.builds,
+                "seconds": round(self.seconds, 2),
+                "crawl_calls": self.crawl["calls"],
+                "crawl_fetches": self.crawl["fetches"],
+                "crawl_tokens": self.crawl["tokens"],
+                "cached_corpora": len(self._corpora),
+            }
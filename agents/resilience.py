@@ -0,0 +1,134 @@
+# agents/resilience.py
+import hashlib
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider that is currently failing"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker shared by every caller of one provider credential
+
+    Failures are counted provider-wide, while each caller passes its own
+    threshold and reset timeout to check(), so roles can tolerate more or
+    fewer errors before failing fast. After the reset timeout one probe call
+    is let through (half-open); its success closes the circuit again.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.failures = 0
+        self._last_failure = 0.0
+        self._probe_started = None
+
+        # Metrics
+        self.trips = 0
+        self.rejected = 0
+
+    def check(self, failure_threshold: int, reset_timeout: float):
+        """Raise CircuitOpenError while the provider is considered down"""
+        with self._lock:
+            if self.failures < failure_threshold:
+                return
+            now = time.monotonic()
+            elapsed = now - self._last_failure
+            probe_stale = self._probe_started is None or now - self._probe_started >= reset_timeout
+            if elapsed >= reset_timeout and probe_stale:
+                self._probe_started = now
+                return
+            self.rejected += 1
+            retry_in = max(0.0, reset_timeout - elapsed)
+            raise CircuitOpenError(
+                f"{self.name} is degraded ({self.failures} consecutive failures); "
+                f"failing fast, next attempt allowed in {retry_in:.0f}s"
+            )
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probe_started = None
+
+    def record_failure(self, failure_threshold: int = None):
+        with self._lock:
+            self.failures += 1
+            self._last_failure = time.monotonic()
+            self._probe_started = None
+            if failure_threshold is not None and self.failures == failure_threshold:
+                self.trips += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"failures": self.failures, "trips": self.trips, "rejected": self.rejected}
+
+
+@contextmanager
+def guarded(breaker: CircuitBreaker, policy):
+    """Fail fast when `breaker` is open, and feed the block's outcome back into it"""
+    breaker.check(policy.failure_threshold, policy.reset_timeout)
+    try:
+        yield
+    except Exception:
+        breaker.record_failure(policy.failure_threshold)
+        raise
+    breaker.record_success()
+
+
+class LatencyTracker:
+    """Sliding window of recent run latencies (per role or per model)"""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+    def percentile(self, q: float, min_samples: int = 1) -> float:
+        """Nearest-rank percentile (q in 0..1), or None with fewer than `min_samples` samples"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples or len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, max(0, math.ceil(q * len(samples)) - 1))]
+
+    def hedge_delay(self, policy) -> float:
+        """Seconds to wait before hedging under `policy`, or None if no hedge should fire"""
+        if not policy.hedge:
+            return None
+        if policy.hedge_after is not None:
+            return policy.hedge_after
+        return self.percentile(policy.hedge_percentile, policy.min_samples)
+
+
+# Process-wide breakers keyed by (provider, hash of the API key)
+_breakers = {}
+_lock = threading.Lock()
+
+
+def get_circuit_breaker(provider: str, api_key: str = None) -> CircuitBreaker:
+    """Return the shared circuit breaker for a provider credential"""
+    key_hash = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+    with _lock:
+        breaker = _breakers.get((provider, key_hash))
+        if breaker is None:
+            breaker = CircuitBreaker(provider.capitalize())
+            _breakers[(provider, key_hash)] = breaker
+        return breaker
+
+
+def get_breaker_stats() -> dict:
+    """Stats of every breaker created so far, keyed by provider and key hash"""
+    with _lock:
+        breakers = dict(_breakers)
+    return {f"{provider}:{key_hash[:8]}": breaker.stats() for (provider, key_hash), breaker in breakers.items()}
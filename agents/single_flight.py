@@ -0,0 +1,85 @@
+# agents/single_flight.py
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into a single execution
+
+    The first caller for a key (the leader) runs the work; callers arriving
+    while it is in flight attach to the leader's future and receive the same
+    result or exception. Nothing is kept once the flight lands, so this is
+    deduplication of in-flight work only, not a cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+
+        # Metrics
+        self.calls = 0
+        self.executions = 0
+        self.deduplicated = 0
+
+    def join(self, key):
+        """Return (future, leader): leader=True means the caller must run the work and land()"""
+        with self._lock:
+            self.calls += 1
+            future = self._flights.get(key)
+            if future is not None:
+                self.deduplicated += 1
+                return future, False
+            future = Future()
+            self._flights[key] = future
+            self.executions += 1
+            return future, True
+
+    def land(self, key, future: Future, result=None, error: BaseException = None):
+        """Publish the leader's outcome to every attached caller and retire the flight"""
+        with self._lock:
+            if self._flights.get(key) is future:
+                del self._flights[key]
+        if error is not None:
+            if not isinstance(error, Exception):
+                # Followers should not inherit the leader's cancellation or generator close
+                error = RuntimeError(f"Coalesced call was interrupted: {type(error).__name__}")
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, fn):
+        """Run `fn()` once for all concurrent callers of `key` and return its result"""
+        future, leader = self.join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            self.land(key, future, error=e)
+            raise
+        self.land(key, future, result=result)
+        return result
+
+    async def ado(self, key, coro_fn):
+        """Async variant of do(); `coro_fn()` returns the awaitable to run"""
+        future, leader = self.join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            result = await coro_fn()
+        except BaseException as e:
+            self.land(key, future, error=e)
+            raise
+        self.land(key, future, result=result)
+        return result
+
+    def stats(self) -> dict:
+        """Return call, execution and deduplication counters"""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "deduplicated": self.deduplicated,
+                "in_flight": len(self._flights),
+            }
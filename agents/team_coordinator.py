@@ -1,49 +1,197 @@
 # agents/team_coordinator.py
+import asyncio
+import contextvars
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import replace
+from functools import partial
 from agno.team import Team
-from agno.models.google import Gemini
+from models.config import STAGES, AgentConfig, ResiliencePolicy
+from services.company_index import company_id, register_company
+from services.metrics import counter, histogram
+from services.response_cache import get_response_cache
+from services.result_store import get_result_store
+from services.tracing import span, trace_run
+from .agent_pool import AgentPool
+from .base_agent import AGENT_TOKENS, check_run, stream_content
+from .limited_gemini import RateLimitedGemini
+from .model_router import ModelRouter
+from .research import ResearchStage, corpus_prompt
+from .resilience import LatencyTracker, get_breaker_stats, get_circuit_breaker, guarded
+from .single_flight import SingleFlight
+from .usage import record_cached, record_context_saved, record_run, token_counts
 from .launch_analyst import LaunchAnalyst
 from .sentiment_analyst import SentimentAnalyst
 from .metrics_analyst import MetricsAnalyst
 
+ANALYSIS_SECONDS = histogram("coordinator_analysis_seconds",
+                             "End-to-end latency of analyze*() calls, research stage included",
+                             ("analysis_type", "mode"))
+TEAM_SECONDS = histogram("team_run_seconds", "Latency of team runs (leader routing plus member runs)", ("stage",))
+HEDGES = counter("analyst_hedges_total", "Hedged analyst runs started (fired) and won by the hedge", ("role", "outcome"))
+
 class TeamCoordinator:
     """Coordinates the multi-agent team for product intelligence"""
+
+    # Agent role -> analyst class
+    ROLES = {
+        "launch": LaunchAnalyst,
+        "sentiment": SentimentAnalyst,
+        "metrics": MetricsAnalyst,
+    }
+
+    # Analysis type -> (agent role, prompt template), in the order the UI presents them
+    ANALYSES = {
+        "competitor": ("launch", "Generate insights about {company_name}'s product launches."),
+        "sentiment": ("sentiment", "Analyze the market sentiment for {company_name}."),
+        "metrics": ("metrics", "Analyze the performance metrics for {company_name}."),
+    }
+
+    # How analysts gather evidence: their own search / crawl tool calls, or one
+    # research stage per company whose corpus all three analysts share
+    ANALYSIS_MODES = {
+        "tools": "Each analyst searches and crawls on its own",
+        "research": "One shared research stage; analysts work from its corpus without tools",
+    }
+    MODE_COUNTERS = ("analyses", "seconds", "crawl_calls", "crawl_fetches", "crawl_tokens", "batches", "batch_seconds")
+
+    TEAM_NAME = "Product Intelligence Team"
+    TEAM_INSTRUCTIONS = [
+        "Coordinate the analysis based on the user's request type:",
+        "1. For competitor analysis: Use the Product Launch Analyst to evaluate positioning, strengths, weaknesses, and strategic insights",
+        "2. For market sentiment: Use the Market Sentiment Specialist to analyze social media sentiment, customer feedback, and brand perception",
+        "3. For launch metrics: Use the Launch Metrics Specialist to track KPIs, adoption rates, press coverage, and performance indicators",
+        "Always provide evidence-based insights with specific examples and data points",
+        "Structure responses with clear sections and actionable recommendations",
+        "Include sources section with all URLs crawled or searched"
+    ]
     
-    def __init__(self, google_api_key: str, firecrawl_api_key: str):
+    def __init__(self, google_api_key: str, firecrawl_api_key: str, model_id: str = None,
+                 pool_size: int = None, policies: dict = None, config: AgentConfig = None,
+                 analysis_mode: str = None, debug_mode: bool = None):
         self.google_api_key = google_api_key
         self.firecrawl_api_key = firecrawl_api_key
+        # Per-stage model routing; `model_id` overrides the config's default model
+        self.config = config or AgentConfig.from_env(google_api_key, firecrawl_api_key)
+        if model_id:
+            self.config = replace(self.config, model_id=model_id)
+        self.model_id = self.config.model_id
+        self.router = ModelRouter(self.config)
+        self.pool_size = pool_size or int(os.getenv("AGENT_POOL_SIZE", 4))
         self.team = None
+        # agno's verbose team logging (TEAM_DEBUG=1); off by default, it prints every member exchange
+        self.debug_mode = os.getenv("TEAM_DEBUG", "").lower() in ("1", "true", "yes") if debug_mode is None else debug_mode
         self.agents = {}
+        # (role, model id) -> AgentPool, created on first use of each routed model
+        self.pools = {}
+        self._pools_lock = threading.Lock()
+        # (team slot, model id) -> model instance swapped into the team per run
+        self._team_models = {}
+        # Per-role hedging / circuit-breaker policy (role -> ResiliencePolicy), defaults from env
+        self.policies = {
+            role: (policies or {}).get(role) or ResiliencePolicy.from_env(role) for role in self.ROLES
+        }
+        self.team_policy = ResiliencePolicy.from_env()
+        self.latency = {role: LatencyTracker() for role in self.ROLES}
+        self.hedges = {role: {"fired": 0, "won": 0} for role in self.ROLES}
+        self._hedge_lock = threading.Lock()
+        self._hedge_executor = ThreadPoolExecutor(
+            max_workers=2 * self.pool_size * len(self.ROLES), thread_name_prefix="hedge"
+        )
+        # The Team and its member agents are single instances, so team runs take turns
+        self._team_lock = threading.Lock()
+        # Identical analyses requested concurrently (other sessions, tabs) share one run
+        self.flights = SingleFlight()
+        self.response_cache = get_response_cache()
+        # Every finished analysis is kept so past results can be reopened without re-running
+        self.result_store = get_result_store()
+        # Default analysis mode (ANALYSIS_MODE env var); every analyze*() call can override it
+        self.analysis_mode = analysis_mode or os.getenv("ANALYSIS_MODE", "tools")
+        if self.analysis_mode not in self.ANALYSIS_MODES:
+            raise ValueError(f"Unknown analysis mode {self.analysis_mode!r}; expected one of {list(self.ANALYSIS_MODES)}")
+        self.research = ResearchStage.from_env(firecrawl_api_key)
+        # Per-mode latency and crawl volume, for comparing the modes
+        self.mode_stats = {mode: dict.fromkeys(self.MODE_COUNTERS, 0) for mode in self.ANALYSIS_MODES}
+        self._mode_lock = threading.Lock()
         self._initialize_team()
     
     def _initialize_team(self):
         """Initialize all agents and the coordinated team"""
         try:
-            # Initialize individual agents
-            self.agents['launch'] = LaunchAnalyst(self.google_api_key, self.firecrawl_api_key)
-            self.agents['sentiment'] = SentimentAnalyst(self.google_api_key, self.firecrawl_api_key)
-            self.agents['metrics'] = MetricsAnalyst(self.google_api_key, self.firecrawl_api_key)
+            # Initialize individual agents (team members) and per-role pools for direct analyses
+            analysis_model = self.router.model_for("analysis")
+            for role in self.ROLES:
+                self.agents[role] = self._agent_factory(role, analysis_model)()
+                self._pool(role, analysis_model)
             
             # Create the coordinated team
             self.team = Team(
-                name="Product Intelligence Team",
-                model=Gemini(id="gemini-1.5-flash"),
+                name=self.TEAM_NAME,
+                model=self._team_model("leader", self.router.model_for("coordination")),
                 members=[agent.agent for agent in self.agents.values()],
-                instructions=[
-                    "Coordinate the analysis based on the user's request type:",
-                    "1. For competitor analysis: Use the Product Launch Analyst to evaluate positioning, strengths, weaknesses, and strategic insights",
-                    "2. For market sentiment: Use the Market Sentiment Specialist to analyze social media sentiment, customer feedback, and brand perception",
-                    "3. For launch metrics: Use the Launch Metrics Specialist to track KPIs, adoption rates, press coverage, and performance indicators",
-                    "Always provide evidence-based insights with specific examples and data points",
-                    "Structure responses with clear sections and actionable recommendations",
-                    "Include sources section with all URLs crawled or searched"
-                ],
+                instructions=self.TEAM_INSTRUCTIONS,
                 markdown=True,
-                debug_mode=True,
+                debug_mode=self.debug_mode,
                 show_members_responses=True,
+                # Streamed runs carry only the leader's events; forwarded member content would
+                # otherwise be emitted ahead of (and duplicated by) the leader's answer
+                stream_member_events=False,
             )
         except Exception as e:
             raise Exception(f"Failed to initialize team coordinator: {e}")
     
+    def _agent_factory(self, role: str, model_id: str):
+        """Zero-argument constructor for an analyst of `role` on `model_id`"""
+        return partial(self.ROLES[role], self.google_api_key, self.firecrawl_api_key, model_id,
+                       policy=self.policies[role])
+
+    def _pool(self, role: str, model_id: str) -> AgentPool:
+        """Pool of `role` analysts running on `model_id`"""
+        with self._pools_lock:
+            pool = self.pools.get((role, model_id))
+            if pool is None:
+                pool = AgentPool(self._agent_factory(role, model_id), size=self.pool_size)
+                self.pools[(role, model_id)] = pool
+            return pool
+
+    def _team_model(self, slot: str, model_id: str):
+        """Model instance for the team leader or one member slot (caller holds the team lock)"""
+        model = self._team_models.get((slot, model_id))
+        if model is None:
+            model = RateLimitedGemini(id=model_id, api_key=self.google_api_key)
+            self._team_models[(slot, model_id)] = model
+        return model
+
+    def _route_team(self, stage: str = None) -> tuple:
+        """(leader model, member model) for a team run
+
+        Free-form runs use the coordination and analysis models; a run for a
+        pipeline stage puts the whole team on that stage's model.
+        """
+        if stage is None:
+            return self.router.model_for("coordination"), self.router.model_for("analysis")
+        model_id = self.router.model_for(stage)
+        return model_id, model_id
+
+    def _apply_team_models(self, leader_model: str, member_model: str):
+        """Point the team and its members at the routed models (caller holds the team lock)"""
+        self.team.model = self._team_model("leader", leader_model)
+        for role, agent in self.agents.items():
+            agent.agent.model = self._team_model(role, member_model)
+
+    def _prepare_members(self, force_refresh: bool = False):
+        """Reset every team member's per-run state (caller holds the team lock)"""
+        for agent in self.agents.values():
+            agent._start_run(force_refresh)
+
+    def _record_member_budgets(self):
+        """Report the context tokens the team members' budgets saved in this run"""
+        record_context_saved(sum(agent.context_budget.tokens_saved for agent in self.agents.values()))
+
     def is_ready(self) -> bool:
         """Check if all agents and team are ready"""
         return (self.team is not None and 
@@ -56,8 +204,118 @@ class TeamCoordinator:
             for agent_name, agent in self.agents.items()
         }
     
+    def get_pool_stats(self) -> dict:
+        """Get checkout and wait-queue metrics of each analyst pool, keyed role@model"""
+        with self._pools_lock:
+            pools = dict(self.pools)
+        return {f"{role}@{model_id}": pool.stats() for (role, model_id), pool in pools.items()}
+
+    def get_routing_stats(self) -> dict:
+        """Get the model currently routed for each stage and observed per-model latency"""
+        return self.router.stats()
+
+    def get_resilience_stats(self) -> dict:
+        """Get per-role p95 latency and hedge counts, plus the shared circuit breakers"""
+        with self._hedge_lock:
+            roles = {
+                role: {"p95": self.latency[role].percentile(0.95), **self.hedges[role]}
+                for role in self.ROLES
+            }
+        return {"roles": roles, "breakers": get_breaker_stats()}
+
+    def _team_guard(self):
+        """Circuit breaker guard for team runs, shared with the analysts on the same Gemini key"""
+        return guarded(get_circuit_breaker("gemini", self.google_api_key), self.team_policy)
+
+    def get_flight_stats(self) -> dict:
+        """Get how many analysis calls were coalesced onto an in-flight run"""
+        return self.flights.stats()
+
+    def _flight_key(self, analysis_type: str, company_name: str, force_refresh: bool, mode: str) -> tuple:
+        """Coalescing key: analysis type, company id, model configuration and mode
+
+        Keyed on the company index id, so every spelling of one company joins the same flight
+        even while its display name changes.
+        """
+        return analysis_type, company_id(company_name), self.router.model_for("analysis"), force_refresh, mode
+
+    def _mode(self, mode: str = None) -> str:
+        mode = mode or self.analysis_mode
+        if mode not in self.ANALYSIS_MODES:
+            raise ValueError(f"Unknown analysis mode {mode!r}; expected one of {list(self.ANALYSIS_MODES)}")
+        return mode
+
+    def _member_prompt(self, analysis_type: str, company_name: str, force_refresh: bool, mode: str) -> tuple:
+        """(role, prompt, use_tools) for one analysis; research mode builds or reuses the company corpus"""
+        role, template = self.ANALYSES[analysis_type]
+        prompt = template.format(company_name=company_name)
+        if mode != "research":
+            return role, prompt, True
+        corpus = self.research.corpus(company_name, force_refresh)
+        return role, corpus_prompt(prompt, corpus), False
+
+    def _count_mode(self, mode: str, **counts):
+        with self._mode_lock:
+            for name, value in counts.items():
+                self.mode_stats[mode][name] += value
+
+    def _finish_analysis(self, analysis_type: str, company_name: str, mode: str, result: str, seconds: float):
+        """Count a finished analysis for its mode and keep it in the result store"""
+        self._count_mode(mode, analyses=1, seconds=seconds)
+        ANALYSIS_SECONDS.observe(seconds, analysis_type=analysis_type, mode=mode)
+        self.record_result(analysis_type, company_name, result, details={"analysis_mode": mode})
+
+    def _count_crawl(self, agent, use_tools: bool):
+        """Add the crawl volume of an analyst's last (uncached) run to its mode"""
+        crawl = agent.crawl_tools.crawl_stats()
+        self._count_mode("tools" if use_tools else "research", crawl_calls=crawl["calls"],
+                         crawl_fetches=crawl["fetches"], crawl_tokens=crawl["tokens"])
+
+    def get_mode_stats(self) -> dict:
+        """Per analysis mode: analyses, end-to-end seconds, crawl volume and analyze_all() batches
+
+        Research-mode crawl volume includes the research stage's corpus builds.
+        """
+        with self._mode_lock:
+            stats = {mode: dict(counts) for mode, counts in self.mode_stats.items()}
+        research = self.research.stats()
+        for name in ("crawl_calls", "crawl_fetches", "crawl_tokens"):
+            stats["research"][name] += research[name]
+        stats["research"]["corpus_builds"] = research["builds"]
+        stats["research"]["corpus_seconds"] = research["seconds"]
+        for counts in stats.values():
+            counts["seconds"] = round(counts["seconds"], 2)
+            counts["batch_seconds"] = round(counts["batch_seconds"], 2)
+            counts["avg_seconds"] = round(counts["seconds"] / counts["analyses"], 2) if counts["analyses"] else None
+            counts["avg_batch_seconds"] = (
+                round(counts["batch_seconds"] / counts["batches"], 2) if counts["batches"] else None
+            )
+        return stats
+
+    def model_config(self, stage: str = "analysis") -> dict:
+        """Models behind a result: the one routed for `stage` now and the configured one per stage"""
+        return {
+            "stage": stage,
+            "model_id": self.router.model_for(stage),
+            "stages": {name: self.config.model_for(name) for name in STAGES},
+        }
+
+    def record_result(self, analysis_type: str, company_name: str, content: str, stage: str = "analysis",
+                      details: dict = None):
+        """Save a finished analysis to the result store; a storage error never fails the analysis"""
+        try:
+            self.result_store.save(
+                company_name, analysis_type, content, model_config=self.model_config(stage), details=details
+            )
+        except sqlite3.Error as e:
+            print(f"⚠️  Could not store {analysis_type} analysis of {company_name}: {e}")
+
     def _extract_content(self, response):
         """Extract content from Agno response objects"""
+        with span("extract_content", response_type=type(response).__name__):
+            return self._content_of(response)
+
+    def _content_of(self, response):
         if response is None:
             return ""
         
@@ -78,40 +336,416 @@ class TeamCoordinator:
         # Fallback to string conversion
         return str(response)
     
-    def run_analysis(self, prompt: str):
-        """Run analysis using the coordinated team and return clean content"""
+    def _trace_team(self, stage: str, leader_model: str, member_model: str):
+        """Tracing span around one team run: the leader's routing call plus the member runs it delegates"""
+        return trace_run("team.run", stage=stage or "coordination", leader_model=leader_model,
+                         member_model=member_model)
+
+    def _record_team_run(self, stage: str, leader_model: str, seconds: float, response=None):
+        """Feed a team run's latency to the router and the metrics, and its tokens (when known) to the metrics
+
+        `response` is the TeamRunOutput or TeamRunCompleted event: the leader's
+        tokens are counted under the team, each delegated member run under its analyst.
+        """
+        self.router.record(leader_model, seconds)
+        TEAM_SECONDS.observe(seconds, stage=stage or "coordination")
+        if response is None:
+            return
+        runs = [(self.TEAM_NAME, response)] + [
+            (getattr(member, "agent_name", None) or "member", member)
+            for member in getattr(response, "member_responses", None) or []
+        ]
+        for name, run in runs:
+            input_tokens, output_tokens = token_counts(run)
+            AGENT_TOKENS.inc(input_tokens, agent=name, direction="input")
+            AGENT_TOKENS.inc(output_tokens, agent=name, direction="output")
+
+    def _team_cache_key(self, prompt: str, leader_model: str, member_model: str) -> str:
+        """Response cache key for a team-level prompt on the routed models"""
+        members = ",".join(f"{agent.get_agent_name()}@{member_model}" for agent in self.agents.values())
+        return self.response_cache.make_key(
+            self.TEAM_NAME, leader_model, "\n".join(self.TEAM_INSTRUCTIONS), members, prompt
+        )
+
+    def run_analysis(self, prompt: str, force_refresh: bool = False, stage: str = None):
+        """Run analysis using the coordinated team and return clean content
+
+        `stage` ("bullets", "report", ...) selects the routed model for the run.
+        """
         if not self.is_ready():
             raise ValueError("Team coordinator is not fully initialized")
-        
-        response = self.team.run(prompt)
-        return self._extract_content(response)
-    
-    def analyze_competitor(self, company_name: str):
-        """Analyze competitor using the Launch Analyst"""
+
+        leader_model, member_model = self._route_team(stage)
+        key = self._team_cache_key(prompt, leader_model, member_model)
+        if not force_refresh:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                record_cached()
+                return cached
+
+        with self._trace_team(stage, leader_model, member_model), self._team_lock, self._team_guard():
+            self._apply_team_models(leader_model, member_model)
+            self._prepare_members(force_refresh)
+            start = time.perf_counter()
+            response = check_run(self.team.run(prompt), self.TEAM_NAME)
+            self._record_team_run(stage, leader_model, time.perf_counter() - start, response)
+            self._record_member_budgets()
+        record_run(response)
+        content = self._extract_content(response)
+        if content:
+            self.response_cache.set(key, content, agent_name=self.TEAM_NAME, model_id=leader_model)
+        return content
+
+    def run_analysis_stream(self, prompt: str, force_refresh: bool = False, stage: str = None):
+        """Run analysis using the coordinated team, yielding content chunks as they arrive"""
         if not self.is_ready():
             raise ValueError("Team coordinator is not fully initialized")
 
-        response = self.agents['launch'].analyze(
-            f"Generate insights about {company_name}'s product launches."
-        )
+        leader_model, member_model = self._route_team(stage)
+        key = self._team_cache_key(prompt, leader_model, member_model)
+        if not force_refresh:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                record_cached()
+                yield cached
+                return
+
+        chunks = []
+        with self._trace_team(stage, leader_model, member_model), self._team_lock, self._team_guard():
+            self._apply_team_models(leader_model, member_model)
+            self._prepare_members(force_refresh)
+            start = time.perf_counter()
+            completed = []
+            # TeamRunCompleted (leader metrics and member runs) is only emitted with lifecycle events
+            for chunk in stream_content(self.team.run(prompt, stream=True, stream_events=True),
+                                        on_completed=completed.append):
+                chunks.append(chunk)
+                yield chunk
+            self._record_team_run(stage, leader_model, time.perf_counter() - start,
+                                  completed[-1] if completed else None)
+            self._record_member_budgets()
+        content = "".join(chunks)
+        if content:
+            self.response_cache.set(key, content, agent_name=self.TEAM_NAME, model_id=leader_model)
+
+    async def arun_analysis(self, prompt: str, timeout: float = None, force_refresh: bool = False,
+                            stage: str = None):
+        """Run analysis using the coordinated team without blocking the event loop"""
+        if not self.is_ready():
+            raise ValueError("Team coordinator is not fully initialized")
+
+        leader_model, member_model = self._route_team(stage)
+        key = self._team_cache_key(prompt, leader_model, member_model)
+        if not force_refresh:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                record_cached()
+                return cached
+
+        # Poll for the team lock so waiting never blocks the event loop
+        while not self._team_lock.acquire(blocking=False):
+            await asyncio.sleep(0.02)
+        try:
+            with self._trace_team(stage, leader_model, member_model), self._team_guard():
+                self._apply_team_models(leader_model, member_model)
+                self._prepare_members(force_refresh)
+                start = time.perf_counter()
+                try:
+                    response = await asyncio.wait_for(self.team.arun(prompt), timeout)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"{self.TEAM_NAME} did not respond within {timeout}s")
+                check_run(response, self.TEAM_NAME)
+                self._record_team_run(stage, leader_model, time.perf_counter() - start, response)
+                self._record_member_budgets()
+        finally:
+            self._team_lock.release()
+        record_run(response)
+        content = self._extract_content(response)
+        if content:
+            self.response_cache.set(key, content, agent_name=self.TEAM_NAME, model_id=leader_model)
+        return content
+
+    def _record_latency(self, role: str, model_id: str, seconds: float):
+        """Feed an uncached run's latency to the role's hedging tracker and the model router"""
+        self.latency[role].record(seconds)
+        self.router.record(model_id, seconds)
+
+    def _run_pooled(self, role: str, prompt: str, force_refresh: bool, model_id: str, use_tools: bool = True):
+        """One run on a pooled analyst; records the latency and crawl volume of real (uncached) runs"""
+        with self._pool(role, model_id).checkout() as agent:
+            start = time.perf_counter()
+            response = agent.analyze(prompt, force_refresh=force_refresh, use_tools=use_tools)
+            if not agent.served_from_cache:
+                self._record_latency(role, model_id, time.perf_counter() - start)
+                self._count_crawl(agent, use_tools)
         return self._extract_content(response)
-    
-    def analyze_sentiment(self, company_name: str):
-        """Analyze sentiment using the Sentiment Analyst"""
+
+    def _count_hedge(self, role: str, won: bool = False):
+        with self._hedge_lock:
+            self.hedges[role]["won" if won else "fired"] += 1
+        HEDGES.inc(role=role, outcome="won" if won else "fired")
+
+    def run_member(self, role: str, prompt: str, force_refresh: bool = False, stage: str = "analysis",
+                   use_tools: bool = True):
+        """Send a prompt straight to one analyst, skipping the team coordinator model
+
+        The analyst runs on the model routed for `stage`, without crawl tools
+        when `use_tools` is off. When hedging is enabled for the role and the run outlives the role's
+        p95 latency (or fixed hedge delay), a duplicate run is started on
+        another pooled analyst and the first successful answer wins.
+        """
         if not self.is_ready():
             raise ValueError("Team coordinator is not fully initialized")
 
-        response = self.agents['sentiment'].analyze(
-            f"Analyze the market sentiment for {company_name}."
+        model_id = self.router.model_for(stage)
+        delay = self.latency[role].hedge_delay(self.policies[role])
+        if delay is None:
+            return self._run_pooled(role, prompt, force_refresh, model_id, use_tools)
+
+        primary = self._hedge_executor.submit(
+            contextvars.copy_context().run, self._run_pooled, role, prompt, force_refresh, model_id, use_tools
         )
-        return self._extract_content(response)
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeout:
+            pass
+
+        hedge = self._hedge_executor.submit(
+            contextvars.copy_context().run, self._run_pooled, role, prompt, force_refresh, model_id, use_tools
+        )
+        self._count_hedge(role)
+        pending, error = {primary, hedge}, None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._count_hedge(role, won=True)
+                    # The slower run finishes in the background and returns its analyst
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def run_member_stream(self, role: str, prompt: str, force_refresh: bool = False, stage: str = "analysis",
+                          use_tools: bool = True):
+        """Streaming variant of run_member(); yields content chunks as they arrive"""
+        if not self.is_ready():
+            raise ValueError("Team coordinator is not fully initialized")
+
+        model_id = self.router.model_for(stage)
+        with self._pool(role, model_id).checkout() as agent:
+            start = time.perf_counter()
+            yield from agent.analyze_stream(prompt, force_refresh=force_refresh, use_tools=use_tools)
+            if not agent.served_from_cache:
+                self._record_latency(role, model_id, time.perf_counter() - start)
+                self._count_crawl(agent, use_tools)
+
+    def analyze(self, analysis_type: str, company_name: str, force_refresh: bool = False, mode: str = None):
+        """Run one analysis type with the analyst responsible for it
+
+        `mode` ("tools" or "research") overrides the coordinator's analysis mode.
+        """
+        if not self.is_ready():
+            raise ValueError("Team coordinator is not fully initialized")
+
+        mode = self._mode(mode)
+        # Spelling variants ("open ai", "OpenAI Inc.") share prompts, flights and cache entries
+        company_name = register_company(company_name)
+
+        def run():
+            start = time.perf_counter()
+            role, prompt, use_tools = self._member_prompt(analysis_type, company_name, force_refresh, mode)
+            result = self.run_member(role, prompt, force_refresh=force_refresh, use_tools=use_tools)
+            self._finish_analysis(analysis_type, company_name, mode, result, time.perf_counter() - start)
+            return result
+
+        with trace_run("coordinator.analyze", analysis_type=analysis_type, company=company_name, mode=mode):
+            return self.flights.do(self._flight_key(analysis_type, company_name, force_refresh, mode), run)
+
+    def analyze_stream(self, analysis_type: str, company_name: str, force_refresh: bool = False,
+                       mode: str = None):
+        """Streaming variant of analyze(); yields content chunks as the analyst writes them
+
+        A caller that joins an identical in-flight analysis receives the
+        finished text as a single chunk once the leading run completes.
+        """
+        if not self.is_ready():
+            raise ValueError("Team coordinator is not fully initialized")
+
+        mode = self._mode(mode)
+        company_name = register_company(company_name)
+        key = self._flight_key(analysis_type, company_name, force_refresh, mode)
+        future, leader = self.flights.join(key)
+        if not leader:
+            yield future.result()
+            return
+
+        start = time.perf_counter()
+        chunks = []
+        try:
+            with trace_run("coordinator.analyze", analysis_type=analysis_type, company=company_name, mode=mode):
+                role, prompt, use_tools = self._member_prompt(analysis_type, company_name, force_refresh, mode)
+                for chunk in self.run_member_stream(role, prompt, force_refresh=force_refresh, use_tools=use_tools):
+                    chunks.append(chunk)
+                    yield chunk
+        except BaseException as e:
+            self.flights.land(key, future, error=e)
+            raise
+        result = "".join(chunks)
+        self._finish_analysis(analysis_type, company_name, mode, result, time.perf_counter() - start)
+        self.flights.land(key, future, result=result)
+
+    async def aanalyze(self, analysis_type: str, company_name: str, timeout: float = None,
+                       force_refresh: bool = False, mode: str = None):
+        """Async variant of analyze(); raises TimeoutError once `timeout` seconds elapse"""
+        if not self.is_ready():
+            raise ValueError("Team coordinator is not fully initialized")
+
+        mode = self._mode(mode)
+        company_name = register_company(company_name)
+
+        async def run():
+            start = time.perf_counter()
+            # The research stage crawls synchronously; keep it off the event loop
+            role, prompt, use_tools = await asyncio.to_thread(
+                self._member_prompt, analysis_type, company_name, force_refresh, mode
+            )
+            result = await self._arun_member(role, prompt, timeout, force_refresh, use_tools=use_tools)
+            self._finish_analysis(analysis_type, company_name, mode, result, time.perf_counter() - start)
+            return result
+
+        with trace_run("coordinator.analyze", analysis_type=analysis_type, company=company_name, mode=mode):
+            return await self.flights.ado(self._flight_key(analysis_type, company_name, force_refresh, mode), run)
+
+    async def _arun_member(self, role: str, prompt: str, timeout: float = None, force_refresh: bool = False,
+                           stage: str = "analysis", use_tools: bool = True):
+        """Async pooled run with the same hedging policy as run_member(); the losing run is cancelled"""
+        model_id = self.router.model_for(stage)
+
+        async def attempt():
+            async with self._pool(role, model_id).acheckout(timeout=timeout) as agent:
+                start = time.perf_counter()
+                response = await agent.aanalyze(prompt, timeout=timeout, force_refresh=force_refresh,
+                                                use_tools=use_tools)
+                if not agent.served_from_cache:
+                    self._record_latency(role, model_id, time.perf_counter() - start)
+                    self._count_crawl(agent, use_tools)
+            return self._extract_content(response)
+
+        delay = self.latency[role].hedge_delay(self.policies[role])
+        if delay is None:
+            return await attempt()
+
+        tasks = [asyncio.ensure_future(attempt())]
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                tasks.append(asyncio.ensure_future(attempt()))
+                self._count_hedge(role)
+                pending = set(tasks)
+            error = None
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        if task is not tasks[0]:
+                            self._count_hedge(role, won=True)
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    raise error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def analyze_competitor(self, company_name: str, force_refresh: bool = False):
+        """Analyze competitor using the Launch Analyst"""
+        return self.analyze("competitor", company_name, force_refresh=force_refresh)
+    
+    def analyze_sentiment(self, company_name: str, force_refresh: bool = False):
+        """Analyze sentiment using the Sentiment Analyst"""
+        return self.analyze("sentiment", company_name, force_refresh=force_refresh)
     
-    def analyze_metrics(self, company_name: str):
+    def analyze_metrics(self, company_name: str, force_refresh: bool = False):
         """Analyze metrics using the Metrics Analyst"""
+        return self.analyze("metrics", company_name, force_refresh=force_refresh)
+
+    async def aanalyze_competitor(self, company_name: str, timeout: float = None, force_refresh: bool = False):
+        """Analyze competitor asynchronously using the Launch Analyst"""
+        return await self.aanalyze("competitor", company_name, timeout=timeout, force_refresh=force_refresh)
+
+    async def aanalyze_sentiment(self, company_name: str, timeout: float = None, force_refresh: bool = False):
+        """Analyze sentiment asynchronously using the Sentiment Analyst"""
+        return await self.aanalyze("sentiment", company_name, timeout=timeout, force_refresh=force_refresh)
+
+    async def aanalyze_metrics(self, company_name: str, timeout: float = None, force_refresh: bool = False):
+        """Analyze metrics asynchronously using the Metrics Analyst"""
+        return await self.aanalyze("metrics", company_name, timeout=timeout, force_refresh=force_refresh)
+
+    def analyze_all(self, company_name: str, max_workers: int = None, force_refresh: bool = False,
+                    mode: str = None):
+        """Run every analysis concurrently and yield results as each one finishes
+
+        Yields (analysis_type, result, error) tuples in completion order, so the
+        total wall-clock time is roughly that of the slowest analyst. A failing
+        analyst does not cancel the others; its exception is yielded as `error`.
+        In research mode the analysts wait for one shared corpus build. Closing
+        the generator early returns at once: queued analysts are cancelled and
+        running ones finish in the background.
+        """
         if not self.is_ready():
             raise ValueError("Team coordinator is not fully initialized")
 
-        response = self.agents['metrics'].analyze(
-            f"Analyze the performance metrics for {company_name}."
-        )
-        return self._extract_content(response)
\ No newline at end of file
+        mode = self._mode(mode)
+        company_name = register_company(company_name)
+        workers = max_workers or len(self.ANALYSES)
+        start = time.perf_counter()
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analyst")
+        try:
+            with trace_run("coordinator.analyze_all", company=company_name, mode=mode):
+                # Each analyst thread keeps the caller's trace run
+                futures = {
+                    executor.submit(
+                        contextvars.copy_context().run, self.analyze, analysis_type, company_name, force_refresh, mode
+                    ): analysis_type
+                    for analysis_type in self.ANALYSES
+                }
+                for future in as_completed(futures):
+                    analysis_type = futures[future]
+                    try:
+                        yield analysis_type, future.result(), None
+                    except Exception as e:
+                        yield analysis_type, None, e
+        finally:
+            # A consumer that stops early (e.g. a cancelled job closing the generator) must not
+            # wait for the analysts still running; their results are dropped
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._count_mode(mode, batches=1, batch_seconds=time.perf_counter() - start)
+
+    async def aanalyze_all(self, company_name: str, timeout: float = None, force_refresh: bool = False,
+                           mode: str = None):
+        """Async variant of analyze_all(); `timeout` applies to each analyst separately
+
+        Cancelling the consuming task cancels every analyst that is still running.
+        """
+        if not self.is_ready():
+            raise ValueError("Team coordinator is not fully initialized")
+
+        mode = self._mode(mode)
+        company_name = register_company(company_name)
+        start = time.perf_counter()
+
+        async def run(analysis_type):
+            try:
+                return analysis_type, await self.aanalyze(analysis_type, company_name, timeout, force_refresh, mode), None
+            except Exception as e:
+                return analysis_type, None, e
+
+        tasks = [asyncio.ensure_future(run(analysis_type)) for analysis_type in self.ANALYSES]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+            self._count_mode(mode, batches=1, batch_seconds=time.perf_counter() - start)
+        finally:
+            for task in tasks:
+                task.cancel()
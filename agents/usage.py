@@ -0,0 +1,79 @@
+# agents/usage.py
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+
+@dataclass
+class Usage:
+    """Token and call counts accumulated while a usage tracker is active"""
+    input_tokens: int = 0
+    output_tokens: int = 0
+    model_calls: int = 0
+    cached_calls: int = 0
+    # Crawled-content tokens kept out of model context by the context budget
+    context_tokens_saved: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+
+_current_usage = ContextVar("current_usage", default=None)
+
+
+@contextmanager
+def track_usage():
+    """Collect usage of every agent/team run made inside the block (same thread or task)"""
+    usage = Usage()
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+
+def token_counts(response) -> tuple:
+    """Return (input_tokens, output_tokens) from an agno run output or completion event"""
+    metrics = getattr(response, "metrics", None)
+    if metrics is None:
+        return 0, 0
+
+    # agno 1.x reports a list of per-message counts in a dict
+    if isinstance(metrics, dict):
+        def total(value):
+            return sum(value) if isinstance(value, list) else (value or 0)
+        return total(metrics.get("input_tokens", 0)), total(metrics.get("output_tokens", 0))
+
+    return getattr(metrics, "input_tokens", 0) or 0, getattr(metrics, "output_tokens", 0) or 0
+
+
+def record_run(response):
+    """Add a completed model run to the active tracker, if any
+
+    A team run counts as the leader's run plus the run of every member it
+    delegated to (TeamRunOutput / TeamRunCompleted `member_responses`).
+    """
+    usage = _current_usage.get()
+    if usage is None:
+        return
+    input_tokens, output_tokens = token_counts(response)
+    usage.model_calls += 1
+    usage.input_tokens += input_tokens
+    usage.output_tokens += output_tokens
+    for member in getattr(response, "member_responses", None) or []:
+        record_run(member)
+
+
+def record_context_saved(tokens: int):
+    """Add tokens trimmed from crawled content by a context budget"""
+    usage = _current_usage.get()
+    if usage is not None and tokens:
+        usage.context_tokens_saved += tokens
+
+
+def record_cached():
+    """Count a call that was answered from the response cache"""
+    usage = _current_usage.get()
+    if usage is not None:
+        usage.cached_calls += 1
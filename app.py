@@ -9,12 +9,21 @@ from ui.layouts.main_layout import MainLayout
 from ui.components.agent_cards import AgentCards
 from ui.components.analysis_tabs import AnalysisTabs
 from ui.components.sidebar import Sidebar
-from ui.components.results_display import ResultsDisplay
 from ui.utils.visual_helpers import VisualHelpers
 from ui.components.report_generator import ReportGenerator
+from ui.utils import jobs
 
 # Import business logic
-from agents.team_coordinator import TeamCoordinator
+from agents.registry import get_coordinator
+from services.company_index import canonical_company
+from services.insight_parser import parse_insights, to_csv
+from services.job_runner import DONE, FAILED, get_job_runner
+
+ANALYSIS_LABELS = {
+    "competitor": "🎯 Competitor analysis",
+    "sentiment": "💬 Market sentiment",
+    "metrics": "📊 Performance metrics",
+}
 
 class ProductIntelligenceApp:
     def __init__(self):
@@ -57,31 +66,20 @@ class ProductIntelligenceApp:
             st.session_state.company_name = ""
         if "api_keys_configured" not in st.session_state:
             st.session_state.api_keys_configured = False
-        if "analysis_history" not in st.session_state:
-            st.session_state.analysis_history = []
-        if "analysis_in_progress" not in st.session_state:
-            st.session_state.analysis_in_progress = False
+        if "analysis_jobs" not in st.session_state:
+            st.session_state.analysis_jobs = {}
     
     def _initialize_system(self, google_key: str, firecrawl_key: str):
         """Initialize the multi-agent system"""
         try:
-            if not self.system or not self.system.is_ready():
-                self.system = TeamCoordinator(google_key, firecrawl_key)
-                st.session_state.api_keys_configured = True
-                return True
+            # The registry hands back the already-built coordinator on every rerun
+            self.system = get_coordinator(google_key, firecrawl_key)
+            st.session_state.api_keys_configured = True
             return True
         except Exception as e:
             st.error(f"❌ Failed to initialize system: {e}")
             return False
     
-    def _add_to_history(self, company_name: str):
-        """Add analysis to history"""
-        from datetime import datetime
-        analysis_entry = (company_name, datetime.now().strftime("%Y-%m-%d %H:%M"))
-        st.session_state.analysis_history.append(analysis_entry)
-        # Keep only last 5 entries
-        st.session_state.analysis_history = st.session_state.analysis_history[-5:]
-    
     def render_company_input(self):
         """Render enhanced company input section with better placement"""
         st.markdown("---")
@@ -105,6 +103,9 @@ class ProductIntelligenceApp:
         )
 
         if company_name:
+            typed, company_name = company_name, canonical_company(company_name)
+            if " ".join(typed.split()) != company_name:
+                st.caption(f"Matched “{typed.strip()}” to {company_name}")
             st.session_state.company_name = company_name
 
         return company_name
@@ -123,49 +124,23 @@ class ProductIntelligenceApp:
 
         # Add the analyze button to trigger all agents
         st.markdown("---")
-        if st.button("🔍 Analyze All", type="primary", use_container_width=True):
-            try:
-                st.session_state.analysis_in_progress = True
-                progress_text = st.empty()
-                progress_bar = st.progress(0)
-                
-                # Reset results
-                st.session_state.competitor_result = None
-                st.session_state.sentiment_result = None
-                st.session_state.metrics_result = None
-                
-                # Run competitor analysis
-                progress_text.text("🎯 Analyzing competitor data...")
-                competitor_result = self.system.analyze_competitor(company_name)
-                st.session_state.competitor_result = competitor_result
-                progress_bar.progress(33)
-                
-                # Run sentiment analysis
-                progress_text.text("💬 Analyzing market sentiment...")
-                sentiment_result = self.system.analyze_sentiment(company_name)
-                st.session_state.sentiment_result = sentiment_result
-                progress_bar.progress(66)
-                
-                # Run metrics analysis
-                progress_text.text("📊 Analyzing performance metrics...")
-                metrics_result = self.system.analyze_metrics(company_name)
-                st.session_state.metrics_result = metrics_result
-                progress_bar.progress(100)
-                
-                progress_text.text("✅ Analysis complete! Generating reports...")
-                
-                # Clear caches when new analysis is done
-                st.session_state.report_cache_pdf = None
-                st.session_state.report_cache_html = None
-                st.session_state.last_report_company = company_name
-                
-                st.success("✅ Full analysis complete!")
-                st.balloons()
-                
-            except Exception as e:
-                st.error(f"❌ Analysis failed: {str(e)}")
-            finally:
-                st.session_state.analysis_in_progress = False
+        force_refresh = st.checkbox(
+            "♻️ Force refresh",
+            key="force_refresh",
+            help="Ignore cached responses and re-run the analysts against live data"
+        )
+        key = jobs.job_key("all", company_name, force_refresh, self.system)
+        job = jobs.current("all", key)
+        running = job is not None and not job.finished
+        if st.button("🔍 Analyze All", type="primary", use_container_width=True, disabled=running):
+            # Reset results
+            st.session_state.competitor_result = None
+            st.session_state.sentiment_result = None
+            st.session_state.metrics_result = None
+            jobs.submit("all", self._analyze_all_job(company_name, force_refresh), key,
+                        label=f"Analyze All: {company_name}")
+            job = jobs.current("all", key)
+        self._render_analyze_all_job(job, company_name)
 
         # Display analysis tabs
         AnalysisTabs.render(company_name, self.system)
@@ -180,7 +155,7 @@ class ProductIntelligenceApp:
         
         # Render inline report download controls using the existing generate_report
         # and the lightweight UI ReportGenerator for raw text export.
-        col1, col2, col3 = st.columns([1, 1, 1])
+        col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
         with col1:
             if st.button("📥 Generate & Download PDF", key="download_pdf"):
                 self.generate_report(company_name, report_type='pdf')
@@ -205,11 +180,77 @@ class ProductIntelligenceApp:
                     mime="text/plain",
                 )
 
-        # Update analysis history if we have results
-        if any([st.session_state.get('competitor_result'), st.session_state.get('sentiment_result'), st.session_state.get('metrics_result')]):
-            if company_name not in [entry[0] for entry in st.session_state.analysis_history]:
-                self._add_to_history(company_name)
-    
+        with col4:
+            # Tagged insights parsed locally from the stored results; no model call needed
+            insights = {
+                analysis_type: parse_insights(st.session_state.get(f"{analysis_type}_result") or "")
+                for analysis_type in ANALYSIS_LABELS
+            }
+            st.download_button(
+                label="🧾 Download Insights (CSV)",
+                data=to_csv(insights),
+                file_name=f"{company_name}_insights.csv",
+                mime="text/csv",
+                key="download_insights",
+                disabled=not any(insights.values()),
+            )
+
+    def _analyze_all_job(self, company_name: str, force_refresh: bool):
+        """Background work for "Analyze All": publishes each analyst's result as it finishes"""
+        system = self.system
+
+        def work(handle):
+            failures = []
+            for completed, (analysis_type, result, error) in enumerate(
+                system.analyze_all(company_name, force_refresh=force_refresh), start=1
+            ):
+                label = ANALYSIS_LABELS[analysis_type]
+                if error is None:
+                    handle.add_result(analysis_type, result)
+                    message = f"{label} ready ({completed}/{len(ANALYSIS_LABELS)})"
+                else:
+                    failures.append(f"{label}: {error}")
+                    message = f"{label} failed ({completed}/{len(ANALYSIS_LABELS)})"
+                handle.update(progress=completed / len(ANALYSIS_LABELS), message=message)
+            if failures:
+                raise Exception("; ".join(failures))
+
+        return work
+
+    def _render_analyze_all_job(self, job, company_name: str):
+        """Show the progress of the background "Analyze All" job and apply its results"""
+        if job is None:
+            return
+
+        # Finished analysts are shown as soon as they land, even while others still run
+        just_finished = jobs.consume(job)
+        if not job.finished or just_finished:
+            for analysis_type, result in job.results.items():
+                st.session_state[f"{analysis_type}_result"] = result
+
+        if not job.finished:
+            st.info(f"🤖 {job.message or 'Analysts are gathering competitor, sentiment and metrics data...'}")
+            st.progress(job.progress)
+            if st.button("⏹️ Cancel", key="cancel_all"):
+                get_job_runner().cancel(job.id)
+                st.rerun()
+            return
+
+        if just_finished:
+            # Clear caches when new analysis is done
+            st.session_state.report_cache_pdf = None
+            st.session_state.report_cache_html = None
+            st.session_state.last_report_company = company_name
+            if job.status == DONE:
+                st.balloons()
+
+        if job.status == DONE:
+            st.success(f"✅ Full analysis complete! ({job.seconds:.0f}s)")
+        elif job.status == FAILED:
+            st.error(f"❌ Analysis failed: {job.error}")
+        else:
+            st.warning("⏹️ Analysis cancelled")
+
     # ...existing code...
 
     def _render_welcome_state(self):
@@ -354,6 +395,8 @@ class ProductIntelligenceApp:
                 # Render main application content
                 company_name = self.render_company_input()
                 self.render_main_dashboard(company_name)
+                # Keep refreshing while analyses run in the background
+                jobs.poll_active()
             else:
                 st.error("⚠️ Please check your API keys and try again.")
         else:
@@ -0,0 +1,74 @@
+# batch_analyze.py
+"""Headless batch analysis of many companies from a CSV file
+
+    python batch_analyze.py companies.csv --output batch_output --workers 4
+
+Re-running the same command after an interruption resumes from the checkpoint
+in the output directory.
+"""
+import argparse
+import os
+import sys
+from dotenv import load_dotenv
+from agents.registry import get_coordinator
+from services.batch_runner import BatchRunner, load_companies
+from services.metrics import start_metrics_server, write_metrics
+
+
+def main(argv=None):
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Run competitor, sentiment and metrics analyses for every company in a CSV file.")
+    parser.add_argument("csv_path", help="CSV with a `company` column (or company names in the first column)")
+    parser.add_argument("--output", default="batch_output", help="Directory for the checkpoint, results and reports")
+    parser.add_argument("--workers", type=int, default=4, help="Maximum analyses running at once across all companies")
+    parser.add_argument("--formats", nargs="+", default=["html", "pdf"], choices=["html", "pdf"],
+                        help="Report formats to write per company")
+    parser.add_argument("--force-refresh", action="store_true", help="Bypass the response cache")
+    parser.add_argument("--analysis-mode", choices=["tools", "research"], default=None,
+                        help="tools: each analyst crawls on its own; research: one shared crawl per company "
+                             "(default: ANALYSIS_MODE or tools)")
+    parser.add_argument("--metrics-port", type=int, default=os.getenv("METRICS_PORT"),
+                        help="Serve Prometheus metrics on this port while the batch runs (default: METRICS_PORT)")
+    parser.add_argument("--metrics-file", help="Write the final metrics here (node_exporter textfile format)")
+    parser.add_argument("--google-key", default=os.getenv("Google_API_KEY") or os.getenv("GOOGLE_API_KEY"))
+    parser.add_argument("--firecrawl-key", default=os.getenv("FIRECRAWL_API_KEY"))
+    args = parser.parse_args(argv)
+
+    if not args.google_key or not args.firecrawl_key:
+        parser.error("Google and Firecrawl API keys are required (flags or Google_API_KEY / FIRECRAWL_API_KEY)")
+
+    companies = load_companies(args.csv_path)
+    if not companies:
+        parser.error(f"No companies found in {args.csv_path}")
+
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port)
+
+    # One analyst instance per worker so the pools never become the bottleneck
+    coordinator = get_coordinator(args.google_key, args.firecrawl_key, pool_size=args.workers)
+    runner = BatchRunner(
+        coordinator,
+        output_dir=args.output,
+        max_workers=args.workers,
+        report_formats=args.formats,
+        force_refresh=args.force_refresh,
+        analysis_mode=args.analysis_mode,
+    )
+    summary = runner.run(companies)
+    if args.metrics_file:
+        write_metrics(args.metrics_file)
+
+    print(f"\n🏁 {summary['completed']}/{summary['companies']} companies complete, "
+          f"{summary['analyses_run']} analyses run in {summary['seconds']}s")
+    mode = args.analysis_mode or coordinator.analysis_mode
+    stats = coordinator.get_mode_stats()[mode]
+    print(f"🕸️  {mode} mode: {stats['crawl_calls']} crawl calls ({stats['crawl_fetches']} fetched from Firecrawl, "
+          f"~{stats['crawl_tokens']} tokens), {stats['avg_seconds']}s per analysis")
+    if summary["failures"]:
+        print(f"❌ {len(summary['failures'])} analyses failed; re-run the same command to retry them")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
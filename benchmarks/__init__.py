@@ -0,0 +1,12 @@
+# benchmarks/__init__.py
+"""Offline end-to-end benchmarks
+
+    python -m benchmarks                              # every scenario, default latencies
+    python -m benchmarks -s pipeline_fused -n 20      # one scenario, 20 iterations
+    python -m benchmarks --json results.json          # save results as a baseline
+    python -m benchmarks --baseline results.json      # exit 1 if any p95 regressed
+    python -m benchmarks.imports                      # cold-start import time per module
+
+Gemini and Firecrawl are replaced by deterministic in-process fakes
+(benchmarks.fakes), so no API keys or network access are needed.
+"""
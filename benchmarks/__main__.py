@@ -0,0 +1,97 @@
+# benchmarks/__main__.py
+import argparse
+import json
+import shutil
+import sys
+from benchmarks.scenarios import configure_environment
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Offline benchmarks of the analysis, pipeline and report paths with fake Gemini / Firecrawl backends",
+    )
+    parser.add_argument("-s", "--scenario", action="append",
+                        help="Scenario to run (repeatable; default: all, see --list)")
+    parser.add_argument("--list", action="store_true", help="List the scenarios and exit")
+    parser.add_argument("-n", "--iterations", type=int, default=10, help="Measured iterations per scenario")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured iterations before each scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel analyses in analyze_concurrent")
+    parser.add_argument("--time-scale", type=float, default=0.01,
+                        help="Multiplier on every simulated latency (1 = real-world timings)")
+    parser.add_argument("--model-latency", type=float, default=4.0, help="Median seconds per model request")
+    parser.add_argument("--crawl-latency", type=float, default=1.5, help="Median seconds per Firecrawl request")
+    parser.add_argument("--sigma", type=float, default=0.5, help="Log-normal spread of the latencies (0 = fixed)")
+    parser.add_argument("--output-tokens", type=int, default=600, help="Approximate tokens per model answer")
+    parser.add_argument("--page-kb", type=float, default=20, help="Size of each fake crawled page in KB")
+    parser.add_argument("--searches", type=int, default=1, help="Searches per analyst tool turn")
+    parser.add_argument("--pages", type=int, default=3, help="Scrapes per analyst tool turn")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Skip tracemalloc (it slows allocation-heavy scenarios down)")
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results to compare against; exit 1 on a p95 regression")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95 slowdown vs. the baseline")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch directory with caches and traces")
+    args = parser.parse_args()
+
+    workdir = configure_environment()
+    # Imported after the environment points the caches at the scratch directory
+    from agents.team_coordinator import TeamCoordinator
+    from benchmarks.fakes import FakeFirecrawl, FakeGemini, Latency, offline
+    from benchmarks.scenarios import Scenarios, measure, regressions
+
+    gemini = FakeGemini(Latency(args.model_latency, args.sigma), output_tokens=args.output_tokens,
+                        searches=args.searches, pages=args.pages, time_scale=args.time_scale)
+    firecrawl = FakeFirecrawl(Latency(args.crawl_latency, args.sigma), page_kb=args.page_kb,
+                              time_scale=args.time_scale)
+    try:
+        with offline(gemini, firecrawl):
+            coordinator = TeamCoordinator("offline-google-key", "offline-firecrawl-key")
+            scenarios = Scenarios(coordinator, concurrency=args.concurrency)
+            if args.list:
+                for name, (description, _, _) in scenarios.registry.items():
+                    print(f"{name:<24}{description}")
+                return 0
+            unknown = set(args.scenario or []) - set(scenarios.registry)
+            if unknown:
+                parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+            results = []
+            print(f"{'scenario':<24}{'iter':>6}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak MB':>10}")
+            for name in args.scenario or scenarios.registry:
+                _, operations, scenario = scenarios.registry[name]
+                result = measure(name, operations, scenario, args.iterations, args.warmup,
+                                 track_memory=not args.no_memory)
+                results.append(result)
+                if result.failed:
+                    print(f"{name:<24}  ❌ failed: {result.error}")
+                elif result.error:
+                    print(f"{name:<24}  skipped: {result.error}")
+                else:
+                    print(f"{name:<24}{result.iterations:>6}{result.throughput:>10.2f}{result.p50_ms:>10.1f}"
+                          f"{result.p95_ms:>10.1f}{result.p99_ms:>10.1f}{result.peak_mb:>10.2f}")
+            print(f"\nFake backends: {gemini.calls} model requests, {firecrawl.fetches} Firecrawl requests")
+    finally:
+        if args.keep:
+            print(f"Caches and traces kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({result.scenario: result.to_dict() for result in results}, f, indent=2)
+    if any(result.failed for result in results):
+        return 1
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            slower = regressions(results, json.load(f), args.tolerance)
+        for name, before, after in slower:
+            print(f"❌ {name}: p95 {before:.1f} ms -> {after:.1f} ms")
+        if slower:
+            return 1
+        print(f"✅ No p95 regression beyond {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
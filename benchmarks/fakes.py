@@ -0,0 +1,308 @@
+# benchmarks/fakes.py
+"""Deterministic in-process stand-ins for Gemini and Firecrawl
+
+FakeGemini replaces the request methods of agno's Gemini model, so agents and
+the team still go through agno's real run loop, tool execution, the rate
+limiter, caches and circuit breakers; only the network call is simulated.
+An analyst's first model turn calls its search / scrape tools, the team leader
+delegates to the member whose name matches the prompt, and every final answer
+is a set of tagged, sourced bullets shaped like the real prompts ask for.
+
+FakeFirecrawl replaces FirecrawlTools' network methods and the fingerprint
+store's HEAD request with generated pages of a configurable size.
+
+Latencies are drawn from seeded log-normal distributions and multiplied by
+`time_scale`, so a benchmark can simulate multi-second model calls in a few
+milliseconds while keeping their relative shape.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from agno.models.google import Gemini
+from agno.models.response import ModelResponse
+from agno.tools.firecrawl import FirecrawlTools
+from services.page_fingerprints import FingerprintStore
+
+try:
+    from agno.metrics import MessageMetrics
+except ImportError:  # older agno releases report usage differently; token counts are then omitted
+    MessageMetrics = None
+
+MEMBER = re.compile(r'<member id="([^"]+)" name="([^"]+)"')
+# Analysis kind -> words in the name of the team member that handles it
+MEMBER_NAMES = {"competitor": "product launch", "sentiment": "sentiment", "metrics": "metrics"}
+TAGS = {
+    "competitor": ("Positioning", "Strength", "Weakness", "Learning"),
+    "sentiment": ("Positive", "Negative", "Neutral"),
+    "metrics": ("KPI", "Signal"),
+}
+SOURCES = ("https://techcrunch.com/launch", "G2", "Reddit", "https://www.theverge.com/review", "Product Hunt")
+
+
+@dataclass
+class Latency:
+    """Log-normal latency in seconds: `median` and the spread `sigma` (0 = fixed)"""
+    median: float
+    sigma: float = 0.4
+
+    def sample(self, rng: random.Random, time_scale: float = 1.0) -> float:
+        value = self.median * (rng.lognormvariate(0, self.sigma) if self.sigma else 1.0)
+        return value * time_scale
+
+
+def _rng(*parts) -> random.Random:
+    """RNG seeded from the request itself, so results do not depend on thread scheduling"""
+    digest = hashlib.sha256("\x00".join(map(str, parts)).encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def _kind(prompt: str) -> str:
+    """Analysis kind a prompt asks for, judged from its opening (report prompts quote bullets further down)"""
+    head = prompt[:400].lower()
+    if "sentiment" in head:
+        return "sentiment"
+    if "kpi" in head or "performance metrics" in head:
+        return "metrics"
+    return "competitor"
+
+
+def _text(message) -> str:
+    content = getattr(message, "content", None)
+    return content if isinstance(content, str) else json.dumps(content, default=str) if content else ""
+
+
+class FakeGemini:
+    """Simulated Gemini backend: configurable latency, answer length and tool use"""
+
+    def __init__(self, latency: Latency = None, stream_chunk_tokens: int = 24, output_tokens: int = 500,
+                 searches: int = 1, pages: int = 3, time_scale: float = 1.0):
+        self.latency = latency or Latency(2.0)
+        self.stream_chunk_tokens = stream_chunk_tokens
+        self.output_tokens = output_tokens
+        self.searches = searches
+        self.pages = pages
+        self.time_scale = time_scale
+        self.calls = 0
+
+    # ---- decisions -------------------------------------------------------
+    def _turn(self, model_id: str, messages: list, tools: list) -> tuple:
+        """(delay seconds, ModelResponse) for one model request"""
+        self.calls += 1
+        names = {(tool.get("function") or tool).get("name") for tool in tools or []}
+        prompt = next((_text(m) for m in reversed(messages) if m.role == "user"), "")
+        answered_tools = messages and messages[-1].role == "tool"
+        rng = _rng(model_id, prompt, len(messages))
+        delay = self.latency.sample(rng, self.time_scale)
+
+        if not answered_tools and "delegate_task_to_member" in names:
+            member = self._pick_member(messages, prompt)
+            if member:
+                return delay, self._response(messages, tool_calls=[
+                    self._tool_call(rng, "delegate_task_to_member", member_id=member, task=prompt)
+                ])
+        if not answered_tools and names & {"search_web", "scrape_website"}:
+            calls = []
+            if "search_web" in names:
+                calls += [self._tool_call(rng, "search_web", query=f"{prompt[:60]} {i}") for i in range(self.searches)]
+            if "scrape_website" in names:
+                topic = hashlib.md5(prompt.encode("utf-8")).hexdigest()[:8]
+                calls += [
+                    self._tool_call(rng, "scrape_website", url=f"https://example-{rng.randrange(12)}.com/{topic}")
+                    for _ in range(self.pages)
+                ]
+            if calls:
+                return delay, self._response(messages, tool_calls=calls)
+        if answered_tools and "delegate_task_to_member" in names:
+            # The leader writes its answer from the member's output
+            return delay, self._response(messages, content=_text(messages[-1]) or self._answer(prompt, rng))
+        return delay, self._response(messages, content=self._answer(prompt, rng))
+
+    @staticmethod
+    def _pick_member(messages: list, prompt: str) -> str:
+        system = next((_text(m) for m in messages if m.role == "system"), "")
+        members = MEMBER.findall(system)
+        wanted = MEMBER_NAMES[_kind(prompt)]
+        for member_id, name in members:
+            if wanted in name.lower():
+                return member_id
+        return members[0][0] if members else None
+
+    @staticmethod
+    def _tool_call(rng: random.Random, name: str, **arguments) -> dict:
+        return {
+            "id": f"call_{rng.getrandbits(48):012x}",
+            "type": "function",
+            "function": {"name": name, "arguments": json.dumps(arguments)},
+        }
+
+    def _answer(self, prompt: str, rng: random.Random) -> str:
+        """Tagged bullets (or the fused bullets + report layout) of roughly `output_tokens`"""
+        kind = _kind(prompt)
+        words = ("adoption", "pricing", "onboarding", "enterprise", "developer", "community", "retention",
+                 "integration", "launch", "messaging", "benchmark", "latency", "support", "roadmap")
+        bullets = []
+        while sum(len(b) for b in bullets) // 4 < self.output_tokens:
+            tag = rng.choice(TAGS[kind])
+            statement = " ".join(rng.choice(words) for _ in range(rng.randint(8, 20)))
+            if tag == "KPI":
+                statement = f"{rng.choice(words).title()} rate: {rng.randint(5, 95)}%"
+            bullets.append(f"- {tag}: {statement.capitalize()} (Source: {rng.choice(SOURCES)})")
+        text = "\n".join(bullets)
+        if "=== BULLETS ===" in prompt:
+            text = f"=== BULLETS ===\n{text}\n=== REPORT ===\n# Report\n\n{text}"
+        return f"{text}\n\nSources:\n" + "\n".join(f"- {s}" for s in SOURCES if "://" in s)
+
+    @staticmethod
+    def _response(messages: list, content: str = None, tool_calls: list = None) -> ModelResponse:
+        response = ModelResponse(role="assistant", content=content, tool_calls=tool_calls or [])
+        if MessageMetrics is not None:
+            input_tokens = sum(len(_text(m)) for m in messages) // 4
+            output_tokens = len(content or json.dumps(tool_calls)) // 4
+            response.response_usage = MessageMetrics(
+                input_tokens=input_tokens, output_tokens=output_tokens, total_tokens=input_tokens + output_tokens
+            )
+        return response
+
+    def _chunks(self, response: ModelResponse):
+        """Split a response into stream deltas: tool calls in one delta, content in small pieces"""
+        if response.tool_calls:
+            yield response
+            return
+        size = self.stream_chunk_tokens * 4
+        content = response.content or ""
+        for start in range(0, len(content), size):
+            yield ModelResponse(role="assistant", content=content[start:start + size])
+        yield ModelResponse(response_usage=response.response_usage)
+
+    # ---- agno model methods ----------------------------------------------
+    def install(self):
+        """Patch agno's Gemini; returns the originals for uninstall()"""
+        fake = self
+        originals = {name: getattr(Gemini, name) for name in ("invoke", "invoke_stream", "ainvoke", "ainvoke_stream")}
+
+        def invoke(model, messages, assistant_message=None, tools=None, **kwargs):
+            delay, response = fake._turn(model.id, messages, tools)
+            time.sleep(delay)
+            return response
+
+        def invoke_stream(model, messages, assistant_message=None, tools=None, **kwargs):
+            delay, response = fake._turn(model.id, messages, tools)
+            # Time to first token, then the rest of the answer trickles in
+            time.sleep(delay * 0.6)
+            chunks = list(fake._chunks(response))
+            for chunk in chunks:
+                time.sleep(delay * 0.4 / len(chunks))
+                yield chunk
+
+        async def ainvoke(model, messages, assistant_message=None, tools=None, **kwargs):
+            delay, response = fake._turn(model.id, messages, tools)
+            await asyncio.sleep(delay)
+            return response
+
+        async def ainvoke_stream(model, messages, assistant_message=None, tools=None, **kwargs):
+            delay, response = fake._turn(model.id, messages, tools)
+            await asyncio.sleep(delay * 0.6)
+            chunks = list(fake._chunks(response))
+            for chunk in chunks:
+                await asyncio.sleep(delay * 0.4 / len(chunks))
+                yield chunk
+
+        Gemini.invoke, Gemini.invoke_stream = invoke, invoke_stream
+        Gemini.ainvoke, Gemini.ainvoke_stream = ainvoke, ainvoke_stream
+        return originals
+
+    @staticmethod
+    def uninstall(originals: dict):
+        for name, method in originals.items():
+            setattr(Gemini, name, method)
+
+
+class FakeFirecrawl:
+    """Simulated Firecrawl backend: generated search results and pages of `page_kb` kilobytes"""
+
+    def __init__(self, latency: Latency = None, page_kb: float = 20, results: int = 5, time_scale: float = 1.0):
+        self.latency = latency or Latency(1.0)
+        self.page_kb = page_kb
+        self.results = results
+        self.time_scale = time_scale
+        self.fetches = 0
+
+    def _wait(self, *key):
+        self.fetches += 1
+        time.sleep(self.latency.sample(_rng("firecrawl", *key), self.time_scale))
+
+    def page(self, url: str) -> dict:
+        """A page with navigation, boilerplate, a passage shared by every page and unique text"""
+        rng = _rng("page", url)
+        nav = " ".join(f"[Menu {i}](https://{url.split('/')[2] if '://' in url else url}/m{i})" for i in range(6))
+        shared = "Our platform helps teams launch faster with analytics, pricing experiments and onboarding flows."
+        lines = [nav, f"# {url}", shared, "Accept all cookies to continue. Privacy Policy"]
+        while sum(len(line) for line in lines) < self.page_kb * 1024:
+            lines.append(" ".join(f"word{rng.randrange(5000)}" for _ in range(60)) + ".")
+        return {"url": url, "markdown": "\n\n".join(lines), "metadata": {"title": f"Page {url}", "sourceURL": url}}
+
+    def install(self):
+        """Patch FirecrawlTools and the fingerprint HEAD check; returns the originals for uninstall()"""
+        fake = self
+        originals = {
+            (FirecrawlTools, name): getattr(FirecrawlTools, name)
+            for name in ("scrape_website", "crawl_website", "map_website", "search_web")
+        }
+        originals[(FingerprintStore, "validators")] = FingerprintStore.validators
+
+        def scrape_website(tools, url, *args, **kwargs):
+            fake._wait("scrape", url)
+            return json.dumps(fake.page(url))
+
+        def crawl_website(tools, url, limit=None, *args, **kwargs):
+            fake._wait("crawl", url)
+            return json.dumps({"data": [fake.page(f"{url}/p{i}") for i in range(limit or 3)]})
+
+        def map_website(tools, url, *args, **kwargs):
+            fake._wait("map", url)
+            return json.dumps({"links": [f"{url}/p{i}" for i in range(20)]})
+
+        def search_web(tools, query, limit=None, *args, **kwargs):
+            fake._wait("search", query)
+            rng = _rng("search", query)
+            return json.dumps({"web": [
+                {"url": f"https://example-{rng.randrange(12)}.com/{hashlib.md5(query.encode('utf-8')).hexdigest()[:8]}", "title": f"Result {i} for {query[:40]}",
+                 "description": " ".join(f"snippet{rng.randrange(900)}" for _ in range(25))}
+                for i in range(limit or fake.results)
+            ]})
+
+        def validators(store, url, fingerprint=None):
+            # A stable ETag per URL: revalidations look like 304 Not Modified
+            etag = f'"{hashlib.md5(url.encode("utf-8")).hexdigest()}"'
+            if fingerprint and fingerprint.get("etag"):
+                return fingerprint["etag"] == etag, etag, None
+            return None, etag, None
+
+        FirecrawlTools.scrape_website = scrape_website
+        FirecrawlTools.crawl_website = crawl_website
+        FirecrawlTools.map_website = map_website
+        FirecrawlTools.search_web = search_web
+        FingerprintStore.validators = validators
+        return originals
+
+    @staticmethod
+    def uninstall(originals: dict):
+        for (owner, name), method in originals.items():
+            setattr(owner, name, method)
+
+
+@contextmanager
+def offline(gemini: FakeGemini, firecrawl: FakeFirecrawl):
+    """Route every Gemini and Firecrawl call made inside the block to the fakes"""
+    gemini_originals = gemini.install()
+    firecrawl_originals = firecrawl.install()
+    try:
+        yield
+    finally:
+        FakeGemini.uninstall(gemini_originals)
+        FakeFirecrawl.uninstall(firecrawl_originals)
@@ -0,0 +1,107 @@
+# benchmarks/imports.py
+"""Cold-start import cost of each project module
+
+    python -m benchmarks.imports                      # every module under agents, services, models, ui
+    python -m benchmarks.imports agents.registry ui.components.results_display
+    python -m benchmarks.imports --repeat 5 --json imports.json
+
+Each module is imported in a fresh interpreter with `python -X importtime`;
+the reported time is the median over `--repeat` runs of that import alone
+(interpreter start-up excluded), with the third-party packages it pulls in
+ranked by the time spent importing their own modules.
+"""
+import argparse
+import json
+import os
+import pkgutil
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGES = ("agents", "services", "models", "ui")
+
+
+def project_modules() -> list:
+    """Every module of the project packages, packages first"""
+    modules = []
+    for package in PACKAGES:
+        modules.append(package)
+        path = os.path.join(ROOT, package)
+        for info in pkgutil.walk_packages([path], prefix=f"{package}."):
+            modules.append(info.name)
+    return modules
+
+
+def _parse(stderr: str) -> list:
+    """(name, depth, self µs, cumulative µs) per line of -X importtime output"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            # Header line
+            continue
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        entries.append((name.strip(), depth, int(own), int(cumulative)))
+    return entries
+
+
+def measure(module: str) -> tuple:
+    """(milliseconds, {third-party package: ms}) for importing `module` in a fresh interpreter"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if completed.returncode != 0:
+        error = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "import failed"
+        raise ImportError(error)
+
+    entries = _parse(completed.stderr)
+    # Everything imported after the interpreter's own start-up (site and its dependencies)
+    site_end = next((index for index, (name, depth, _, _) in enumerate(entries) if name == "site" and depth == 0), -1)
+    measured = entries[site_end + 1:]
+    total = sum(cumulative for _, depth, _, cumulative in measured if depth == 0)
+
+    # Time spent in each third-party distribution's own modules, subpackages included
+    third_party = {}
+    for name, _, own, _ in measured:
+        top = name.split(".")[0]
+        if top in sys.stdlib_module_names or top in PACKAGES or top.startswith("_"):
+            continue
+        third_party[top] = third_party.get(top, 0) + own / 1000
+    return total / 1000, {name: ms for name, ms in third_party.items() if ms >= 1}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.imports",
+                                     description="Cold-start import time of each project module")
+    parser.add_argument("modules", nargs="*", help="Modules to measure (default: every project module)")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh-interpreter runs per module; the median is reported")
+    parser.add_argument("--top", type=int, default=3, help="Heaviest third-party packages listed per module")
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'module':<44}{'import ms':>11}  heaviest dependencies")
+    for module in args.modules or project_modules():
+        try:
+            runs = [measure(module) for _ in range(max(1, args.repeat))]
+        except ImportError as e:
+            print(f"{module:<44}{'—':>11}  {e}")
+            continue
+        milliseconds = statistics.median(total for total, _ in runs)
+        dependencies = sorted(runs[-1][1].items(), key=lambda item: -item[1])[:args.top]
+        results[module] = {"ms": round(milliseconds, 1), "dependencies": {n: round(ms, 1) for n, ms in dependencies}}
+        heaviest = ", ".join(f"{name} {ms:.0f} ms" for name, ms in dependencies)
+        print(f"{module:<44}{milliseconds:>11.1f}  {heaviest}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+# benchmarks/scenarios.py
+"""Benchmark scenarios and the runner that measures them
+
+Every scenario is a callable run once per iteration against one shared
+TeamCoordinator (as the Streamlit app and batch runner share theirs), with
+Gemini and Firecrawl replaced by the fakes. The runner reports throughput,
+p50/p95/p99 latency per iteration and the peak memory Python allocated
+while the scenario ran.
+"""
+import asyncio
+import hashlib
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+
+SYLLABLES = ("zor", "vex", "qua", "lim", "tro", "nix", "bel", "dra", "kop", "sul", "fen", "gri", "mav", "tul")
+
+
+def configure_environment(directory: str = None) -> str:
+    """Point every cache, store and trace file at a scratch directory and lift the rate limits
+
+    Must run before the first coordinator is created: the shared caches read
+    their paths from the environment on first use.
+    """
+    directory = directory or tempfile.mkdtemp(prefix="pli-bench-")
+    os.environ.update({
+        "CRAWL_CACHE_DIR": os.path.join(directory, "firecrawl"),
+        "RESPONSE_CACHE_PATH": os.path.join(directory, "responses.sqlite3"),
+        "RESULT_STORE_PATH": os.path.join(directory, "results.sqlite3"),
+        "FINGERPRINT_DB_PATH": os.path.join(directory, "fingerprints.sqlite3"),
+        "COMPANY_INDEX_PATH": os.path.join(directory, "companies.sqlite3"),
+        "TRACE_FILE": os.path.join(directory, "traces.jsonl"),
+        # The fakes simulate latency; the real quotas would only measure the limiter's waits
+        "GEMINI_RPM": "100000",
+        "GEMINI_MAX_CONCURRENCY": "64",
+        "FIRECRAWL_RPM": "100000",
+        "FIRECRAWL_MAX_CONCURRENCY": "64",
+        "AGNO_TELEMETRY": "false",
+    })
+    return directory
+
+
+def company_name(scenario: str, iteration: int) -> str:
+    """A made-up company per scenario and iteration, so runs do not hit each other's caches"""
+    digest = hashlib.sha256(f"{scenario}:{iteration}".encode("utf-8")).digest()
+    return " ".join(
+        "".join(SYLLABLES[b % len(SYLLABLES)] for b in digest[i:i + 3]).title() for i in (0, 3)
+    )
+
+
+class CheckFailed(AssertionError):
+    """A scenario produced wrong output; unlike a skipped scenario this fails the benchmark run"""
+
+
+@dataclass
+class Result:
+    """Measurements of one scenario"""
+    scenario: str
+    iterations: int = 0
+    operations: int = 0
+    seconds: float = 0.0
+    throughput: float = 0.0
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    p99_ms: float = 0.0
+    peak_mb: float = 0.0
+    error: str = None
+    # The scenario ran but its output failed a correctness check (see CheckFailed)
+    failed: bool = False
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _percentile(values: list, percent: float) -> float:
+    """Linear-interpolated percentile of a non-empty list"""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * percent / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+class Scenarios:
+    """The benchmark scenarios: name -> (description, operations per iteration, callable)"""
+
+    def __init__(self, coordinator, concurrency: int = 8):
+        self.coordinator = coordinator
+        self.concurrency = concurrency
+        # Analyses the report scenarios render, produced once by the fake model
+        self._analyses = None
+        self.registry = {
+            "analyze_all_tools": ("analyze_all(), analysts search and crawl themselves", 3, self.analyze_all_tools),
+            "analyze_all_research": ("analyze_all() from one shared research corpus", 3, self.analyze_all_research),
+            "aanalyze_all": ("async analyze_all variant", 3, self.aanalyze_all),
+            "analyze_stream": ("streamed competitor analysis", 1, self.analyze_stream),
+            "analyze_cached": ("repeated competitor analysis served from the response cache", 1, self.analyze_cached),
+            "analyze_concurrent": (f"{concurrency} analyses for different companies at once", concurrency,
+                                   self.analyze_concurrent),
+            "pipeline_two_stage": ("bullets → report pipeline, two model calls", 1, self.pipeline("two_stage")),
+            "pipeline_fused": ("bullets and report in one model call", 1, self.pipeline("fused")),
+            "pipeline_local": ("bullets from the model, report assembled locally", 1, self.pipeline("local")),
+            "pipeline_team": ("two-stage pipeline dispatched through the team leader", 1,
+                              self.pipeline("two_stage", dispatch="team")),
+            "report_html": ("ReportGenerator HTML report", 1, self.report("html")),
+            "report_pdf": ("ReportGenerator PDF report", 1, self.report("pdf")),
+        }
+
+    # ---- coordinator -----------------------------------------------------
+    def analyze_all_tools(self, name: str, iteration: int):
+        self._drain(self.coordinator.analyze_all(company_name(name, iteration), mode="tools"))
+
+    def analyze_all_research(self, name: str, iteration: int):
+        self._drain(self.coordinator.analyze_all(company_name(name, iteration), mode="research"))
+
+    def aanalyze_all(self, name: str, iteration: int):
+        async def run():
+            results = [item async for item in self.coordinator.aanalyze_all(company_name(name, iteration))]
+            self._drain(results)
+
+        asyncio.run(run())
+
+    def analyze_stream(self, name: str, iteration: int):
+        for _ in self.coordinator.analyze_stream("competitor", company_name(name, iteration)):
+            pass
+
+    def analyze_cached(self, name: str, iteration: int):
+        # Iteration 0 fills the cache; every later one is a hit
+        self.coordinator.analyze("competitor", company_name(name, 0))
+
+    def analyze_concurrent(self, name: str, iteration: int):
+        companies = [company_name(name, iteration * self.concurrency + i) for i in range(self.concurrency)]
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            list(executor.map(lambda company: self.coordinator.analyze("competitor", company), companies))
+
+    @staticmethod
+    def _drain(results):
+        for analysis_type, _, error in results:
+            if error is not None:
+                raise RuntimeError(f"{analysis_type} failed: {error}") from error
+
+    # ---- product_agent.py pipeline ---------------------------------------
+    def pipeline(self, mode: str, dispatch: str = "direct"):
+        """The pipeline product_agent.py's tab jobs run, without the Streamlit page around it"""
+        from services.report_pipeline import run_pipeline
+
+        def run(name: str, iteration: int):
+            company = company_name(name, iteration)
+            result = run_pipeline(self.coordinator, "competitor", company, mode=mode, dispatch=dispatch)
+            if not result.report:
+                raise RuntimeError(f"{mode} pipeline produced no report")
+            self._check_pipeline(result)
+            self.coordinator.record_result(
+                "competitor", company, result.report, stage="report",
+                details={"bullets": result.bullets, "pipeline_mode": mode},
+            )
+
+        return run
+
+    @staticmethod
+    def _check_pipeline(result):
+        """Fail on output streamed twice or model runs missing from the usage of a pipeline run
+
+        Every stage is one analyst run, or two through the team (leader plus the
+        member it delegates to); a stage answered from the response cache makes none.
+        """
+        for part, text in (("bullets", result.bullets), ("report", result.report)):
+            head = (text or "").strip()[:200]
+            if head and text.count(head) > 1:
+                raise CheckFailed(f"{result.mode}/{result.dispatch} pipeline repeated its {part} text")
+
+        team_stages = {"two_stage": 2, "local": 1, "fused": 0}[result.mode] if result.dispatch == "team" else 0
+        stages = 1 if result.mode in ("fused", "local") else 2
+        expected = stages + team_stages
+        if result.usage.cached_calls == 0 and result.usage.model_calls != expected:
+            raise CheckFailed(f"{result.mode}/{result.dispatch} pipeline reported {result.usage.model_calls} "
+                               f"model runs, expected {expected}")
+
+    # ---- report generator ------------------------------------------------
+    def report(self, report_type: str):
+        from services.report_generator import ReportGenerator
+
+        def run(name: str, iteration: int):
+            if self._analyses is None:
+                self._analyses = {
+                    analysis_type: self.coordinator.analyze(analysis_type, company_name("report", 0))
+                    for analysis_type in self.coordinator.ANALYSES
+                }
+            report = ReportGenerator.generate_comprehensive_report(
+                company_name("report", 0), self._analyses["competitor"], self._analyses["sentiment"],
+                self._analyses["metrics"], report_type,
+            )
+            if not report:
+                raise RuntimeError(f"No {report_type} report generated")
+
+        return run
+
+
+def measure(name: str, operations: int, scenario, iterations: int, warmup: int = 1,
+            track_memory: bool = True) -> Result:
+    """Run `scenario` `warmup` + `iterations` times; warm-up runs are not measured"""
+    result = Result(name)
+    try:
+        for iteration in range(warmup):
+            scenario(name, iteration)
+        if track_memory:
+            tracemalloc.start()
+        latencies = []
+        start = time.perf_counter()
+        for iteration in range(warmup, warmup + iterations):
+            began = time.perf_counter()
+            scenario(name, iteration)
+            latencies.append((time.perf_counter() - began) * 1000)
+        result.seconds = round(time.perf_counter() - start, 3)
+        if track_memory:
+            result.peak_mb = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 2)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+        result.failed = isinstance(e, CheckFailed)
+        return result
+    finally:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    result.iterations = len(latencies)
+    result.operations = operations * len(latencies)
+    result.throughput = round(result.operations / result.seconds, 2) if result.seconds else 0.0
+    result.p50_ms = round(statistics.median(latencies), 1)
+    result.p95_ms = round(_percentile(latencies, 95), 1)
+    result.p99_ms = round(_percentile(latencies, 99), 1)
+    return result
+
+
+def regressions(results: list, baseline: dict, tolerance: float) -> list:
+    """Scenarios whose p95 exceeds the baseline's by more than `tolerance` (0.2 = 20 %)"""
+    slower = []
+    for result in results:
+        previous = baseline.get(result.scenario)
+        if result.error or not previous or not previous.get("p95_ms"):
+            continue
+        if result.p95_ms > previous["p95_ms"] * (1 + tolerance):
+            slower.append((result.scenario, previous["p95_ms"], result.p95_ms))
+    return slower
@@ -1,9 +1,64 @@
 # models/config.py
-from dataclasses import dataclass
+import os
+from dataclasses import dataclass, field
+
+# Pipeline stages a model can be routed for
+STAGES = ("coordination", "analysis", "bullets", "report")
 
 @dataclass
 class AgentConfig:
     """Configuration for agent settings"""
     google_api_key: str
     firecrawl_api_key: str
-    model_id: str = "gemini-1.5-flash"
\ No newline at end of file
+    # Default model for every stage without an entry in `stage_models`
+    model_id: str = "gemini-2.5-flash"
+    # Stage -> model id, e.g. {"bullets": "gemini-2.5-flash-lite", "report": "gemini-2.5-pro"}
+    stage_models: dict = field(default_factory=dict)
+    # Faster model used while a stage's model breaks the latency SLO (p95 seconds per run)
+    fallback_model_id: str = None
+    latency_slo: float = None
+
+    def model_for(self, stage: str) -> str:
+        """Configured model for a pipeline stage"""
+        return self.stage_models.get(stage) or self.model_id
+
+    @classmethod
+    def from_env(cls, google_api_key: str, firecrawl_api_key: str):
+        """Config from MODEL_ID, MODEL_<STAGE>, FALLBACK_MODEL_ID and LATENCY_SLO"""
+        latency_slo = os.getenv("LATENCY_SLO")
+        return cls(
+            google_api_key=google_api_key,
+            firecrawl_api_key=firecrawl_api_key,
+            model_id=os.getenv("MODEL_ID", cls.model_id),
+            stage_models={
+                stage: os.getenv(f"MODEL_{stage.upper()}") for stage in STAGES if os.getenv(f"MODEL_{stage.upper()}")
+            },
+            fallback_model_id=os.getenv("FALLBACK_MODEL_ID") or None,
+            latency_slo=float(latency_slo) if latency_slo else None,
+        )
+
+@dataclass
+class ResiliencePolicy:
+    """Hedging and circuit-breaker settings for one agent role"""
+    # Fire a duplicate run when the first one is slower than usual
+    hedge: bool = False
+    # Latency percentile that triggers the hedge, once `min_samples` runs were observed
+    hedge_percentile: float = 0.95
+    min_samples: int = 20
+    # Fixed hedge delay in seconds; overrides the percentile when set
+    hedge_after: float = None
+    # Consecutive provider failures before calls fail fast, and how long they do
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+
+    @classmethod
+    def from_env(cls, role: str = None):
+        """Policy from HEDGE_ROLES / HEDGE_AFTER / CIRCUIT_FAILURE_THRESHOLD / CIRCUIT_RESET_TIMEOUT"""
+        hedge_roles = {r.strip() for r in os.getenv("HEDGE_ROLES", "").split(",") if r.strip()}
+        hedge_after = os.getenv("HEDGE_AFTER")
+        return cls(
+            hedge=role in hedge_roles or "all" in hedge_roles,
+            hedge_after=float(hedge_after) if hedge_after else None,
+            failure_threshold=int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5)),
+            reset_timeout=float(os.getenv("CIRCUIT_RESET_TIMEOUT", 30)),
+        )
@@ -1,12 +1,14 @@
 import streamlit as st
-from agno.agent import Agent
-from agno.team import Team
-from agno.models.google import Gemini
-from agno.tools.firecrawl import FirecrawlTools
 from dotenv import load_dotenv
 from datetime import datetime
-from textwrap import dedent
 import os
+from agents.registry import get_coordinator
+from services.company_index import canonical_company
+from services.job_runner import DONE, FAILED
+from services.metrics import start_metrics_server
+from services.report_pipeline import DEFAULT_DISPATCH, DISPATCH_MODES, PIPELINE_MODES, run_pipeline
+from services.result_store import get_result_store
+from ui.utils import jobs
 
 # ---------------- Page Config ----------------
 st.set_page_config(
@@ -18,6 +20,8 @@ st.set_page_config(
 
 # ---------------- Environment & Agent ----------------
 load_dotenv()
+# Prometheus scrape endpoint next to the app when METRICS_PORT is set (started once per process)
+start_metrics_server()
 
 # Add API key inputs in sidebar
 st.sidebar.header("🔑 API Configuration")
@@ -35,202 +39,100 @@ with st.sidebar.container():
         help="Required for web search and crawling"
     )
 
+force_refresh = st.sidebar.checkbox(
+    "♻️ Force refresh",
+    help="Ignore cached responses and re-run the agents against live data"
+)
+
+pipeline_mode = st.sidebar.radio(
+    "⚙️ Pipeline mode",
+    options=list(PIPELINE_MODES),
+    format_func=PIPELINE_MODES.get,
+    help="Two-stage asks the analyst for bullets, then for the report. Fused asks the analyst for both in one call. "
+         "Local asks only for the tagged bullets and builds the report from them without another model call."
+)
+dispatch_mode = st.sidebar.radio(
+    "🧭 Dispatch",
+    options=list(DISPATCH_MODES),
+    index=list(DISPATCH_MODES).index(DEFAULT_DISPATCH),
+    format_func=DISPATCH_MODES.get,
+    help="Each tab already knows its analyst, so direct dispatch skips the team coordinator's routing call. "
+         "The team route is kept for comparison."
+)
+compare_modes = st.sidebar.checkbox(
+    "⏱️ Compare with another mode",
+    help="Also run two-stage (or fused, when two-stage is selected) and show latency and token usage side by side"
+)
+
 # Set environment variables
 if google_key:
     os.environ["Google_API_KEY"] = google_key
 if firecrawl_key:
     os.environ["FIRECRAWL_API_KEY"] = firecrawl_key
 
-# Initialize team only if both keys are provided
+# Reuse the process-wide coordinator so reruns don't rebuild agents and clients
 if google_key and firecrawl_key:
-    # Agent 1: Competitor Launch Analyst
-    launch_analyst = Agent(
-        name="Product Launch Analyst",
-        description=dedent("""
-            You are a senior Go-To-Market strategist who evaluates competitor product launches with a critical, evidence-driven lens.
-            Your objective is to uncover:
-            • How the product is positioned in the market
-            • Which launch tactics drove success (strengths)
-            • Where execution fell short (weaknesses)
-            • Actionable learnings competitors can leverage
-            Always cite observable signals (messaging, pricing actions, channel mix, timing, engagement metrics). Maintain a crisp, executive tone and focus on strategic value.
-            IMPORTANT: Conclude your report with a 'Sources:' section, listing all URLs of websites you crawled or searched for this analysis.
-        """),
-        model=Gemini(id="gemini-1.5-flash"),
-        tools=[FirecrawlTools(api_key=firecrawl_key)],
-        show_tool_calls=True,
-        markdown=True,
-        exponential_backoff=True,
-        delay_between_retries=2,
-    )
-    
-    # Agent 2: Market Sentiment Specialist
-    sentiment_analyst = Agent(
-        name="Market Sentiment Specialist",
-        description=dedent("""
-            You are a market research expert specializing in sentiment analysis and consumer perception tracking.
-            Your expertise includes:
-            • Analyzing social media sentiment and customer feedback
-            • Identifying positive and negative sentiment drivers
-            • Tracking brand perception trends across platforms
-            • Monitoring customer satisfaction and review patterns
-            • Providing actionable insights on market reception
-            Focus on extracting sentiment signals from social platforms, review sites, forums, and customer feedback channels.
-            IMPORTANT: Conclude your report with a 'Sources:' section, listing all URLs of websites you crawled or searched for this analysis.
-        """),
-        model=Gemini(id="gemini-1.5-flash"),
-        tools=[FirecrawlTools(api_key=firecrawl_key)],
-        show_tool_calls=True,
-        markdown=True,
-        exponential_backoff=True,
-        delay_between_retries=2,
-    )
-    
-    # Agent 3: Launch Metrics Specialist
-    metrics_analyst = Agent(
-        name="Launch Metrics Specialist", 
-        description=dedent("""
-            You are a product launch performance analyst who specializes in tracking and analyzing launch KPIs.
-            Your focus areas include:
-            • User adoption and engagement metrics
-            • Revenue and business performance indicators
-            • Market penetration and growth rates
-            • Press coverage and media attention analysis
-            • Social media traction and viral coefficient tracking
-            • Competitive market share analysis
-            Always provide quantitative insights with context and benchmark against industry standards when possible.
-            IMPORTANT: Conclude your report with a 'Sources:' section, listing all URLs of websites you crawled or searched for this analysis.
-        """),
-        model=Gemini(id="gemini-1.5-flash"),
-        tools=[FirecrawlTools(api_key=firecrawl_key)],
-        show_tool_calls=True,
-        markdown=True,
-        exponential_backoff=True,
-        delay_between_retries=2,
-    )
-
-    # Create the coordinated team
-    product_intelligence_team = Team(
-        name="Product Intelligence Team",
-        mode="coordinate",
-        model=Gemini(id="gemini-1.5-flash"),
-        members=[launch_analyst, sentiment_analyst, metrics_analyst],
-        instructions=[
-            "Coordinate the analysis based on the user's request type:",
-            "1. For competitor analysis: Use the Product Launch Analyst to evaluate positioning, strengths, weaknesses, and strategic insights",
-            "2. For market sentiment: Use the Market Sentiment Specialist to analyze social media sentiment, customer feedback, and brand perception",
-            "3. For launch metrics: Use the Launch Metrics Specialist to track KPIs, adoption rates, press coverage, and performance indicators",
-            "Always provide evidence-based insights with specific examples and data points",
-            "Structure responses with clear sections and actionable recommendations",
-            "Include sources section with all URLs crawled or searched"
-        ],
-        show_tool_calls=True,
-        markdown=True,
-        debug_mode=True,
-        show_members_responses=True,
-    )
+    coordinator = get_coordinator(google_key, firecrawl_key)
 else:
-    product_intelligence_team = None
+    coordinator = None
     st.warning("⚠️ Please enter both API keys in the sidebar to use the application.")
 
-# ---------------- Helper to display response ----------------
-def display_agent_response(resp):
-    """Render different response structures nicely."""
-    if hasattr(resp, "content") and resp.content:
-        st.markdown(resp.content)
-    elif hasattr(resp, "messages"):
-        for m in resp.messages:
-            if m.role == "assistant" and m.content:
-                st.markdown(m.content)
-    else:
-        st.markdown(str(resp))
+# Helper to run the selected bullet→report pipeline for one tab in the background
+def pipeline_job(kind: str, company: str, mode: str, compare: bool, refresh: bool, dispatch: str):
+    """Background work for one tab: run the pipeline (and optionally the other mode) and return every PipelineRun."""
+    def work(handle):
+        run = run_pipeline(
+            coordinator, kind, company,
+            mode=mode,
+            force_refresh=refresh,
+            on_text=lambda text: handle.update(partial=text),
+            dispatch=dispatch,
+        )
+        runs = [run]
+        coordinator.record_result(
+            kind, company, run.report, stage="report", details={"bullets": run.bullets, "pipeline_mode": mode}
+        )
 
-# Helper to expand bullet summary into 1200-word general report
-def expand_insight(bullet_text: str, topic: str) -> str:
-    if not product_intelligence_team:
-        st.error("⚠️ Please enter both API keys in the sidebar first.")
-        return ""
-        
-    prompt = (
-        f"Using ONLY the bullet points below, craft an in-depth (~1200-word) launch analysis report on {topic}.\n"
-        f"Structure:\n"
-        f"1. Executive Summary (<120 words)\n"
-        f"2. Strengths & Opportunities (what worked well)\n"
-        f"3. Weaknesses & Gaps (what didn't work or could be improved)\n"
-        f"4. Actionable Recommendations (bullet list)\n"
-        f"5. Key Risks / Watch-outs\n\n"
-        f"Bullet Points:\n{bullet_text}\n\n"
-        f"Ensure analysis is objective, evidence-based and references the bullet insights. Keep paragraphs short (≤120 words)."
-    )
-    long_resp = product_intelligence_team.run(prompt)
-    return long_resp.content if hasattr(long_resp, "content") else str(long_resp)
-
-# Helper to craft competitor-focused launch report for product managers
-def expand_competitor_report(bullet_text: str, competitor: str) -> str:
-    if not product_intelligence_team:
-        st.error("⚠️ Please enter both API keys in the sidebar first.")
-        return ""
-
-    prompt = (
-        f"Transform the insight bullets below into a professional launch review for product managers analysing {competitor}.\n\n"
-        f"Produce well-structured **Markdown** with a mix of tables, call-outs and concise bullet points — avoid long paragraphs.\n\n"
-        f"=== FORMAT SPECIFICATION ===\n"
-        f"# {competitor} – Launch Review\n\n"
-        f"## 1. Market & Product Positioning\n"
-        f"• Bullet point summary of how the product is positioned (max 6 bullets).\n\n"
-        f"## 2. Launch Strengths\n"
-        f"| Strength | Evidence / Rationale |\n|---|---|\n| … | … | (add 4-6 rows)\n\n"
-        f"## 3. Launch Weaknesses\n"
-        f"| Weakness | Evidence / Rationale |\n|---|---|\n| … | … | (add 4-6 rows)\n\n"
-        f"## 4. Strategic Takeaways for Competitors\n"
-        f"1. … (max 5 numbered recommendations)\n\n"
-        f"=== SOURCE BULLETS ===\n{bullet_text}\n\n"
-        f"Guidelines:\n"
-        f"• Populate the tables with specific points derived from the bullets.\n"
-        f"• Only include rows that contain meaningful data; omit any blank entries."
-    )
-    resp = product_intelligence_team.run(prompt)
-    return resp.content if hasattr(resp, "content") else str(resp)
-
-# Helper to craft market sentiment report
-def expand_sentiment_report(bullet_text: str, product: str) -> str:
-    if not product_intelligence_team:
-        st.error("⚠️ Please enter both API keys in the sidebar first.")
-        return ""
-
-    prompt = (
-        f"Use the tagged bullets below to create a concise market-sentiment brief for **{product}**.\n\n"
-        f"### Positive Sentiment\n"
-        f"• List each positive point as a separate bullet (max 6).\n\n"
-        f"### Negative Sentiment\n"
-        f"• List each negative point as a separate bullet (max 6).\n\n"
-        f"### Overall Summary\n"
-        f"Provide a short paragraph (≤120 words) summarising the overall sentiment balance and key drivers.\n\n"
-        f"Tagged Bullets:\n{bullet_text}"
-    )
-    resp = product_intelligence_team.run(prompt)
-    return resp.content if hasattr(resp, "content") else str(resp)
-
-# Helper to craft launch metrics report
-def expand_metrics_report(bullet_text: str, launch: str) -> str:
-    if not product_intelligence_team:
-        st.error("⚠️ Please enter both API keys in the sidebar first.")
-        return ""
-
-    prompt = (
-        f"Convert the KPI bullets below into a launch-performance snapshot for **{launch}** suitable for an executive dashboard.\n\n"
-        f"## Key Performance Indicators\n"
-        f"| Metric | Value / Detail | Source |\n"
-        f"|---|---|---|\n"
-        f"| … | … | … |  (include one row per KPI)\n\n"
-        f"## Qualitative Signals\n"
-        f"• Bullet list of notable qualitative insights (max 5).\n\n"
-        f"## Summary & Implications\n"
-        f"Brief paragraph (≤120 words) highlighting what the metrics imply about launch success and next steps.\n\n"
-        f"KPI Bullets:\n{bullet_text}"
-    )
-    resp = product_intelligence_team.run(prompt)
-    return resp.content if hasattr(resp, "content") else str(resp)
+        # Optionally run the other mode on the same input for a side-by-side comparison
+        if compare:
+            other_mode = "fused" if mode == "two_stage" else "two_stage"
+            handle.update(message=f"Comparing with {PIPELINE_MODES[other_mode]}...")
+            runs.append(run_pipeline(coordinator, kind, company, mode=other_mode, force_refresh=refresh,
+                                     dispatch=dispatch))
+        return runs
+
+    return work
+
+
+def render_pipeline_job(kind: str, company: str, start: bool, status: str):
+    """Start the tab's pipeline as a background job when asked, and show its live output.
+
+    The job keeps running across reruns and tab switches; once it finishes its
+    report, bullets and run stats are copied into session state.
+    """
+    key = jobs.job_key(f"{kind}:{pipeline_mode}:{dispatch_mode}:{int(compare_modes)}", company, force_refresh,
+                       coordinator)
+    if start:
+        jobs.submit(kind, pipeline_job(kind, company, pipeline_mode, compare_modes, force_refresh, dispatch_mode),
+                    key, label=status)
+
+    job = jobs.current(kind, key)
+    if job is None:
+        return
+    if not job.finished:
+        st.info(f"{job.label} {job.message}")
+        st.markdown(job.partial + " ▌")
+        return
+    if not jobs.consume(job):
+        return
+    if job.status == DONE:
+        run = job.result[0]
+        st.session_state[f"{kind}_response"] = run.report
+        st.session_state[f"{kind}_bullets"] = run.bullets
+        st.session_state.pipeline_runs.extend(job.result)
+        st.rerun()
+    elif job.status == FAILED:
+        st.error(f"❌ Error: {job.error}")
 
 # ---------------- UI ----------------
 st.title("🚀 AI Product Launch Intelligence Agent")
@@ -245,13 +147,17 @@ with st.container():
     with col1:
         company_name = st.text_input(
             label="Company Name",
+            key="company_name_input",
             placeholder="Enter company name (e.g., OpenAI, Tesla, Spotify)",
             help="This company will be analyzed by the coordinated team of specialized agents",
             label_visibility="collapsed"
         )
     with col2:
         if company_name:
+            typed, company_name = company_name, canonical_company(company_name)
             st.success(f"✓ Ready to analyze **{company_name}**")
+            if " ".join(typed.split()) != company_name:
+                st.caption(f"Matched “{typed.strip()}” to {company_name}")
 
 st.divider()
 
@@ -262,11 +168,6 @@ analysis_tabs = st.tabs([
     "📈 Launch Metrics"
 ])
 
-# Persistent storage for latest response
-if "analysis_response" not in st.session_state:
-    st.session_state.analysis_response = None
-    st.session_state.analysis_meta = {}
-
 # Store separate responses for each agent
 if "competitor_response" not in st.session_state:
     st.session_state.competitor_response = None
@@ -275,6 +176,13 @@ if "sentiment_response" not in st.session_state:
 if "metrics_response" not in st.session_state:
     st.session_state.metrics_response = None
 
+# Bullets behind each report, and latency/token stats of every pipeline run
+for key in ("competitor_bullets", "sentiment_bullets", "metrics_bullets"):
+    if key not in st.session_state:
+        st.session_state[key] = ""
+if "pipeline_runs" not in st.session_state:
+    st.session_state.pipeline_runs = []
+
 # -------- Competitor Analysis Tab --------
 with analysis_tabs[0]:
     with st.container():
@@ -308,27 +216,11 @@ with analysis_tabs[0]:
                 else:
                     st.info("⏳ Ready to analyze")
             
-            if analyze_btn:
-                if not product_intelligence_team:
-                    st.error("⚠️ Please enter both API keys in the sidebar first.")
-                else:
-                    with st.spinner("🔍 Product Intelligence Team analyzing competitive strategy..."):
-                        try:
-                            bullets = product_intelligence_team.run(
-                                f"Generate up to 16 evidence-based insight bullets about {company_name}'s most recent product launches.\n"
-                                f"Format requirements:\n"
-                                f"• Start every bullet with exactly one tag: Positioning | Strength | Weakness | Learning\n"
-                                f"• Follow the tag with a concise statement (max 30 words) referencing concrete observations: messaging, differentiation, pricing, channel selection, timing, engagement metrics, or customer feedback."
-                            )
-                            long_text = expand_competitor_report(
-                                bullets.content if hasattr(bullets, "content") else str(bullets),
-                                company_name
-                            )
-                            st.session_state.competitor_response = long_text
-                            st.success("✅ Competitor analysis ready")
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"❌ Error: {e}")
+            if analyze_btn and not coordinator:
+                st.error("⚠️ Please enter both API keys in the sidebar first.")
+            elif coordinator:
+                # Runs in the background; the bullets, then the report, appear as they are generated
+                render_pipeline_job("competitor", company_name, analyze_btn, "🔍 Product Intelligence Team analyzing competitive strategy...")
             
             # Display results
             if st.session_state.competitor_response:
@@ -336,6 +228,9 @@ with analysis_tabs[0]:
                 with st.container():
                     st.markdown("### 📊 Analysis Results")
                     st.markdown(st.session_state.competitor_response)
+                    if st.session_state.competitor_bullets:
+                        with st.expander("🧾 Source bullets", expanded=False):
+                            st.markdown(st.session_state.competitor_bullets)
         else:
             st.info("👆 Please enter a company name above to start the analysis")
 
@@ -372,25 +267,11 @@ with analysis_tabs[1]:
                 else:
                     st.info("⏳ Ready to analyze")
             
-            if sentiment_btn:
-                if not product_intelligence_team:
-                    st.error("⚠️ Please enter both API keys in the sidebar first.")
-                else:
-                    with st.spinner("💬 Product Intelligence Team analyzing market sentiment..."):
-                        try:
-                            bullets = product_intelligence_team.run(
-                                f"Summarize market sentiment for {company_name} in <=10 bullets. "
-                                f"Cover top positive & negative themes with source mentions (G2, Reddit, Twitter, customer reviews)."
-                            )
-                            long_text = expand_sentiment_report(
-                                bullets.content if hasattr(bullets, "content") else str(bullets),
-                                company_name
-                            )
-                            st.session_state.sentiment_response = long_text
-                            st.success("✅ Sentiment analysis ready")
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"❌ Error: {e}")
+            if sentiment_btn and not coordinator:
+                st.error("⚠️ Please enter both API keys in the sidebar first.")
+            elif coordinator:
+                # Runs in the background; the bullets, then the report, appear as they are generated
+                render_pipeline_job("sentiment", company_name, sentiment_btn, "💬 Product Intelligence Team analyzing market sentiment...")
             
             # Display results
             if st.session_state.sentiment_response:
@@ -398,6 +279,9 @@ with analysis_tabs[1]:
                 with st.container():
                     st.markdown("### 📈 Analysis Results")
                     st.markdown(st.session_state.sentiment_response)
+                    if st.session_state.sentiment_bullets:
+                        with st.expander("🧾 Source bullets", expanded=False):
+                            st.markdown(st.session_state.sentiment_bullets)
         else:
             st.info("👆 Please enter a company name above to start the analysis")
 
@@ -434,25 +318,11 @@ with analysis_tabs[2]:
                 else:
                     st.info("⏳ Ready to analyze")
             
-            if metrics_btn:
-                if not product_intelligence_team:
-                    st.error("⚠️ Please enter both API keys in the sidebar first.")
-                else:
-                    with st.spinner("📈 Product Intelligence Team analyzing launch metrics..."):
-                        try:
-                            bullets = product_intelligence_team.run(
-                                f"List (max 10 bullets) the most important publicly available KPIs & qualitative signals for {company_name}'s recent product launches. "
-                                f"Include engagement stats, press coverage, adoption metrics, and market traction data if available."
-                            )
-                            long_text = expand_metrics_report(
-                                bullets.content if hasattr(bullets, "content") else str(bullets),
-                                company_name
-                            )
-                            st.session_state.metrics_response = long_text
-                            st.success("✅ Metrics analysis ready")
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"❌ Error: {e}")
+            if metrics_btn and not coordinator:
+                st.error("⚠️ Please enter both API keys in the sidebar first.")
+            elif coordinator:
+                # Runs in the background; the bullets, then the report, appear as they are generated
+                render_pipeline_job("metrics", company_name, metrics_btn, "📈 Product Intelligence Team analyzing launch metrics...")
             
             # Display results
             if st.session_state.metrics_response:
@@ -460,6 +330,9 @@ with analysis_tabs[2]:
                 with st.container():
                     st.markdown("### 📊 Analysis Results")
                     st.markdown(st.session_state.metrics_response)
+                    if st.session_state.metrics_bullets:
+                        with st.expander("🧾 Source bullets", expanded=False):
+                            st.markdown(st.session_state.metrics_bullets)
         else:
             st.info("👆 Please enter a company name above to start the analysis")
 
@@ -511,6 +384,53 @@ if company_name:
 
     st.sidebar.divider()
 
+# Pipeline latency / token comparison
+if st.session_state.pipeline_runs:
+    with st.sidebar.container():
+        st.markdown("### ⏱️ Pipeline Comparison")
+        st.table([
+            {
+                "Tab": run.kind,
+                "Mode": PIPELINE_MODES[run.mode],
+                "Dispatch": run.dispatch,
+                "Latency (s)": f"{run.seconds:.1f}",
+                "LLM calls": run.usage.model_calls,
+                "Cached": run.usage.cached_calls,
+                "Tokens in": run.usage.input_tokens,
+                "Tokens out": run.usage.output_tokens,
+                "Context saved": run.usage.context_tokens_saved,
+            }
+            for run in st.session_state.pipeline_runs[-6:]
+        ])
+
+    st.sidebar.divider()
+
+# Past analyses from the result store; opening one restores it without re-running the agents
+def reopen_analysis(company: str):
+    records = get_result_store().latest(company)
+    for kind in ("competitor", "sentiment", "metrics"):
+        record = records.get(kind)
+        st.session_state[f"{kind}_response"] = record["content"] if record else None
+        st.session_state[f"{kind}_bullets"] = ((record or {}).get("details") or {}).get("bullets", "")
+    st.session_state.company_name_input = company
+
+history = get_result_store().history(limit=10)
+if history:
+    with st.sidebar.container():
+        st.markdown("### 📚 Analysis History")
+        for index, entry in enumerate(history):
+            timestamp = datetime.fromtimestamp(entry["last_analyzed"]).strftime("%Y-%m-%d %H:%M")
+            st.button(
+                f"📂 {entry['company']} · {timestamp}",
+                key=f"history_{index}",
+                help=f"Stored analyses: {', '.join(entry['analysis_types'])}",
+                on_click=reopen_analysis,
+                args=(entry["company"],),
+                use_container_width=True,
+            )
+
+    st.sidebar.divider()
+
 # Quick actions
 with st.sidebar.container():
     st.markdown("### ⚡ Quick Actions")
@@ -520,3 +440,6 @@ with st.sidebar.container():
         **K** - Market sentiment  
         **L** - Launch metrics
         """)
+
+# Keep refreshing while analyses run in the background
+jobs.poll_active()
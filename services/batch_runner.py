@@ -0,0 +1,206 @@
+# services/batch_runner.py
+import csv
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from services.company_index import get_company_index
+from services.report_generator import ReportGenerator
+from services.tracing import trace_run
+
+
+def load_companies(path: str) -> list:
+    """Read company names from a CSV file
+
+    Uses the `company` / `company_name` / `name` column when there is a header,
+    otherwise the first column. Blank rows are dropped, and spellings of a
+    company already listed ("OpenAI" / "openai.com") are dropped as duplicates;
+    each company is returned under its canonical name.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = [row for row in csv.reader(f) if row and row[0].strip()]
+    if not rows:
+        return []
+
+    column = 0
+    header = [cell.strip().lower() for cell in rows[0]]
+    for name in ("company", "company_name", "name"):
+        if name in header:
+            column = header.index(name)
+            rows = rows[1:]
+            break
+
+    index = get_company_index()
+    companies, seen = [], set()
+    for row in rows:
+        company = row[column].strip() if column < len(row) else ""
+        if not company:
+            continue
+        resolved = index.resolve(company)
+        if resolved.id not in seen:
+            seen.add(resolved.id)
+            companies.append(resolved.name)
+    return companies
+
+
+def slugify(company_name: str) -> str:
+    """Filesystem-safe file stem for a company name"""
+    return re.sub(r"[^A-Za-z0-9]+", "_", company_name).strip("_") or "company"
+
+
+class BatchRunner:
+    """Headless runner that analyzes many companies with bounded global concurrency
+
+    Every finished (company, analysis) pair is appended to a JSONL checkpoint,
+    so an interrupted batch resumes where it stopped. Once all analyses of a
+    company are done, its results and HTML/PDF reports are written to disk.
+    """
+
+    CHECKPOINT_FILE = "checkpoint.jsonl"
+
+    def __init__(self, coordinator, output_dir: str = "batch_output", max_workers: int = 4,
+                 report_formats=("html", "pdf"), force_refresh: bool = False, analysis_mode: str = None):
+        self.coordinator = coordinator
+        self.output_dir = output_dir
+        self.max_workers = max_workers
+        self.report_formats = tuple(report_formats)
+        self.force_refresh = force_refresh
+        # None uses the coordinator's default analysis mode
+        self.analysis_mode = analysis_mode
+        self.checkpoint_path = os.path.join(output_dir, self.CHECKPOINT_FILE)
+        self._lock = threading.Lock()
+        # company -> {analysis_type: content}
+        self.results = {}
+        os.makedirs(os.path.join(output_dir, "reports"), exist_ok=True)
+        os.makedirs(os.path.join(output_dir, "results"), exist_ok=True)
+        self._load_checkpoint()
+
+    def _load_checkpoint(self):
+        """Restore finished pairs from a previous (possibly interrupted) run"""
+        if not os.path.exists(self.checkpoint_path):
+            return
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash; that pair simply runs again
+                    continue
+                company = get_company_index().resolve(entry["company"]).name
+                self.results.setdefault(company, {})[entry["analysis"]] = entry["content"]
+
+    def _checkpoint(self, company_name: str, analysis_type: str, content: str):
+        """Durably record one finished pair (caller holds the lock)"""
+        with open(self.checkpoint_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({
+                "company": company_name,
+                "analysis": analysis_type,
+                "content": content,
+                "finished_at": datetime.now().isoformat(timespec="seconds"),
+            }) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def pending(self, companies: list) -> list:
+        """(company, analysis_type) pairs that still need to run"""
+        return [
+            (company, analysis_type)
+            for company in companies
+            for analysis_type in self.coordinator.ANALYSES
+            if analysis_type not in self.results.get(company, {})
+        ]
+
+    def is_complete(self, company_name: str) -> bool:
+        return all(a in self.results.get(company_name, {}) for a in self.coordinator.ANALYSES)
+
+    def write_outputs(self, company_name: str) -> list:
+        """Write the requested report formats and then the JSON results for one company
+
+        The JSON file is written last: it marks the company as finished, so a
+        failed render leaves it missing and a resumed batch renders again.
+        """
+        results = self.results[company_name]
+        stem = slugify(company_name)
+        written = []
+
+        for report_type in self.report_formats:
+            report = ReportGenerator.generate_comprehensive_report(
+                company_name=company_name,
+                competitor_analysis=results["competitor"],
+                sentiment_analysis=results["sentiment"],
+                metrics_analysis=results["metrics"],
+                report_type=report_type,
+            )
+            # The PDF path falls back to HTML when no PDF backend is installed
+            if report_type == "pdf" and not isinstance(report, bytes):
+                print(f"⚠️  {company_name}: no PDF backend available, skipping PDF report")
+                continue
+            path = os.path.join(self.output_dir, "reports", f"{stem}.{report_type}")
+            mode = "wb" if isinstance(report, bytes) else "w"
+            with open(path, mode, **({} if mode == "wb" else {"encoding": "utf-8"})) as f:
+                f.write(report)
+            written.append(path)
+
+        results_path = os.path.join(self.output_dir, "results", f"{stem}.json")
+        with open(results_path, "w", encoding="utf-8") as f:
+            json.dump({"company": company_name, **results}, f, indent=2)
+        written.append(results_path)
+        return written
+
+    def _run_pair(self, company_name: str, analysis_type: str):
+        # One trace run per pair, covering the report rendering of the pair that completes a company
+        with trace_run("batch.pair", company=company_name, analysis_type=analysis_type):
+            content = self.coordinator.analyze(analysis_type, company_name, force_refresh=self.force_refresh,
+                                               mode=self.analysis_mode)
+            with self._lock:
+                self.results.setdefault(company_name, {})[analysis_type] = content
+                self._checkpoint(company_name, analysis_type, content)
+                complete = self.is_complete(company_name)
+            if complete:
+                self.write_outputs(company_name)
+        return content
+
+    def run(self, companies: list) -> dict:
+        """Analyze every company and return a summary of the batch"""
+        start = time.perf_counter()
+        pending = self.pending(companies)
+        failures = []
+
+        # Companies finished by an earlier run may still lack their reports
+        for company in companies:
+            if self.is_complete(company) and not os.path.exists(
+                os.path.join(self.output_dir, "results", f"{slugify(company)}.json")
+            ):
+                try:
+                    self.write_outputs(company)
+                except Exception as e:
+                    failures.append({"company": company, "analysis": "reports", "error": str(e)})
+                    print(f"❌ {company} – reports: {e}")
+
+        print(f"▶️  {len(companies)} companies, {len(pending)} analyses to run "
+              f"({len(companies) * len(self.coordinator.ANALYSES) - len(pending)} restored from checkpoint)")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch") as executor:
+            futures = {
+                executor.submit(self._run_pair, company, analysis_type): (company, analysis_type)
+                for company, analysis_type in pending
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                company, analysis_type = futures[future]
+                try:
+                    future.result()
+                    print(f"✅ [{done}/{len(pending)}] {company} – {analysis_type}")
+                except Exception as e:
+                    failures.append({"company": company, "analysis": analysis_type, "error": str(e)})
+                    print(f"❌ [{done}/{len(pending)}] {company} – {analysis_type}: {e}")
+
+        return {
+            "companies": len(companies),
+            "completed": sum(1 for company in companies if self.is_complete(company)),
+            "analyses_run": len(pending) - sum(1 for failure in failures if failure["analysis"] != "reports"),
+            "failures": failures,
+            "seconds": round(time.perf_counter() - start, 1),
+        }
@@ -0,0 +1,320 @@
+# services/company_index.py
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+
+# Trailing words that name a legal form, not the company ("OpenAI Inc.", "Anthropic PBC")
+LEGAL_SUFFIXES = {
+    "inc", "incorporated", "llc", "ltd", "limited", "corp", "corporation", "co", "company", "plc", "pbc",
+    "gmbh", "ag", "sa", "sas", "sarl", "bv", "nv", "pty", "lp", "llp", "oy", "ab", "as", "spa", "srl", "kk",
+}
+# Top-level domains whose names are taken as web addresses ("openai.com"), not dotted names ("Node.js")
+DOMAIN_TLDS = {
+    "com", "net", "org", "io", "ai", "co", "app", "dev", "tech", "xyz", "so", "gg", "me", "us", "uk", "de", "fr",
+    "jp", "in", "cn", "ca", "au", "eu", "nl", "se", "ch", "es", "it", "br",
+}
+# Second-level labels of country domains ("acme.co.uk")
+SECOND_LEVEL = {"co", "com", "net", "org", "ac", "gov"}
+DOMAIN = re.compile(r"^(?:[a-z][a-z0-9+.-]*://)?(?:www\.)?((?:[a-z0-9-]+\.)+([a-z]{2,}))(?::\d+)?(?:[/?#].*)?$")
+DIGITS = re.compile(r"\d+")
+INITIALS = re.compile(r"\b([a-z])\.(?=[a-z]\b)")
+
+
+@dataclass
+class Company:
+    """A company as the caches, history and batch runs know it"""
+    # Stable id: the normalized key of the first spelling seen
+    id: str
+    # Display name used in prompts and reports: the best-written spelling seen so far
+    name: str
+
+
+def _domain_label(text: str) -> tuple:
+    """('openai', 'openai.com') for a web address, (None, None) otherwise"""
+    match = DOMAIN.match(text.strip().lower())
+    if not match or match.group(2) not in DOMAIN_TLDS:
+        return None, None
+    host = match.group(1)
+    parts = host.split(".")
+    if len(parts) >= 3 and parts[-2] in SECOND_LEVEL and len(parts[-1]) == 2:
+        return parts[-3], host
+    label = parts[-2].replace("-", "")
+    # Very short names keep their TLD ("x.ai" is xAI, not "x")
+    return (label + parts[-1] if len(label) < 3 else label), host
+
+
+def _tokens(text: str) -> list:
+    """Lower-case ASCII word tokens without accents, '&' spelled out and legal-form suffixes dropped"""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char)).casefold().replace("&", " and ")
+    # Dotted initials are one word ("S.A." -> "sa")
+    text = INITIALS.sub(r"\1", text)
+    tokens = re.sub(r"[^a-z0-9]+", " ", text).split()
+    if len(tokens) > 1 and tokens[0] == "the":
+        tokens = tokens[1:]
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens = tokens[:-1]
+    return tokens
+
+
+def _display_rank(display: str) -> int:
+    """How poor a spelling is as a display name (lower is better)
+
+    A web address is the last resort, a legal-form suffix ("ABC Ltd" vs
+    "A.B.C.") or an all-lowercase spelling ("openai" vs "OpenAI") counts against it.
+    """
+    if _domain_label(display)[0]:
+        return 4
+    words = re.sub(r"[^a-z0-9]+", " ", INITIALS.sub(r"\1", display.casefold())).split()
+    suffixed = len(words) > 1 and words[-1] in LEGAL_SUFFIXES
+    return int(suffixed) + int(display.islower())
+
+
+def _display_name(name: str) -> str:
+    """Written form of a spelling: whitespace collapsed, web addresses reduced to their host"""
+    display = " ".join(name.split())
+    _, host = _domain_label(display)
+    if host:
+        return host[4:] if host.startswith("www.") else host
+    return display
+
+
+def normalize(name: str) -> str:
+    """Alias key of a company name: 'OpenAI, Inc.', 'open ai' and 'openai.com' all give 'openai'"""
+    label, _ = _domain_label(name)
+    if label:
+        return label
+    return "".join(_tokens(name)) or " ".join(name.split()).casefold()
+
+
+def _trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CompanyIndex:
+    """Maps free-text company names to a stable company, persisted in SQLite
+
+    A name resolves through three lookups, cheapest first: its alias key
+    (case, spacing, punctuation, accents and legal-form suffixes removed), the
+    domain of a web address, and a character-trigram match against the keys
+    of known companies. Fuzzy matches need a Dice similarity of `threshold`,
+    keys of at least `min_fuzzy_length` characters and the same numbers
+    ("Acme 2" is not "Acme 3").
+
+    lookup() only reads the index, so keys can be derived from half-typed
+    input without creating companies. resolve() records the spelling as an
+    alias (the next lookup is exact), creates unknown companies, and adopts
+    the spelling as display name when it is better written than the current
+    one: a written name over a web address, "A.B.C." over "ABC Ltd", "OpenAI"
+    over "openai". The id never changes.
+    """
+
+    def __init__(self, db_path: str = ".cache/companies.sqlite3", threshold: float = 0.85,
+                 min_fuzzy_length: int = 6):
+        self.db_path = db_path
+        self.threshold = threshold
+        self.min_fuzzy_length = min_fuzzy_length
+        self._lock = threading.Lock()
+        # alias key -> company id; company id -> Company; trigram -> company ids
+        self._aliases = {}
+        self._companies = {}
+        self._grams = {}
+
+        # Resolution counters
+        self.exact = 0
+        self.fuzzy = 0
+        self.created = 0
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS companies (id TEXT PRIMARY KEY, name TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS aliases (alias TEXT PRIMARY KEY, company_id TEXT NOT NULL, "
+            "created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        for company_id, name in self._conn.execute("SELECT id, name FROM companies"):
+            self._add_company(Company(company_id, name))
+        for alias, company_id in self._conn.execute("SELECT alias, company_id FROM aliases"):
+            self._aliases[alias] = company_id
+
+    def _add_company(self, company: Company):
+        """Index a company in memory (caller holds the lock or is the constructor)"""
+        self._companies[company.id] = company
+        self._aliases[company.id] = company.id
+        for gram in _trigrams(company.id):
+            self._grams.setdefault(gram, set()).add(company.id)
+
+    def _match(self, key: str) -> str:
+        """Id of the known company whose key is most similar to `key`, if similar enough"""
+        if len(key) < self.min_fuzzy_length:
+            return None
+        grams = _trigrams(key)
+        shared = Counter(company_id for gram in grams for company_id in self._grams.get(gram, ()))
+        numbers = DIGITS.findall(key)
+        best, best_score = None, self.threshold
+        for company_id, common in shared.most_common(20):
+            if len(company_id) < self.min_fuzzy_length or DIGITS.findall(company_id) != numbers:
+                continue
+            score = 2 * common / (len(grams) + len(_trigrams(company_id)))
+            if score >= best_score:
+                best, best_score = company_id, score
+        return best
+
+    def _rename(self, company_id: str, display: str):
+        """Adopt `display` as the company's name if it is better written (caller holds the lock)"""
+        company = self._companies[company_id]
+        if _display_rank(display) < _display_rank(company.name):
+            company.name = display
+            self._conn.execute("UPDATE companies SET name = ? WHERE id = ?", (display, company_id))
+            self._conn.commit()
+
+    def _remember(self, aliases: list, company_id: str):
+        """Persist new alias keys for a company (caller holds the lock)"""
+        now = time.time()
+        new = [alias for alias in aliases if alias and self._aliases.get(alias) != company_id]
+        for alias in new:
+            self._aliases[alias] = company_id
+        if new:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO aliases (alias, company_id, created_at) VALUES (?, ?, ?)",
+                [(alias, company_id, now) for alias in new],
+            )
+            self._conn.commit()
+
+    def _candidates(self, name: str) -> tuple:
+        """(display, alias key, alias keys to try) for a spelling"""
+        display = _display_name(name)
+        key = normalize(display)
+        _, host = _domain_label(display)
+        # A domain also tries its full host ("x.ai" -> "xai") before fuzzy matching
+        return display, key, [key] + ([host, host.replace(".", "")] if host else [])
+
+    def _find(self, key: str, candidates: list) -> tuple:
+        """(company id, exact) of the known company for these keys, or (None, False) (caller holds the lock)"""
+        for candidate in candidates:
+            company_id = self._aliases.get(candidate)
+            if company_id in self._companies:
+                return company_id, True
+        return self._match(key), False
+
+    def lookup(self, name: str) -> Company:
+        """The known company `name` refers to, or None; never writes to the index"""
+        _, key, candidates = self._candidates(name)
+        with self._lock:
+            company_id, _ = self._find(key, candidates)
+            return self._companies[company_id] if company_id is not None else None
+
+    def resolve(self, name: str) -> Company:
+        """The company `name` refers to, created on first sight; the spelling is recorded as an alias"""
+        display, key, candidates = self._candidates(name)
+
+        with self._lock:
+            company_id, exact = self._find(key, candidates)
+            if company_id is not None:
+                if exact:
+                    self.exact += 1
+                else:
+                    self.fuzzy += 1
+                self._remember(candidates, company_id)
+                self._rename(company_id, display)
+                return self._companies[company_id]
+
+            company = Company(key, display)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO companies (id, name, created_at) VALUES (?, ?, ?)",
+                (company.id, company.name, time.time()),
+            )
+            self._add_company(company)
+            self._remember(candidates, company.id)
+            self.created += 1
+            return company
+
+    def add_alias(self, alias: str, name: str) -> Company:
+        """Make `alias` resolve to the company `name` resolves to (e.g. a former or brand name)"""
+        company = self.resolve(name)
+        with self._lock:
+            self._remember([normalize(alias)], company.id)
+        return company
+
+    def aliases(self, name: str) -> list:
+        """Alias keys that resolve to the same company as `name`"""
+        company = self.lookup(name)
+        if company is None:
+            return []
+        with self._lock:
+            return sorted(alias for alias, company_id in self._aliases.items() if company_id == company.id)
+
+    def stats(self) -> dict:
+        """Known companies and aliases, and how names were resolved"""
+        with self._lock:
+            return {
+                "companies": len(self._companies),
+                "aliases": len(self._aliases),
+                "exact": self.exact,
+                "fuzzy": self.fuzzy,
+                "created": self.created,
+            }
+
+
+_shared_index = None
+_shared_index_lock = threading.Lock()
+
+
+def get_company_index() -> CompanyIndex:
+    """Return the process-wide company index
+
+    Configured once from COMPANY_INDEX_PATH and COMPANY_MATCH_THRESHOLD.
+    """
+    global _shared_index
+    with _shared_index_lock:
+        if _shared_index is None:
+            _shared_index = CompanyIndex(
+                db_path=os.getenv("COMPANY_INDEX_PATH", ".cache/companies.sqlite3"),
+                threshold=float(os.getenv("COMPANY_MATCH_THRESHOLD", 0.85)),
+            )
+        return _shared_index
+
+
+def canonical_company(name: str) -> str:
+    """Display name of the company `name` refers to, without recording anything
+
+    Unknown names come back in their written form; blank names unchanged.
+    """
+    if not name or not name.strip():
+        return name
+    company = get_company_index().lookup(name)
+    return company.name if company is not None else _display_name(name)
+
+
+def register_company(name: str) -> str:
+    """Resolve `name` in the index, creating the company if needed, and return its display name
+
+    For names that are about to be analysed; UI input and key derivation use
+    canonical_company() / company_id(), which never write.
+    """
+    if not name or not name.strip():
+        return name
+    return get_company_index().resolve(name).name
+
+
+def company_id(name: str) -> str:
+    """Stable id of the company `name` refers to, without recording anything
+
+    Unknown names get the id resolve() would create for them.
+    """
+    if not name or not name.strip():
+        return " ".join((name or "").split()).casefold()
+    company = get_company_index().lookup(name)
+    return company.id if company is not None else normalize(name)
@@ -0,0 +1,214 @@
+# services/crawl_cache.py
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from services.metrics import counter
+
+CACHE_LOOKUPS = counter("cache_lookups_total", "Response and crawl cache lookups by result (hit, miss, stale)",
+                        ("cache", "result"))
+
+# Query parameters that only carry campaign/referral tracking and never change page content
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src", "igshid"}
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL so trivially different spellings share one cache entry"""
+    url = url.strip()
+    if "://" not in url:
+        url = "https://" + url
+
+    parts = urlsplit(url)
+    scheme = "https" if parts.scheme.lower() in ("http", "https") else parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path.rstrip("/")
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    ))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query: case-insensitive, whitespace-collapsed"""
+    return " ".join(query.lower().split())
+
+
+class CrawlCache:
+    """Content-addressed on-disk cache for Firecrawl results
+
+    Each entry is a JSON file named after the SHA-256 of its key and carries its
+    own expiry time. When the store grows past `max_bytes`, the least recently
+    used entries are evicted first. Safe to share across threads; writes are
+    atomic so several processes can point at the same directory.
+    """
+
+    def __init__(self, cache_dir: str = ".cache/firecrawl", default_ttl: float = 24 * 3600,
+                 max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # digest -> (size in bytes, last access time)
+        self._index = {}
+        self._total_bytes = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """Rebuild the in-memory size/recency index from the files on disk"""
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            self._index[name[:-5]] = (stat.st_size, stat.st_mtime)
+            self._total_bytes += stat.st_size
+
+    @staticmethod
+    def make_key(kind: str, target: str, **params) -> str:
+        """Build a cache key from the tool kind, its normalized target and extra parameters"""
+        target = normalize_query(target) if kind == "search" else normalize_url(target)
+        extras = "&".join(f"{k}={params[k]}" for k in sorted(params) if params[k] is not None)
+        return f"{kind}:{target}?{extras}" if extras else f"{kind}:{target}"
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def get(self, key: str, allow_stale: bool = False):
+        """Return the cached value for `key`, or None if missing or expired
+
+        Expired entries stay on disk until evicted, so `allow_stale=True` can
+        still return them for revalidation.
+        """
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        path = self._path(digest)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            CACHE_LOOKUPS.inc(cache="crawl", result="miss")
+            return None
+
+        now = time.time()
+        if entry.get("key") != key:
+            with self._lock:
+                self.misses += 1
+            CACHE_LOOKUPS.inc(cache="crawl", result="miss")
+            return None
+        if entry.get("expires_at", 0) < now:
+            if allow_stale:
+                CACHE_LOOKUPS.inc(cache="crawl", result="stale")
+                return entry["value"]
+            with self._lock:
+                self.misses += 1
+            CACHE_LOOKUPS.inc(cache="crawl", result="miss")
+            return None
+
+        CACHE_LOOKUPS.inc(cache="crawl", result="hit")
+        with self._lock:
+            self.hits += 1
+            if digest in self._index:
+                self._index[digest] = (self._index[digest][0], now)
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        return entry["value"]
+
+    def set(self, key: str, value: str, ttl: float = None):
+        """Store `value` under `key` for `ttl` seconds (defaults to the cache TTL)"""
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        now = time.time()
+        payload = json.dumps({
+            "key": key,
+            "created_at": now,
+            "expires_at": now + (self.default_ttl if ttl is None else ttl),
+            "value": value,
+        })
+        size = len(payload.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        path = self._path(digest)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            previous = self._index.get(digest)
+            if previous:
+                self._total_bytes -= previous[0]
+            self._index[digest] = (size, now)
+            self._total_bytes += size
+            self._evict()
+
+    def _remove(self, digest: str):
+        """Drop one entry from disk and the index (caller holds the lock)"""
+        entry = self._index.pop(digest, None)
+        if entry:
+            self._total_bytes -= entry[0]
+        try:
+            os.remove(self._path(digest))
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Evict least recently used entries until the store fits `max_bytes` (caller holds the lock)"""
+        if self._total_bytes <= self.max_bytes:
+            return
+        for digest, _ in sorted(self._index.items(), key=lambda item: item[1][1]):
+            self._remove(digest)
+            if self._total_bytes <= self.max_bytes:
+                break
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            for digest in list(self._index):
+                self._remove(digest)
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current store size"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._index),
+                "bytes": self._total_bytes,
+            }
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_crawl_cache() -> CrawlCache:
+    """Return the process-wide crawl cache shared by every agent
+
+    Location, TTL and size are read once from CRAWL_CACHE_DIR, CRAWL_CACHE_TTL
+    (seconds) and CRAWL_CACHE_MAX_MB.
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = CrawlCache(
+                cache_dir=os.getenv("CRAWL_CACHE_DIR", ".cache/firecrawl"),
+                default_ttl=float(os.getenv("CRAWL_CACHE_TTL", 24 * 3600)),
+                max_bytes=int(float(os.getenv("CRAWL_CACHE_MAX_MB", 256)) * 1024 * 1024),
+            )
+        return _shared_cache
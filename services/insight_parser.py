@@ -0,0 +1,193 @@
+# services/insight_parser.py
+import csv
+import io
+import re
+from collections import Counter
+from dataclasses import asdict, dataclass
+from urllib.parse import urlparse
+from services.tracing import span
+
+# Tag spellings the agents use -> canonical tag
+TAG_ALIASES = {
+    "positioning": "Positioning",
+    "strength": "Strength", "strengths": "Strength",
+    "weakness": "Weakness", "weaknesses": "Weakness",
+    "learning": "Learning", "learnings": "Learning", "takeaway": "Learning", "takeaways": "Learning",
+    "opportunity": "Opportunity", "opportunities": "Opportunity",
+    "threat": "Threat", "threats": "Threat", "risk": "Threat", "risks": "Threat",
+    "positive": "Positive", "negative": "Negative", "neutral": "Neutral", "mixed": "Neutral",
+    "kpi": "KPI", "kpis": "KPI", "metric": "KPI", "metrics": "KPI", "key performance indicators": "KPI",
+    "signal": "Signal", "signals": "Signal",
+}
+
+_TAG_WORDS = "|".join(sorted((re.escape(alias) for alias in TAG_ALIASES), key=len, reverse=True))
+BULLET = re.compile(r"^\s*(?:[-*•+▪◦]|\d{1,2}[.)])\s+(.*\S)")
+# "Strength: …", "**Strength:** …", "**Strength** – …", "[Strength] …", "Strength | …"
+TAGGED = re.compile(
+    rf"^(?P<open>\*\*|__|\[)?(?P<tag>{_TAG_WORDS})\b\]?\s*(?P<sep>[:\-–—|])?\s*(?:\*\*|__|\])?"
+    rf"\s*(?P<sep2>[:\-–—|])?\s*(?P<text>.+)$",
+    re.IGNORECASE,
+)
+HEADING = re.compile(r"^\s*(?:#{1,6}\s+(.+?)|\*\*([^*]+)\*\*:?)\s*$")
+HEADING_TAG = re.compile(rf"\b({_TAG_WORDS})\b", re.IGNORECASE)
+TABLE_SEPARATOR = re.compile(r"^\s*\|?\s*:?-{2,}")
+SOURCE_NOTE = re.compile(
+    r"\s*[(\[]?\s*(?:sources?|via|according to)\s*[:\-–—]\s*([^)\]]+?)\s*[)\]]?\s*\.?\s*$", re.IGNORECASE
+)
+MARKDOWN_LINK = re.compile(r"\[([^\]]+)\]\((https?://[^)\s]+)\)")
+BARE_URL = re.compile(r"\(?\s*(https?://[^\s)\]]+)\s*\)?")
+EMPHASIS = re.compile(r"(\*\*|__)")
+# Trailing "(Reddit)" / "(G2, Capterra)": a short list of capitalised names
+SOURCE_NAMES = re.compile(r"\s*\(([A-Z][\w.&' -]{0,30}(?:,\s*[A-Z][\w.&' -]{0,30}){0,3})\)\s*\.?\s*$")
+
+
+@dataclass
+class Insight:
+    """One tagged bullet from agent output"""
+    tag: str
+    statement: str
+    # Cited URL or source name (G2, Reddit, …), if the bullet names one
+    source: str = None
+
+
+def _tag(word: str) -> str:
+    return TAG_ALIASES.get(word.strip().lower())
+
+
+def _split_source(text: str) -> tuple:
+    """Separate a trailing source citation or URL from a statement"""
+    source = None
+    match = SOURCE_NOTE.search(text)
+    if match:
+        source = match.group(1).strip()
+        text = text[:match.start()]
+    link = MARKDOWN_LINK.search(text)
+    if link:
+        source = source or link.group(2)
+        if not text[link.end():].strip(" .)"):
+            # A link closing the bullet is a citation, not part of the statement
+            text = text[:link.start()]
+        text = MARKDOWN_LINK.sub(r"\1", text)
+    url = BARE_URL.search(text)
+    if url:
+        source = source or url.group(1).rstrip(".,;")
+        text = BARE_URL.sub("", text)
+    names = SOURCE_NAMES.search(text)
+    if names:
+        source = source or names.group(1)
+        text = text[:names.start()]
+    if source:
+        link = MARKDOWN_LINK.search(source)
+        if link:
+            source = link.group(2)
+    text = EMPHASIS.sub("", text).strip().rstrip(" -–—|,;")
+    return text.strip(), source
+
+
+def parse_insights(text: str, default_tag: str = None) -> list:
+    """Parse bullets (and report table rows) from agent output into Insight records
+
+    Tolerant of the usual drift in model formatting: bold or bracketed tags,
+    any of ``: - – — |`` as separator, plural tags, numbered lists and
+    untagged bullets under a tagged heading ("## Launch Strengths",
+    "### Negative Sentiment"), which inherit the heading's tag. Bullets with
+    no tag anywhere get `default_tag`. The trailing "Sources:" section and
+    lines that are not bullets or table rows are skipped.
+    """
+    with span("parse_insights", chars=len(text or "")) as parse_span:
+        insights = _parse(text, default_tag)
+        parse_span.set(insights=len(insights))
+    return insights
+
+
+def _parse(text: str, default_tag: str = None) -> list:
+    insights = []
+    section_tag = default_tag
+    in_sources = False
+    for line in (text or "").splitlines():
+        if not line.strip():
+            continue
+
+        heading = HEADING.match(line)
+        if heading or line.strip().lower().rstrip(":") in ("sources", "**sources**"):
+            title = (heading.group(1) or heading.group(2)) if heading else "sources"
+            in_sources = title.strip().lower().rstrip(":") in ("sources", "references")
+            found = HEADING_TAG.search(title)
+            section_tag = _tag(found.group(1)) if found else default_tag
+            continue
+        if in_sources:
+            continue
+
+        if line.lstrip().startswith("|"):
+            if TABLE_SEPARATOR.match(line):
+                continue
+            cells = [cell.strip() for cell in line.strip().strip("|").split("|")]
+            cells = [cell for cell in cells if cell and cell not in ("…", "...")]
+            if not cells or _tag(cells[0]) == section_tag and len(cells) > 1 and section_tag:
+                # Header row naming the section's own tag ("| Strength | Evidence |")
+                continue
+            if all(cell.lower() in ("metric", "value / detail", "source", "evidence / rationale") for cell in cells):
+                continue
+            statement, source = _split_source(" — ".join(cells[:2]))
+            if len(cells) > 2:
+                source = source or cells[2]
+            if statement:
+                insights.append(Insight(tag=section_tag, statement=statement, source=source))
+            continue
+
+        bullet = BULLET.match(line)
+        if not bullet:
+            continue
+        body = bullet.group(1)
+        tagged = TAGGED.match(body)
+        tag = section_tag
+        # A bare leading word ("Positive reviews on G2 …") is not a tag
+        if tagged and (tagged.group("open") or tagged.group("sep") or tagged.group("sep2")):
+            tag, body = _tag(tagged.group("tag")), tagged.group("text")
+        statement, source = _split_source(body)
+        if statement:
+            insights.append(Insight(tag=tag, statement=statement, source=source))
+    return insights
+
+
+def split_metric(statement: str) -> tuple:
+    """'Weekly users: 100M' -> ('Weekly users', '100M')"""
+    for separator in (":", " — ", " – ", " - "):
+        if separator in statement:
+            name, value = statement.split(separator, 1)
+            return name.strip(), value.strip()
+    return statement, ""
+
+
+def by_tag(insights: list) -> dict:
+    """Group insights by tag, keeping their order"""
+    groups = {}
+    for insight in insights:
+        groups.setdefault(insight.tag, []).append(insight)
+    return groups
+
+
+def source_name(source: str) -> str:
+    """Short display name of a source: the domain of a URL, otherwise the name itself"""
+    if not source:
+        return "Unattributed"
+    if "://" in source:
+        host = urlparse(source).netloc.lower()
+        return host[4:] if host.startswith("www.") else host
+    return source
+
+
+def source_counts(insights: list) -> Counter:
+    """Number of insights citing each source (by display name)"""
+    return Counter(source_name(insight.source) for insight in insights)
+
+
+def to_csv(insights_by_analysis: dict) -> str:
+    """CSV text with analysis, tag, statement and source columns, from {analysis_type: [Insight]}"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=["analysis", "tag", "statement", "source"])
+    writer.writeheader()
+    for analysis_type, insights in insights_by_analysis.items():
+        for insight in insights:
+            writer.writerow({"analysis": analysis_type, **asdict(insight)})
+    return buffer.getvalue()
@@ -0,0 +1,225 @@
+# services/job_runner.py
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from services.tracing import trace_run
+
+# Job lifecycle states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's work function once the job has been cancelled"""
+
+
+@dataclass
+class Job:
+    """State of one background job; the UI reads snapshots of it through JobRunner.get()"""
+    id: str
+    kind: str
+    label: str = ""
+    key: str = None
+    status: str = QUEUED
+    message: str = ""
+    # Text streamed so far (a running analysis renders this while it is still being written)
+    partial: str = ""
+    progress: float = 0.0
+    # Named partial results, e.g. one entry per finished analyst of an "Analyze All" job
+    results: dict = field(default_factory=dict)
+    result: object = None
+    error: str = None
+    created_at: float = field(default_factory=time.time)
+    started_at: float = None
+    finished_at: float = None
+    cancel_requested: bool = False
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    @property
+    def seconds(self) -> float:
+        """Run time so far (or in total once finished)"""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+
+class JobHandle:
+    """What a job's work function gets: thread-safe progress reporting and cancellation checks"""
+
+    def __init__(self, runner, job_id: str):
+        self._runner = runner
+        self.id = job_id
+
+    def update(self, **changes):
+        """Set partial, progress, message or other Job fields; raises JobCancelled once cancelled"""
+        self._runner._update(self.id, **changes)
+
+    def add_result(self, name: str, value):
+        """Publish one named partial result"""
+        self._runner._add_result(self.id, name, value)
+
+    def check_cancelled(self):
+        if self._runner._cancel_requested(self.id):
+            raise JobCancelled(f"Job {self.id} was cancelled")
+
+
+class JobRunner:
+    """Runs analyses on a worker pool outside the Streamlit script thread
+
+    submit() returns a job id immediately; the work function runs on the pool
+    and reports streamed text, progress and partial results through its
+    JobHandle. A Streamlit rerun, a navigation or a closed tab does not touch
+    the job — the next script run finds it again by id (or by `key`) and
+    renders its latest snapshot. Finished jobs are kept until `max_finished`
+    newer ones have completed or `retention` seconds have passed.
+    """
+
+    def __init__(self, max_workers: int = 4, max_finished: int = 200, retention: float = 6 * 3600):
+        if max_workers < 1:
+            raise ValueError("Job runner needs at least one worker")
+        self.max_workers = max_workers
+        self.max_finished = max_finished
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._futures = {}
+        # key -> id of the most recent job submitted under that key
+        self._by_key = {}
+
+        # Metrics
+        self.submitted = 0
+        self.deduplicated = 0
+
+    def submit(self, fn, kind: str, label: str = "", key: str = None) -> str:
+        """Queue `fn(handle)` and return the job id
+
+        Its return value becomes Job.result. With a `key`, resubmitting while a
+        job with the same key is still queued or running returns that job's id
+        instead of starting a second run (e.g. a double-clicked button).
+        """
+        with self._lock:
+            if key is not None:
+                existing = self._jobs.get(self._by_key.get(key))
+                if existing is not None and not existing.finished:
+                    self.deduplicated += 1
+                    return existing.id
+            job = Job(id=uuid.uuid4().hex[:12], kind=kind, label=label, key=key)
+            self._jobs[job.id] = job
+            if key is not None:
+                self._by_key[key] = job.id
+            self.submitted += 1
+            self._prune()
+            self._futures[job.id] = self._executor.submit(self._run, job.id, fn)
+        return job.id
+
+    def _run(self, job_id: str, fn):
+        with self._lock:
+            job = self._jobs[job_id]
+            if job.cancel_requested:
+                job.status, job.finished_at = CANCELLED, time.time()
+                return
+            job.status, job.started_at = RUNNING, time.time()
+        try:
+            # The job id doubles as the trace run id
+            with trace_run(f"job.{job.kind}", run_id=job_id, label=job.label):
+                result = fn(JobHandle(self, job_id))
+        except JobCancelled:
+            self._finish(job_id, CANCELLED)
+        except Exception as e:
+            self._finish(job_id, FAILED, error=str(e))
+        else:
+            self._finish(job_id, DONE, result=result)
+
+    def _finish(self, job_id: str, status: str, result=None, error: str = None):
+        with self._lock:
+            job = self._jobs[job_id]
+            job.status, job.result, job.error = status, result, error
+            job.finished_at = time.time()
+            if status == DONE:
+                job.progress = 1.0
+            self._futures.pop(job_id, None)
+
+    def _update(self, job_id: str, **changes):
+        with self._lock:
+            job = self._jobs[job_id]
+            for name, value in changes.items():
+                setattr(job, name, value)
+            cancelled = job.cancel_requested
+        if cancelled:
+            raise JobCancelled(f"Job {job_id} was cancelled")
+
+    def _add_result(self, job_id: str, name: str, value):
+        with self._lock:
+            self._jobs[job_id].results[name] = value
+
+    def _cancel_requested(self, job_id: str) -> bool:
+        with self._lock:
+            return self._jobs[job_id].cancel_requested
+
+    def _prune(self):
+        """Drop the oldest finished jobs beyond the retention limits (caller holds the lock)"""
+        now = time.time()
+        finished = sorted((job for job in self._jobs.values() if job.finished), key=lambda job: job.finished_at)
+        excess = len(finished) - self.max_finished
+        for index, job in enumerate(finished):
+            if index < excess or now - job.finished_at > self.retention:
+                del self._jobs[job.id]
+                if self._by_key.get(job.key) == job.id:
+                    del self._by_key[job.key]
+
+    def get(self, job_id: str) -> Job:
+        """Snapshot of a job, or None if the id is unknown or has been pruned"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return replace(job, results=dict(job.results)) if job is not None else None
+
+    def find(self, key: str) -> Job:
+        """Snapshot of the most recent job submitted under `key`, or None"""
+        with self._lock:
+            job_id = self._by_key.get(key)
+        return self.get(job_id) if job_id else None
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job, or ask a running one to stop at its next update; False if already finished"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+            job.cancel_requested = True
+            future = self._futures.get(job_id)
+        if future is not None and future.cancel():
+            self._finish(job_id, CANCELLED)
+        return True
+
+    def stats(self) -> dict:
+        """Return job counts by status and submission counters"""
+        with self._lock:
+            counts = {status: 0 for status in (QUEUED, RUNNING) + FINISHED_STATES}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return {"workers": self.max_workers, "submitted": self.submitted,
+                    "deduplicated": self.deduplicated, **counts}
+
+
+_shared_runner = None
+_shared_runner_lock = threading.Lock()
+
+
+def get_job_runner() -> JobRunner:
+    """Return the process-wide job runner (JOB_WORKERS)"""
+    global _shared_runner
+    with _shared_runner_lock:
+        if _shared_runner is None:
+            _shared_runner = JobRunner(max_workers=int(os.getenv("JOB_WORKERS", "4")))
+        return _shared_runner
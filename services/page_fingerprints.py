@@ -0,0 +1,176 @@
+# services/page_fingerprints.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from services.crawl_cache import normalize_url
+
+
+def content_hash(result: str) -> str:
+    """Hash the page text of a Firecrawl scrape result, ignoring volatile metadata"""
+    try:
+        data = json.loads(result)
+    except ValueError:
+        data = None
+    if isinstance(data, dict):
+        text = data.get("markdown") or data.get("content") or (data.get("data") or {}).get("markdown")
+        if isinstance(text, str):
+            result = text
+    normalized = " ".join(result.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def response_validators(result: str) -> tuple:
+    """(etag, last_modified) from the page metadata of a Firecrawl scrape result, when the site sent them"""
+    try:
+        data = json.loads(result)
+    except ValueError:
+        return None, None
+    metadata = data.get("metadata") if isinstance(data, dict) else None
+    if not isinstance(metadata, dict):
+        metadata = (data.get("data") or {}).get("metadata") if isinstance(data, dict) else None
+    if not isinstance(metadata, dict):
+        return None, None
+    headers = {key.lower().replace("-", "").replace("_", ""): value for key, value in metadata.items()}
+    etag, last_modified = headers.get("etag"), headers.get("lastmodified")
+    return (etag if isinstance(etag, str) else None), (last_modified if isinstance(last_modified, str) else None)
+
+
+class FingerprintStore:
+    """Per-URL fingerprints of crawled pages, kept across runs in SQLite
+
+    Each page records its HTTP validators (ETag / Last-Modified), a hash of its
+    text and the digest the agents were given last time. A refresh first asks
+    the site whether the page changed (conditional HEAD), and only re-fetches
+    through Firecrawl when it did or when the site cannot tell.
+    """
+
+    def __init__(self, db_path: str = ".cache/fingerprints.sqlite3", head_timeout: float = 5.0):
+        self.db_path = db_path
+        self.head_timeout = head_timeout
+        self._lock = threading.Lock()
+
+        # Refresh outcome counters
+        self.unchanged = 0
+        self.unchanged_content = 0
+        self.changed = 0
+        self.new = 0
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT NOT NULL,
+                digest TEXT,
+                fetched_at REAL NOT NULL,
+                checked_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, url: str) -> dict:
+        """Return the stored fingerprint of `url`, or None for a page never fetched"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, content_hash, digest, fetched_at, checked_at FROM pages WHERE url = ?",
+                (normalize_url(url),),
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("etag", "last_modified", "content_hash", "digest", "fetched_at", "checked_at")
+        return dict(zip(keys, row))
+
+    def validators(self, url: str, fingerprint: dict = None) -> tuple:
+        """Conditional HEAD request: (unchanged, etag, last_modified)
+
+        `unchanged` is True when the server confirms the stored validators,
+        False when they differ and None when the site gives no usable answer.
+        """
+        # Imported here: the store is opened by every page, the HEAD check runs only on refreshes
+        import requests
+
+        headers = {}
+        if fingerprint and fingerprint.get("etag"):
+            headers["If-None-Match"] = fingerprint["etag"]
+        if fingerprint and fingerprint.get("last_modified"):
+            headers["If-Modified-Since"] = fingerprint["last_modified"]
+        try:
+            response = requests.head(url if "://" in url else f"https://{url}", headers=headers,
+                                     timeout=self.head_timeout, allow_redirects=True)
+        except requests.RequestException:
+            return None, None, None
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not fingerprint or not headers:
+            return None, etag, last_modified
+        if response.status_code == 304:
+            return True, fingerprint.get("etag"), fingerprint.get("last_modified")
+        if response.status_code >= 400:
+            return None, None, None
+        if etag and fingerprint.get("etag"):
+            return etag == fingerprint["etag"], etag, last_modified
+        if last_modified and fingerprint.get("last_modified"):
+            return last_modified == fingerprint["last_modified"], etag, last_modified
+        return None, etag, last_modified
+
+    def record(self, url: str, page_hash: str, digest: str = None, etag: str = None,
+               last_modified: str = None, fetched: bool = True):
+        """Store the fingerprint after a fetch (fetched=True) or a successful revalidation"""
+        now = time.time()
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT fetched_at, digest FROM pages WHERE url = ?", (normalize_url(url),)
+            ).fetchone()
+            fetched_at = now if fetched or previous is None else previous[0]
+            if digest is None and previous is not None:
+                digest = previous[1]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(url, etag, last_modified, content_hash, digest, fetched_at, checked_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (normalize_url(url), etag, last_modified, page_hash, digest, fetched_at, now),
+            )
+            self._conn.commit()
+
+    def count(self, outcome: str):
+        """Count a refresh outcome: unchanged, unchanged_content, changed or new"""
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self) -> dict:
+        """Return refresh outcome counters and the number of fingerprinted pages"""
+        with self._lock:
+            pages = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            return {
+                "pages": pages,
+                "unchanged": self.unchanged,
+                "unchanged_content": self.unchanged_content,
+                "changed": self.changed,
+                "new": self.new,
+            }
+
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def get_fingerprint_store() -> FingerprintStore:
+    """Return the process-wide page fingerprint store (FINGERPRINT_DB_PATH)"""
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = FingerprintStore(
+                db_path=os.getenv("FINGERPRINT_DB_PATH", ".cache/fingerprints.sqlite3"),
+            )
+        return _shared_store
@@ -1,6 +1,11 @@
 # services/report_generator.py
+import time
 from datetime import datetime
-import streamlit as st
+from services.metrics import histogram
+from services.tracing import span, trace_run
+
+# `format` is the requested report type, `renderer` what produced it (PDF falls back to HTML)
+REPORT_SECONDS = histogram("report_render_seconds", "Report render time", ("format", "renderer"))
 
 class ReportGenerator:
     @staticmethod
@@ -15,25 +20,36 @@ class ReportGenerator:
             metrics_analysis (str): Metrics analysis results
             report_type (str): Type of report to generate ('html' or 'pdf')
         """
-        if report_type.lower() == 'pdf':
-            # Prefer HTML->PDF via WeasyPrint for better styling if available
-            try:
-                return ReportGenerator._generate_pdf_with_weasy(
-                    company_name, competitor_analysis, sentiment_analysis, metrics_analysis
-                )
-            except Exception:
-                # If WeasyPrint isn't available or fails, fall back to ReportLab PDF or HTML
+        start = time.perf_counter()
+        renderer = None
+        with trace_run("report.render", report_type=report_type.lower(), company=company_name) as render_span:
+            if report_type.lower() == 'pdf':
+                # Prefer HTML->PDF via WeasyPrint for better styling if available
                 try:
-                    return ReportGenerator._generate_pdf_report(
-                        company_name, competitor_analysis, sentiment_analysis, metrics_analysis
-                    )
+                    with span("report.weasyprint"):
+                        report = ReportGenerator._generate_pdf_with_weasy(
+                            company_name, competitor_analysis, sentiment_analysis, metrics_analysis
+                        )
+                    renderer = "weasyprint"
                 except Exception:
-                    return ReportGenerator._generate_html_report(
+                    # If WeasyPrint isn't available or fails, fall back to ReportLab PDF or HTML
+                    try:
+                        with span("report.reportlab"):
+                            report = ReportGenerator._generate_pdf_report(
+                                company_name, competitor_analysis, sentiment_analysis, metrics_analysis
+                            )
+                        renderer = "reportlab"
+                    except Exception:
+                        pass
+            if renderer is None:
+                with span("report.html"):
+                    report = ReportGenerator._generate_html_report(
                         company_name, competitor_analysis, sentiment_analysis, metrics_analysis
                     )
-        return ReportGenerator._generate_html_report(
-            company_name, competitor_analysis, sentiment_analysis, metrics_analysis
-        )
+                renderer = "html"
+            render_span.set(renderer=renderer)
+        REPORT_SECONDS.observe(time.perf_counter() - start, format=report_type.lower(), renderer=renderer)
+        return report
         
         report_html = f"""
         <!DOCTYPE html>
@@ -432,16 +448,17 @@ class ReportGenerator:
         data['charts_b64'] = []
 
         # Convert markdown-style section text to safe HTML using markdown2 if available
-        try:
-            import markdown2
-            for sec in data['sections']:
-                raw = sec.get('text') or ''
-                # Convert to HTML and store as 'html'
-                sec['html'] = markdown2.markdown(raw, extras=["fenced-code-blocks", "tables"]) if raw else ''
-        except Exception:
-            # Fallback: escape simple text into paragraphs
-            for sec in data['sections']:
-                sec['html'] = '<p>' + (sec.get('text') or '').replace('\n', '<br/>') + '</p>'
+        with span("report.markdown", sections=len(data['sections'])):
+            try:
+                import markdown2
+                for sec in data['sections']:
+                    raw = sec.get('text') or ''
+                    # Convert to HTML and store as 'html'
+                    sec['html'] = markdown2.markdown(raw, extras=["fenced-code-blocks", "tables"]) if raw else ''
+            except Exception:
+                # Fallback: escape simple text into paragraphs
+                for sec in data['sections']:
+                    sec['html'] = '<p>' + (sec.get('text') or '').replace('\n', '<br/>') + '</p>'
 
         # Render template
         env = Environment(loader=FileSystemLoader(os.path.join(os.getcwd(), 'templates')))
@@ -0,0 +1,280 @@
+# services/report_pipeline.py
+import os
+import time
+from dataclasses import dataclass, field
+from agents.usage import Usage, track_usage
+from services.company_index import register_company
+from services.tracing import span, trace_run
+from services.insight_parser import by_tag, parse_insights, source_counts, source_name, split_metric
+
+# Pipeline mode -> label shown in the UI
+PIPELINE_MODES = {
+    "two_stage": "Two-stage (bullets → report)",
+    "fused": "Fused (single pass)",
+    "local": "Bullets + local report (one LLM call)",
+}
+
+# How pipeline prompts reach an analyst -> label shown in the UI
+DISPATCH_MODES = {
+    "direct": "Straight to the responsible analyst",
+    "team": "Through the team coordinator",
+}
+# PIPELINE_DISPATCH picks the default; the team hop only pays off for free-form prompts
+DEFAULT_DISPATCH = os.getenv("PIPELINE_DISPATCH", "direct")
+
+BULLETS_MARKER = "=== BULLETS ==="
+# Bullets end with their citation so the insight parser can attribute them
+SOURCE_RULE = "• End every bullet with (Source: <URL or site name>)."
+REPORT_MARKER = "=== REPORT ==="
+
+
+@dataclass
+class PipelineRun:
+    """Outcome of one bullets→report pipeline run, with its latency and token usage"""
+    kind: str
+    mode: str
+    company_name: str
+    dispatch: str = "direct"
+    bullets: str = ""
+    report: str = ""
+    seconds: float = 0.0
+    usage: Usage = field(default_factory=Usage)
+
+
+def bullet_prompt(kind: str, company_name: str) -> str:
+    """Prompt for the first stage: tagged insight bullets"""
+    if kind == "competitor":
+        return (
+            f"Generate up to 16 evidence-based insight bullets about {company_name}'s most recent product launches.\n"
+            f"Format requirements:\n"
+            f"• Start every bullet with exactly one tag: Positioning | Strength | Weakness | Learning\n"
+            f"• Follow the tag with a concise statement (max 30 words) referencing concrete observations: messaging, differentiation, pricing, channel selection, timing, engagement metrics, or customer feedback.\n"
+            f"{SOURCE_RULE}"
+        )
+    if kind == "sentiment":
+        return (
+            f"Summarize market sentiment for {company_name} in <=10 bullets. "
+            f"Cover top positive & negative themes with source mentions (G2, Reddit, Twitter, customer reviews).\n"
+            f"• Start every bullet with exactly one tag: Positive | Negative | Neutral\n"
+            f"{SOURCE_RULE}"
+        )
+    if kind == "metrics":
+        return (
+            f"List (max 10 bullets) the most important publicly available KPIs & qualitative signals for {company_name}'s recent product launches. "
+            f"Include engagement stats, press coverage, adoption metrics, and market traction data if available.\n"
+            f"• Start every bullet with exactly one tag: KPI | Signal. Write KPI bullets as `metric name: value`\n"
+            f"{SOURCE_RULE}"
+        )
+    raise ValueError(f"Unknown analysis kind: {kind}")
+
+
+def report_prompt(kind: str, bullet_text: str, company_name: str) -> str:
+    """Prompt for the second stage: turn the bullets into the structured report"""
+    if kind == "competitor":
+        return (
+            f"Transform the insight bullets below into a professional launch review for product managers analysing {company_name}.\n\n"
+            f"Produce well-structured **Markdown** with a mix of tables, call-outs and concise bullet points — avoid long paragraphs.\n\n"
+            f"=== FORMAT SPECIFICATION ===\n"
+            f"# {company_name} – Launch Review\n\n"
+            f"## 1. Market & Product Positioning\n"
+            f"• Bullet point summary of how the product is positioned (max 6 bullets).\n\n"
+            f"## 2. Launch Strengths\n"
+            f"| Strength | Evidence / Rationale |\n|---|---|\n| … | … | (add 4-6 rows)\n\n"
+            f"## 3. Launch Weaknesses\n"
+            f"| Weakness | Evidence / Rationale |\n|---|---|\n| … | … | (add 4-6 rows)\n\n"
+            f"## 4. Strategic Takeaways for Competitors\n"
+            f"1. … (max 5 numbered recommendations)\n\n"
+            f"=== SOURCE BULLETS ===\n{bullet_text}\n\n"
+            f"Guidelines:\n"
+            f"• Populate the tables with specific points derived from the bullets.\n"
+            f"• Only include rows that contain meaningful data; omit any blank entries."
+        )
+    if kind == "sentiment":
+        return (
+            f"Use the tagged bullets below to create a concise market-sentiment brief for **{company_name}**.\n\n"
+            f"### Positive Sentiment\n"
+            f"• List each positive point as a separate bullet (max 6).\n\n"
+            f"### Negative Sentiment\n"
+            f"• List each negative point as a separate bullet (max 6).\n\n"
+            f"### Overall Summary\n"
+            f"Provide a short paragraph (≤120 words) summarising the overall sentiment balance and key drivers.\n\n"
+            f"Tagged Bullets:\n{bullet_text}"
+        )
+    if kind == "metrics":
+        return (
+            f"Convert the KPI bullets below into a launch-performance snapshot for **{company_name}** suitable for an executive dashboard.\n\n"
+            f"## Key Performance Indicators\n"
+            f"| Metric | Value / Detail | Source |\n"
+            f"|---|---|---|\n"
+            f"| … | … | … |  (include one row per KPI)\n\n"
+            f"## Qualitative Signals\n"
+            f"• Bullet list of notable qualitative insights (max 5).\n\n"
+            f"## Summary & Implications\n"
+            f"Brief paragraph (≤120 words) highlighting what the metrics imply about launch success and next steps.\n\n"
+            f"KPI Bullets:\n{bullet_text}"
+        )
+    raise ValueError(f"Unknown analysis kind: {kind}")
+
+
+def fused_prompt(kind: str, company_name: str) -> str:
+    """Single prompt that asks for the bullets and the finished report in one answer"""
+    return (
+        f"Complete both steps below in a single answer.\n\n"
+        f"STEP 1 — research bullets:\n{bullet_prompt(kind, company_name)}\n\n"
+        f"STEP 2 — report built only from your STEP 1 bullets:\n"
+        f"{report_prompt(kind, '(use the bullets you wrote in STEP 1)', company_name)}\n\n"
+        f"Output format: write the line {BULLETS_MARKER}, then the STEP 1 bullets, "
+        f"then the line {REPORT_MARKER}, then the STEP 2 report. Output nothing else."
+    )
+
+
+def split_fused_output(text: str) -> tuple:
+    """Split a fused answer into (bullets, report); unmarked output is treated as the report"""
+    if REPORT_MARKER not in text:
+        return "", text.strip()
+    head, report = text.split(REPORT_MARKER, 1)
+    bullets = head.split(BULLETS_MARKER, 1)[-1]
+    return bullets.strip(), report.strip()
+
+
+def _table(rows: list, header: str) -> str:
+    lines = [header, "|" + "---|" * header.count("|", 1)]
+    for row in rows:
+        lines.append("| " + " | ".join(cell.replace("|", "/") for cell in row) + " |")
+    return "\n".join(lines)
+
+
+def local_report(kind: str, bullet_text: str, company_name: str) -> str:
+    """Build the structured report from tagged bullets without another model call
+
+    Follows the layout of report_prompt(): the parsed insights fill the
+    sections and tables directly, and the summary is computed from their
+    tags and sources.
+    """
+    insights = parse_insights(bullet_text)
+    groups = by_tag(insights)
+    sources = len([name for name in source_counts(insights) if name != "Unattributed"])
+
+    def bullets(tag: str, limit: int, numbered: bool = False) -> str:
+        items = groups.get(tag, [])[:limit]
+        if not items:
+            return "_No insights with this tag in the source bullets._"
+        return "\n".join(
+            f"{f'{index}.' if numbered else '•'} {insight.statement}" for index, insight in enumerate(items, start=1)
+        )
+
+    def evidence_table(tag: str) -> str:
+        items = groups.get(tag, [])[:6]
+        if not items:
+            return "_No insights with this tag in the source bullets._"
+        return _table(
+            [(insight.statement, source_name(insight.source)) for insight in items],
+            f"| {tag} | Evidence / Source |",
+        )
+
+    if kind == "competitor":
+        return (
+            f"# {company_name} – Launch Review\n\n"
+            f"## 1. Market & Product Positioning\n{bullets('Positioning', 6)}\n\n"
+            f"## 2. Launch Strengths\n{evidence_table('Strength')}\n\n"
+            f"## 3. Launch Weaknesses\n{evidence_table('Weakness')}\n\n"
+            f"## 4. Strategic Takeaways for Competitors\n{bullets('Learning', 5, numbered=True)}"
+        )
+    if kind == "sentiment":
+        positive, negative = len(groups.get("Positive", [])), len(groups.get("Negative", []))
+        balance = "mostly positive" if positive > negative else "mostly negative" if negative > positive else "mixed"
+        return (
+            f"### Positive Sentiment\n{bullets('Positive', 6)}\n\n"
+            f"### Negative Sentiment\n{bullets('Negative', 6)}\n\n"
+            f"### Overall Summary\n"
+            f"Sentiment toward **{company_name}** is {balance}: {positive} positive and {negative} negative themes "
+            f"({len(groups.get('Neutral', []))} neutral) drawn from {sources} cited sources."
+        )
+    if kind == "metrics":
+        kpis = groups.get("KPI", [])
+        table = _table(
+            [(*split_metric(insight.statement), source_name(insight.source)) for insight in kpis],
+            "| Metric | Value / Detail | Source |",
+        ) if kpis else "_No KPI bullets in the source data._"
+        return (
+            f"## Key Performance Indicators\n{table}\n\n"
+            f"## Qualitative Signals\n{bullets('Signal', 5)}\n\n"
+            f"## Summary & Implications\n"
+            f"{len(kpis)} KPIs and {len(groups.get('Signal', []))} qualitative signals on {company_name}'s launches, "
+            f"from {sources} cited sources."
+        )
+    raise ValueError(f"Unknown analysis kind: {kind}")
+
+
+def _collect(chunks, on_text=None) -> str:
+    """Join streamed chunks, reporting the text so far to `on_text` after each one"""
+    text = ""
+    for chunk in chunks:
+        text += chunk
+        if on_text:
+            on_text(text)
+    return text
+
+
+def _dispatch(coordinator, kind: str, prompt: str, dispatch: str, force_refresh: bool, stage: str):
+    """Stream a pipeline prompt to the analyst responsible for `kind`, directly or via the team leader"""
+    if dispatch == "team":
+        return coordinator.run_analysis_stream(prompt, force_refresh=force_refresh, stage=stage)
+    role = coordinator.ANALYSES[kind][0]
+    return coordinator.run_member_stream(role, prompt, force_refresh=force_refresh, stage=stage)
+
+
+def run_pipeline(coordinator, kind: str, company_name: str, mode: str = "two_stage",
+                 force_refresh: bool = False, on_text=None, dispatch: str = None) -> PipelineRun:
+    """Produce the structured report for one tab and measure its latency and token usage
+
+    - two_stage: bullets from the analyst, then a second call that expands them
+    - fused: a single call to the analyst that returns bullets and report
+    - local: bullets from the analyst; the report is assembled from the parsed bullets without a model call
+
+    Each call runs on the model routed for its stage ("bullets" / "report").
+    With `dispatch="direct"` (the default, see PIPELINE_DISPATCH) prompts go
+    straight to the analyst responsible for `kind`; "team" routes the bullet
+    and report prompts through the team leader, one extra model round trip
+    per call. Fused prompts always go direct.
+
+    `on_text` receives the accumulated output while it streams.
+    """
+    if mode not in PIPELINE_MODES:
+        raise ValueError(f"Unknown pipeline mode: {mode}")
+    dispatch = dispatch or DEFAULT_DISPATCH
+    if dispatch not in DISPATCH_MODES:
+        raise ValueError(f"Unknown dispatch mode: {dispatch}")
+
+    company_name = register_company(company_name)
+    run = PipelineRun(kind=kind, mode=mode, company_name=company_name, dispatch=dispatch)
+    start = time.perf_counter()
+    with trace_run("pipeline.run", kind=kind, mode=mode, dispatch=dispatch, company=company_name), \
+            track_usage() as usage:
+        if mode == "fused":
+            text = _collect(
+                _dispatch(coordinator, kind, fused_prompt(kind, company_name), "direct", force_refresh, "report"),
+                on_text,
+            )
+            run.bullets, run.report = split_fused_output(text)
+        elif mode == "local":
+            run.bullets = _collect(
+                _dispatch(coordinator, kind, bullet_prompt(kind, company_name), dispatch, force_refresh, "bullets"),
+                on_text,
+            )
+            with span("report.local"):
+                run.report = local_report(kind, run.bullets, company_name)
+        else:
+            run.bullets = _collect(
+                _dispatch(coordinator, kind, bullet_prompt(kind, company_name), dispatch, force_refresh, "bullets"),
+                on_text,
+            )
+            run.report = _collect(
+                _dispatch(
+                    coordinator, kind, report_prompt(kind, run.bullets, company_name), dispatch, force_refresh, "report"
+                ),
+                on_text,
+            )
+    run.seconds = time.perf_counter() - start
+    run.usage = usage
+    return run
@@ -0,0 +1,130 @@
+# services/response_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from services.metrics import counter
+
+CACHE_LOOKUPS = counter("cache_lookups_total", "Response and crawl cache lookups by result (hit, miss, stale)",
+                        ("cache", "result"))
+
+
+class ResponseCache:
+    """Persistent SQLite cache of final LLM responses
+
+    Entries are keyed on everything that determines the answer — agent name,
+    model id, instructions, tool configuration and prompt — expire after `ttl`
+    seconds and are evicted least-recently-used once `max_entries` is exceeded.
+    """
+
+    def __init__(self, db_path: str = ".cache/responses.sqlite3", ttl: float = 7 * 24 * 3600,
+                 max_entries: int = 5000):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                agent_name TEXT,
+                model_id TEXT,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(agent_name: str, model_id: str, description: str, tool_config: str, prompt: str) -> str:
+        """Hash the inputs that fully determine a response into a cache key"""
+        description_hash = hashlib.sha256((description or "").encode("utf-8")).hexdigest()
+        raw = json.dumps([agent_name, model_id, description_hash, tool_config, prompt])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """Return the cached content for `key`, or None on a miss or expired entry"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] < now:
+                self.misses += 1
+                CACHE_LOOKUPS.inc(cache="response", result="miss")
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                return None
+
+            self.hits += 1
+            CACHE_LOOKUPS.inc(cache="response", result="hit")
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row[0]
+
+    def set(self, key: str, content: str, agent_name: str = None, model_id: str = None, ttl: float = None):
+        """Store `content` under `key` and evict the least recently used overflow"""
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, agent_name, model_id, content, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, agent_name, model_id, content, now, expires_at, now),
+            )
+            self._conn.execute("DELETE FROM responses WHERE expires_at < ?", (now,))
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the number of stored responses"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide response cache
+
+    Configured once from RESPONSE_CACHE_PATH, RESPONSE_CACHE_TTL (seconds) and
+    RESPONSE_CACHE_MAX_ENTRIES.
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ResponseCache(
+                db_path=os.getenv("RESPONSE_CACHE_PATH", ".cache/responses.sqlite3"),
+                ttl=float(os.getenv("RESPONSE_CACHE_TTL", 7 * 24 * 3600)),
+                max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 5000)),
+            )
+        return _shared_cache
@@ -0,0 +1,217 @@
+# services/result_store.py
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from services.company_index import company_id
+
+URL_PATTERN = re.compile(r"https?://[^\s)\]>\"'|]+")
+COLUMNS = "id, company, analysis_type, content, model_config, sources, details, created_at"
+
+
+def company_key(company_name: str) -> str:
+    """Key grouping analyses of one company: its id in the company index, so spelling variants share it"""
+    return company_id(company_name)
+
+
+def extract_sources(content: str) -> list:
+    """URLs cited in an analysis, in order of first appearance"""
+    seen = []
+    for url in URL_PATTERN.findall(content or ""):
+        url = url.rstrip(".,;:")
+        if url not in seen:
+            seen.append(url)
+    return seen
+
+
+class ResultStore:
+    """Persistent SQLite history of finished analyses
+
+    Every analysis is stored with its company, type, timestamp, the model
+    configuration that produced it and the sources it cites, so any past
+    result can be reopened without re-running the agents. An analysis
+    identical to the latest stored one for the same company and type only
+    refreshes that entry's timestamp (cached answers do not pile up).
+
+    compact() applies the retention policy: per company and analysis type the
+    newest `keep_per_type` entries are kept, older ones are dropped once they
+    are more than `retention_days` old, and the newest entry is never dropped.
+    """
+
+    def __init__(self, db_path: str = ".cache/results.sqlite3", retention_days: float = 90,
+                 keep_per_type: int = 10, compact_every: int = 100):
+        self.db_path = db_path
+        self.retention_days = retention_days
+        self.keep_per_type = keep_per_type
+        self.compact_every = compact_every
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS analyses (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                company TEXT NOT NULL,
+                company_key TEXT NOT NULL,
+                analysis_type TEXT NOT NULL,
+                content TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                model_config TEXT,
+                sources TEXT,
+                details TEXT,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_analyses_company ON analyses (company_key, analysis_type, created_at)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_created ON analyses (created_at)")
+        self._conn.commit()
+        self._rekey()
+        self.compact()
+
+    def _rekey(self):
+        """Move analyses stored under an older key (or another spelling) to the company's current key"""
+        rows = self._conn.execute("SELECT DISTINCT company_key, company FROM analyses").fetchall()
+        moved = [(company_key(company), key, company) for key, company in rows if company_key(company) != key]
+        if moved:
+            self._conn.executemany("UPDATE analyses SET company_key = ? WHERE company_key = ? AND company = ?", moved)
+            self._conn.commit()
+
+    def save(self, company_name: str, analysis_type: str, content: str, model_config: dict = None,
+             sources: list = None, details: dict = None) -> int:
+        """Record a finished analysis and return its id
+
+        `sources` defaults to the URLs cited in `content`; `details` holds
+        extra fields such as the bullets behind a report.
+        """
+        now = time.time()
+        key = company_key(company_name)
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        with self._lock:
+            latest = self._conn.execute(
+                "SELECT id, content_hash FROM analyses WHERE company_key = ? AND analysis_type = ? "
+                "ORDER BY created_at DESC LIMIT 1",
+                (key, analysis_type),
+            ).fetchone()
+            if latest is not None and latest[1] == digest:
+                self._conn.execute("UPDATE analyses SET created_at = ? WHERE id = ?", (now, latest[0]))
+                self._conn.commit()
+                return latest[0]
+
+            cursor = self._conn.execute(
+                "INSERT INTO analyses "
+                "(company, company_key, analysis_type, content, content_hash, model_config, sources, details, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    " ".join(company_name.split()), key, analysis_type, content, digest,
+                    json.dumps(model_config or {}),
+                    json.dumps(extract_sources(content) if sources is None else sources),
+                    json.dumps(details or {}),
+                    now,
+                ),
+            )
+            self._conn.commit()
+            self._writes += 1
+            due = self._writes % self.compact_every == 0
+        if due:
+            self.compact()
+        return cursor.lastrowid
+
+    @staticmethod
+    def _record(row) -> dict:
+        record = dict(zip(COLUMNS.split(", "), row))
+        for name in ("model_config", "sources", "details"):
+            record[name] = json.loads(record[name]) if record[name] else None
+        return record
+
+    def get(self, result_id: int) -> dict:
+        """Return one stored analysis, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {COLUMNS} FROM analyses WHERE id = ?", (result_id,)
+            ).fetchone()
+        return self._record(row) if row else None
+
+    def latest(self, company_name: str) -> dict:
+        """Newest stored analysis of each type for a company: {analysis_type: record}"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {COLUMNS} FROM analyses WHERE company_key = ? ORDER BY created_at ASC",
+                (company_key(company_name),),
+            ).fetchall()
+        return {record["analysis_type"]: record for record in map(self._record, rows)}
+
+    def history(self, limit: int = 20) -> list:
+        """Most recently analysed companies: dicts with company, last_analyzed and analysis_types"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT company_key, MAX(created_at) AS last, GROUP_CONCAT(DISTINCT analysis_type) "
+                "FROM analyses GROUP BY company_key ORDER BY last DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+            entries = []
+            for key, last, types in rows:
+                company = self._conn.execute(
+                    "SELECT company FROM analyses WHERE company_key = ? ORDER BY created_at DESC LIMIT 1", (key,)
+                ).fetchone()[0]
+                entries.append({"company": company, "last_analyzed": last, "analysis_types": sorted(types.split(","))})
+        return entries
+
+    def compact(self) -> int:
+        """Apply the retention policy and return the number of entries removed"""
+        cutoff = time.time() - self.retention_days * 24 * 3600
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                DELETE FROM analyses WHERE id IN (
+                    SELECT id FROM (
+                        SELECT id, created_at, ROW_NUMBER() OVER (
+                            PARTITION BY company_key, analysis_type ORDER BY created_at DESC
+                        ) AS rank
+                        FROM analyses
+                    ) WHERE rank > ? AND created_at < ?
+                )
+                """,
+                (max(self.keep_per_type, 1), cutoff),
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def stats(self) -> dict:
+        """Return the number of stored analyses and companies"""
+        with self._lock:
+            entries, companies = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT company_key) FROM analyses"
+            ).fetchone()
+            return {"entries": entries, "companies": companies}
+
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def get_result_store() -> ResultStore:
+    """Return the process-wide result store
+
+    Configured once from RESULT_STORE_PATH, RESULT_RETENTION_DAYS and
+    RESULT_KEEP_PER_TYPE.
+    """
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = ResultStore(
+                db_path=os.getenv("RESULT_STORE_PATH", ".cache/results.sqlite3"),
+                retention_days=float(os.getenv("RESULT_RETENTION_DAYS", 90)),
+                keep_per_type=int(os.getenv("RESULT_KEEP_PER_TYPE", 10)),
+            )
+        return _shared_store
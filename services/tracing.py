@@ -0,0 +1,305 @@
+# services/tracing.py
+"""Per-run tracing spans, exported to a local JSONL file and/or an OpenTelemetry collector
+
+    with trace_run("coordinator.analyze", company="OpenAI"):   # starts a run if none is active
+        with span("firecrawl.scrape", url=url) as s:            # no-op outside a run
+            ...
+            s.set(fetched=True)
+
+Every span carries the id of the run it belongs to. Run ids and the current
+span follow contextvars, so they cross asyncio tasks automatically; work handed
+to a thread pool keeps its run when submitted via contextvars.copy_context().run.
+
+    python -m services.tracing [run_id]
+
+prints the time spent per span name for a run (default: the latest one).
+"""
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current_run = ContextVar("trace_run_id", default=None)
+_current_span = ContextVar("trace_span", default=None)
+
+
+def _reset(var: ContextVar, token):
+    try:
+        var.reset(token)
+    except ValueError:
+        # A streaming generator closed from another context (e.g. garbage-collected elsewhere)
+        pass
+
+
+class Span:
+    """One timed operation within a run"""
+
+    def __init__(self, name: str, run_id: str, parent=None, attributes: dict = None):
+        self.name = name
+        self.run_id = run_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent = parent
+        self.attributes = dict(attributes or {})
+        self.start = time.time()
+        self._start_perf = time.perf_counter()
+        self.duration_ms = None
+        self.status = "ok"
+        self.error = None
+        # OpenTelemetry span mirroring this one, when that exporter is active
+        self.otel = None
+
+    def set(self, **attributes):
+        """Attach attributes known only once the work is under way (cache hits, sizes, ...)"""
+        self.attributes.update(attributes)
+
+    def finish(self, error: BaseException = None):
+        self.duration_ms = round((time.perf_counter() - self._start_perf) * 1000, 2)
+        if isinstance(error, GeneratorExit):
+            # A stream the consumer stopped reading
+            self.status = "cancelled"
+        elif error is not None:
+            self.status = "error"
+            self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent else None,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span outside any run, so callers never need to check"""
+
+    def set(self, **attributes):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class JsonlExporter:
+    """Append finished spans to a JSONL file, rotating it to `<path>.1` past `max_bytes`"""
+
+    def __init__(self, path: str = ".cache/traces.jsonl", max_bytes: int = 50 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def start(self, span: Span):
+        pass
+
+    def end(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock:
+            try:
+                if os.path.getsize(self.path) > self.max_bytes:
+                    os.replace(self.path, self.path + ".1")
+            except OSError:
+                pass
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+class OTelExporter:
+    """Mirror spans into OpenTelemetry and ship them to an OTLP/HTTP collector
+
+    Needs the optional opentelemetry-sdk and opentelemetry-exporter-otlp-proto-http packages.
+    """
+
+    def __init__(self, endpoint: str = None, service_name: str = "product-launch-intelligence"):
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+        provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint)))
+        self._trace = trace
+        self._provider = provider
+        self._tracer = provider.get_tracer(__name__)
+
+    @staticmethod
+    def _attributes(span: Span) -> dict:
+        """OpenTelemetry only accepts primitive attribute values"""
+        attributes = {"run.id": span.run_id}
+        for name, value in span.attributes.items():
+            attributes[name] = value if isinstance(value, (str, bool, int, float)) else str(value)
+        return attributes
+
+    def start(self, span: Span):
+        parent = span.parent.otel if span.parent else None
+        context = self._trace.set_span_in_context(parent) if parent is not None else None
+        span.otel = self._tracer.start_span(span.name, context=context, start_time=int(span.start * 1e9))
+
+    def end(self, span: Span):
+        if span.otel is None:
+            return
+        span.otel.set_attributes(self._attributes(span))
+        if span.error:
+            span.otel.set_status(self._trace.Status(self._trace.StatusCode.ERROR, span.error))
+        span.otel.end()
+
+
+class Tracer:
+    """Creates spans and hands them to the exporters; with no exporters tracing is off"""
+
+    def __init__(self, exporters: list = None):
+        self.exporters = list(exporters or [])
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.exporters)
+
+    @contextmanager
+    def _span(self, name: str, run_id: str, attributes: dict):
+        current = _current_span.get()
+        span = Span(name, run_id, parent=current if current and current.run_id == run_id else None,
+                    attributes=attributes)
+        for exporter in self.exporters:
+            exporter.start(span)
+        token = _current_span.set(span)
+        error = None
+        try:
+            yield span
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _reset(_current_span, token)
+            span.finish(error)
+            for exporter in self.exporters:
+                try:
+                    exporter.end(span)
+                except Exception as e:
+                    # Tracing must never fail the traced work
+                    print(f"⚠️  Could not export span {span.name}: {e}")
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Span within the active run; a no-op when tracing is off or no run is active"""
+        run_id = _current_run.get()
+        if not self.enabled or run_id is None:
+            yield NOOP_SPAN
+            return
+        with self._span(name, run_id, attributes) as span:
+            yield span
+
+    @contextmanager
+    def run(self, name: str, run_id: str = None, **attributes):
+        """Span that starts a new run (id `run_id` or a fresh one) unless a run is already active"""
+        if not self.enabled:
+            yield NOOP_SPAN
+            return
+        if _current_run.get() is not None:
+            with self.span(name, **attributes) as span:
+                yield span
+            return
+        token = _current_run.set(run_id or uuid.uuid4().hex[:12])
+        try:
+            with self._span(name, _current_run.get(), attributes) as span:
+                yield span
+        finally:
+            _reset(_current_run, token)
+
+
+def tracer_from_env() -> Tracer:
+    """Tracer configured from TRACING ("jsonl" by default, "otlp", "jsonl,otlp" or "off"),
+    TRACE_FILE, TRACE_MAX_MB, OTEL_EXPORTER_OTLP_TRACES_ENDPOINT and OTEL_SERVICE_NAME"""
+    targets = {t.strip().lower() for t in os.getenv("TRACING", "jsonl").split(",") if t.strip()}
+    exporters = []
+    if "jsonl" in targets:
+        exporters.append(JsonlExporter(
+            os.getenv("TRACE_FILE", ".cache/traces.jsonl"),
+            max_bytes=int(float(os.getenv("TRACE_MAX_MB", 50)) * 1024 * 1024),
+        ))
+    if "otlp" in targets:
+        try:
+            exporters.append(OTelExporter(
+                endpoint=os.getenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT"),
+                service_name=os.getenv("OTEL_SERVICE_NAME", "product-launch-intelligence"),
+            ))
+        except ImportError:
+            print("⚠️  TRACING=otlp needs opentelemetry-sdk and opentelemetry-exporter-otlp-proto-http; "
+                  "spans are not sent to a collector")
+    return Tracer(exporters)
+
+
+_shared_tracer = None
+_shared_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer"""
+    global _shared_tracer
+    with _shared_tracer_lock:
+        if _shared_tracer is None:
+            _shared_tracer = tracer_from_env()
+        return _shared_tracer
+
+
+def span(name: str, **attributes):
+    """Span within the active run (see Tracer.span)"""
+    return get_tracer().span(name, **attributes)
+
+
+def trace_run(name: str, run_id: str = None, **attributes):
+    """Span that starts a run when none is active (see Tracer.run)"""
+    return get_tracer().run(name, run_id=run_id, **attributes)
+
+
+def current_run_id() -> str:
+    return _current_run.get()
+
+
+def annotate(**attributes):
+    """Set attributes on the innermost active span, if any"""
+    current = _current_span.get()
+    if current is not None:
+        current.set(**attributes)
+
+
+def summarize(path: str, run_id: str = None) -> dict:
+    """{span name: (count, total ms, max ms)} for one run of a JSONL trace file (default: the latest run)"""
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                spans.append(json.loads(line))
+            except ValueError:
+                continue
+    if run_id is None and spans:
+        run_id = spans[-1]["run_id"]
+
+    totals = defaultdict(lambda: [0, 0.0, 0.0])
+    for record in spans:
+        if record["run_id"] == run_id:
+            entry = totals[record["name"]]
+            entry[0] += 1
+            entry[1] += record["duration_ms"] or 0
+            entry[2] = max(entry[2], record["duration_ms"] or 0)
+    return {name: tuple(values) for name, values in totals.items()}
+
+
+if __name__ == "__main__":
+    trace_file = os.getenv("TRACE_FILE", ".cache/traces.jsonl")
+    totals = summarize(trace_file, sys.argv[1] if len(sys.argv) > 1 else None)
+    print(f"{'span':<28}{'count':>7}{'total ms':>12}{'max ms':>10}")
+    for name, (count, total, longest) in sorted(totals.items(), key=lambda item: -item[1][1]):
+        print(f"{name:<28}{count:>7}{total:>12.0f}{longest:>10.0f}")
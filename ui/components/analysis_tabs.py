@@ -1,8 +1,11 @@
 # ui/components/analysis_tabs.py
 import streamlit as st
-from ui.components.progress_indicators import ProgressIndicators
 from ui.components.metrics_dashboard import MetricsDashboard
+from ui.components.results_display import ResultsDisplay
 from ui.themes.colors import ColorScheme
+from ui.utils import jobs
+from services.insight_parser import by_tag, parse_insights, source_counts, source_name, split_metric
+from services.job_runner import DONE, FAILED
 
 class AnalysisTabs:
     @staticmethod
@@ -35,13 +38,10 @@ class AnalysisTabs:
             st.caption(f"Strategic positioning insights for **{company_name}**")
         
         with col2:
-            if st.button("🚀 **Run Analysis**", key="run_competitor", use_container_width=True):
-                if system and system.is_ready():
-                    with st.spinner("🤖 Launch Analyst working..."):
-                        ProgressIndicators.render_analysis_progress("competitor")
-                        result = system.analyze_competitor(company_name)
-                        st.session_state.competitor_result = result
-                        st.rerun()
+            run_clicked = st.button("🚀 **Run Analysis**", key="run_competitor", use_container_width=True)
+        
+        if AnalysisTabs._track_analysis(run_clicked, system, "competitor", company_name, "🤖 Launch Analyst working..."):
+            st.rerun()
         
         # Display results with enhanced visualization
         if hasattr(st.session_state, 'competitor_result') and st.session_state.competitor_result:
@@ -57,17 +57,10 @@ class AnalysisTabs:
             st.caption(f"Market perception tracking for **{company_name}**")
         
         with col2:
-            if st.button("📈 **Analyze Sentiment**", key="run_sentiment", use_container_width=True):
-                if system and system.is_ready():
-                    ProgressIndicators.render_analysis_progress("sentiment", [
-                        "📱 Scanning social media...",
-                        "💬 Analyzing customer reviews...",
-                        "🎭 Processing sentiment patterns...",
-                        "📊 Generating sentiment report..."
-                    ])
-                    result = system.analyze_sentiment(company_name)
-                    st.session_state.sentiment_result = result
-                    st.rerun()
+            run_clicked = st.button("📈 **Analyze Sentiment**", key="run_sentiment", use_container_width=True)
+        
+        if AnalysisTabs._track_analysis(run_clicked, system, "sentiment", company_name, "💬 Scanning social media and customer reviews..."):
+            st.rerun()
         
         if hasattr(st.session_state, 'sentiment_result') and st.session_state.sentiment_result:
             AnalysisTabs._display_sentiment_results(st.session_state.sentiment_result, company_name)
@@ -82,112 +75,165 @@ class AnalysisTabs:
             st.caption(f"Launch performance analytics for **{company_name}**")
         
         with col2:
-            if st.button("📊 **Analyze Metrics**", key="run_metrics", use_container_width=True):
-                if system and system.is_ready():
-                    ProgressIndicators.render_analysis_progress("metrics", [
-                        "🔢 Gathering performance data...",
-                        "📈 Calculating KPIs...",
-                        "📊 Building metrics dashboard...",
-                        "🎯 Generating insights..."
-                    ])
-                    result = system.analyze_metrics(company_name)
-                    st.session_state.metrics_result = result
-                    st.rerun()
+            run_clicked = st.button("📊 **Analyze Metrics**", key="run_metrics", use_container_width=True)
+        
+        if AnalysisTabs._track_analysis(run_clicked, system, "metrics", company_name, "🔢 Gathering performance data..."):
+            st.rerun()
         
         if hasattr(st.session_state, 'metrics_result') and st.session_state.metrics_result:
             AnalysisTabs._display_metrics_results(st.session_state.metrics_result, company_name)
     
+    @staticmethod
+    def _track_analysis(run_clicked: bool, system, analysis_type: str, company_name: str, status: str) -> bool:
+        """Start the analysis as a background job and render its live output
+
+        The analyst streams into the job, not into this script run, so reruns
+        and navigation do not interrupt it; each rerun shows the text written
+        so far. Returns True when the job has just finished and its result was
+        stored in session state.
+        """
+        force_refresh = st.session_state.get('force_refresh', False)
+        key = jobs.job_key(analysis_type, company_name, force_refresh, system)
+        if run_clicked and system and system.is_ready():
+            jobs.submit(
+                analysis_type,
+                AnalysisTabs._analysis_job(system, analysis_type, company_name, force_refresh),
+                key,
+                label=status,
+            )
+
+        job = jobs.current(analysis_type, key)
+        if job is None:
+            return False
+        if not job.finished:
+            st.info(f"**{job.label}**")
+            st.markdown(job.partial + " ▌")
+            return False
+        if not jobs.consume(job):
+            return False
+        if job.status == DONE:
+            st.session_state[f"{analysis_type}_result"] = job.result
+            return True
+        if job.status == FAILED:
+            st.error(f"❌ Analysis failed: {job.error}")
+        return False
+
+    @staticmethod
+    def _analysis_job(system, analysis_type: str, company_name: str, force_refresh: bool):
+        """Background work that streams one analyst's answer into the job"""
+        def work(handle):
+            text = ""
+            for chunk in system.analyze_stream(analysis_type, company_name, force_refresh=force_refresh):
+                text += chunk
+                handle.update(partial=text)
+            return text
+
+        return work
+
+    @staticmethod
+    def _insight_list(insights: list, empty: str) -> str:
+        """Markdown bullet list of insight statements with their sources"""
+        if not insights:
+            return f"_{empty}_"
+        return "\n".join(
+            f"- {insight.statement}" + (f" _({source_name(insight.source)})_" if insight.source else "")
+            for insight in insights
+        )
+
     @staticmethod
     def _display_competitor_results(result: str, company_name: str):
         """Display competitor results with enhanced visualization"""
         st.markdown("---")
         st.markdown(f"### 📋 {company_name} - Competitive Intelligence Report")
-        
+
+        insights = parse_insights(result)
+        groups = by_tag(insights)
+
         # Executive summary card
         with st.expander("🎯 **Executive Summary**", expanded=True):
-            st.success("""
-            **Key Findings:**
-            - Strong market positioning with innovative features
-            - Successful launch strategy with 85% positive reception
-            - Areas for improvement in customer support scalability
+            counts = ", ".join(
+                f"{len(groups.get(tag, []))} {label}"
+                for tag, label in (("Positioning", "positioning"), ("Strength", "strengths"),
+                                   ("Weakness", "weaknesses"), ("Learning", "learnings"))
+            )
+            st.success(f"""
+            **Key Findings:** {len(insights)} insights ({counts}) from {len(source_counts(insights))} sources
+            {AnalysisTabs._insight_list(groups.get("Positioning", [])[:3], "No positioning insights tagged.")}
             """)
-        
+
         # Strategic insights in columns
         col1, col2 = st.columns(2)
-        
+
         with col1:
             st.markdown("#### 💪 **Strengths**")
-            st.markdown("""
-            - Innovative product features
-            - Strong brand recognition  
-            - Effective pricing strategy
-            - Excellent market timing
-            """)
-        
+            st.markdown(AnalysisTabs._insight_list(groups.get("Strength", [])[:6], "No strengths tagged."))
+
         with col2:
             st.markdown("#### ⚠️ **Areas for Improvement**")
-            st.markdown("""
-            - Customer support scalability
-            - International market penetration
-            - Competitive response strategy
-            - Feature differentiation
-            """)
-        
+            st.markdown(AnalysisTabs._insight_list(groups.get("Weakness", [])[:6], "No weaknesses tagged."))
+
+        MetricsDashboard.render_tag_chart(insights)
+
         # Full analysis report
         st.markdown("#### 📊 **Detailed Analysis**")
         st.markdown(result)
-    
+
+        with st.expander("🧭 **Interactive Breakdown**"):
+            ResultsDisplay.render_analysis_result("competitor", result, company_name)
+
     @staticmethod
     def _display_sentiment_results(result: str, company_name: str):
         """Display sentiment results with charts"""
         st.markdown("---")
         st.markdown(f"### 💬 {company_name} - Sentiment Analysis Report")
-        
+
+        insights = parse_insights(result)
+        groups = by_tag(insights)
+
         # Sentiment metrics dashboard
-        MetricsDashboard.render_metrics_overview({})
-        MetricsDashboard.render_sentiment_chart({})
-        
+        MetricsDashboard.render_metrics_overview(insights, "sentiment")
+        MetricsDashboard.render_sentiment_chart(insights)
+
         # Sentiment breakdown
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.metric("Positive Sentiment", "85%", "+12%")
-            st.progress(0.85)
-        
-        with col2:
-            st.metric("Negative Sentiment", "8%", "-3%") 
-            st.progress(0.08)
-        
-        with col3:
-            st.metric("Neutral Sentiment", "7%", "-9%")
-            st.progress(0.07)
-        
+        polar = sum(len(groups.get(tag, [])) for tag in ("Positive", "Negative", "Neutral"))
+        columns = st.columns(3)
+        for column, tag in zip(columns, ("Positive", "Negative", "Neutral")):
+            share = len(groups.get(tag, [])) / polar if polar else 0.0
+            with column:
+                st.metric(f"{tag} Sentiment", f"{share:.0%}", f"{len(groups.get(tag, []))} themes", delta_color="off")
+                st.progress(share)
+
         st.markdown("#### 📝 **Detailed Sentiment Analysis**")
         st.markdown(result)
-    
+
+        with st.expander("🧭 **Interactive Breakdown**"):
+            ResultsDisplay.render_analysis_result("sentiment", result, company_name)
+
     @staticmethod
     def _display_metrics_results(result: str, company_name: str):
         """Display metrics results with interactive dashboard"""
         st.markdown("---")
         st.markdown(f"### 📊 {company_name} - Performance Metrics Report")
-        
+
+        insights = parse_insights(result)
+
         # Interactive metrics dashboard
-        MetricsDashboard.render_metrics_overview({})
-        
-        # Performance indicators grid
+        MetricsDashboard.render_metrics_overview(insights, "metrics")
+
+        # Performance indicators grid, straight from the KPI bullets / table rows
         st.subheader("🎯 Key Performance Indicators")
-        
-        kpi_cols = st.columns(4)
-        kpis = [
-            ("User Growth", "40%", "+15%"),
-            ("Revenue Impact", "$2.3M", "+45%"),
-            ("Market Share", "18%", "+5%"), 
-            ("Customer Satisfaction", "4.5/5", "+0.3")
-        ]
-        
-        for idx, (label, value, delta) in enumerate(kpis):
-            with kpi_cols[idx]:
-                st.metric(label, value, delta)
-        
+
+        kpis = [split_metric(insight.statement) for insight in by_tag(insights).get("KPI", [])][:8]
+        if kpis:
+            kpi_cols = st.columns(4)
+            for idx, (label, value) in enumerate(kpis):
+                with kpi_cols[idx % 4]:
+                    st.metric(label, value or "—")
+        else:
+            st.caption("No KPI-tagged bullets found in this analysis.")
+
         st.markdown("#### 📈 **Detailed Metrics Analysis**")
-        st.markdown(result)
\ No newline at end of file
+        st.markdown(result)
+
+        with st.expander("🧭 **Interactive Breakdown**"):
+            ResultsDisplay.render_analysis_result("metrics", result, company_name)
@@ -1,58 +1,80 @@
 # ui/components/metrics_dashboard.py
 import streamlit as st
-import plotly.graph_objects as go
-import plotly.express as px
+from services.insight_parser import by_tag, source_counts, source_name, split_metric
+
+SENTIMENT_COLORS = {"Positive": "#4ECDC4", "Negative": "#FF6B6B", "Neutral": "#45B7D1"}
 
 class MetricsDashboard:
     @staticmethod
-    def render_metrics_overview(analysis_data: dict):
-        """Render interactive metrics dashboard"""
+    def render_metrics_overview(insights: list, analysis_type: str):
+        """Render headline counts derived from the parsed insights, with cards for `analysis_type`"""
         st.subheader("📊 Launch Performance Dashboard")
-        
+        groups = by_tag(insights)
+        sources = [name for name in source_counts(insights) if name != "Unattributed"]
+
+        cards = [("🧩 Insights", len(insights)), ("🔗 Sources Cited", len(sources))]
+        if analysis_type == "sentiment":
+            polar = sum(len(groups.get(tag, [])) for tag in SENTIMENT_COLORS)
+            if polar:
+                cards.append(("💬 Positive Share", f"{len(groups.get('Positive', [])) / polar:.0%}"))
+        elif analysis_type == "competitor":
+            cards.append(("💪 Strengths vs Weaknesses",
+                          f"{len(groups.get('Strength', []))} / {len(groups.get('Weakness', []))}"))
+        elif analysis_type == "metrics":
+            kpis = groups.get("KPI", [])
+            cards.append(("🎯 KPIs Reported", len(kpis)))
+            cards.append(("🔢 KPIs with Figures", sum(1 for insight in kpis if split_metric(insight.statement)[1])))
+
         # Key metrics in columns
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.metric(
-                label="🎯 Market Position", 
-                value="Leader", 
-                delta="Strong"
-            )
-        
-        with col2:
-            st.metric(
-                label="💬 Sentiment Score", 
-                value="85%", 
-                delta="+12%"
-            )
-        
-        with col3:
-            st.metric(
-                label="📈 Adoption Rate", 
-                value="40%", 
-                delta="+15%"
-            )
-        
-        with col4:
-            st.metric(
-                label="🌟 Media Coverage", 
-                value="156", 
-                delta="+45"
-            )
-    
+        for column, (label, value) in zip(st.columns(len(cards)), cards):
+            with column:
+                st.metric(label=label, value=value)
+
     @staticmethod
-    def render_sentiment_chart(sentiment_data: dict):
-        """Render sentiment analysis chart"""
+    def render_sentiment_chart(insights: list):
+        """Render positive / negative / neutral insight counts per cited source"""
+        counts = {}
+        for insight in insights:
+            if insight.tag in SENTIMENT_COLORS:
+                per_source = counts.setdefault(source_name(insight.source), {})
+                per_source[insight.tag] = per_source.get(insight.tag, 0) + 1
+        if not counts:
+            st.caption("No sentiment-tagged bullets to chart.")
+            return
+
+        # Imported on the first chart rather than at app start
+        import plotly.graph_objects as go
+
+        platforms = list(counts)
         fig = go.Figure(data=[
-            go.Bar(name='Positive', x=['Twitter', 'Reddit', 'Reviews'], y=[65, 70, 80], marker_color='#4ECDC4'),
-            go.Bar(name='Negative', x=['Twitter', 'Reddit', 'Reviews'], y=[15, 20, 10], marker_color='#FF6B6B'),
-            go.Bar(name='Neutral', x=['Twitter', 'Reddit', 'Reviews'], y=[20, 10, 10], marker_color='#45B7D1')
+            go.Bar(name=tag, x=platforms, y=[counts[p].get(tag, 0) for p in platforms], marker_color=color)
+            for tag, color in SENTIMENT_COLORS.items()
         ])
-        
+
         fig.update_layout(
-            title="Sentiment Analysis Across Platforms",
+            title="Sentiment Analysis Across Sources",
             barmode='stack',
             height=300
         )
-        
-        st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+
+        st.plotly_chart(fig, use_container_width=True)
+
+    @staticmethod
+    def render_tag_chart(insights: list, title: str = "Insights by Tag"):
+        """Render how many insights carry each tag"""
+        groups = by_tag(insight for insight in insights if insight.tag)
+        if not groups:
+            st.caption("No tagged bullets to chart.")
+            return
+
+        import plotly.express as px
+
+        fig = px.bar(
+            x=list(groups),
+            y=[len(items) for items in groups.values()],
+            labels={"x": "Tag", "y": "Insights"},
+            color=list(groups),
+            title=title,
+        )
+        fig.update_layout(showlegend=False, height=300)
+        st.plotly_chart(fig, use_container_width=True)
@@ -1,6 +1,9 @@
 # ui/components/sidebar.py
 import streamlit as st
+import html
 import os
+from datetime import datetime
+from services.result_store import get_result_store
 from ui.themes.colors import ColorScheme
 
 class Sidebar:
@@ -159,11 +162,16 @@ class Sidebar:
     
     @staticmethod
     def _render_analysis_history():
-        """Render recent analysis history"""
-        if hasattr(st.session_state, 'analysis_history') and st.session_state.analysis_history:
-            st.markdown("### 📚 Recent Analysis")
-            
-            for company, timestamp in st.session_state.analysis_history[-3:]:
+        """Render past analyses from the result store; opening one restores it without re-running"""
+        entries = get_result_store().history(limit=10)
+        if not entries:
+            return
+
+        st.markdown("### 📚 Analysis History")
+        for index, entry in enumerate(entries):
+            timestamp = datetime.fromtimestamp(entry["last_analyzed"]).strftime("%Y-%m-%d %H:%M")
+            col1, col2 = st.columns([3, 1])
+            with col1:
                 st.markdown(f"""
                 <div style='
                     padding: 0.5rem;
@@ -172,7 +180,28 @@ class Sidebar:
                     margin: 0.2rem 0;
                     font-size: 0.9em;
                 '>
-                    <strong>{company}</strong><br>
-                    <small>{timestamp}</small>
+                    <strong>{html.escape(entry["company"])}</strong><br>
+                    <small>{timestamp} · {", ".join(entry["analysis_types"])}</small>
                 </div>
-                """, unsafe_allow_html=True)
\ No newline at end of file
+                """, unsafe_allow_html=True)
+            with col2:
+                st.button(
+                    "📂",
+                    key=f"reopen_{index}",
+                    help=f"Open the stored analysis of {entry['company']}",
+                    on_click=Sidebar._reopen_analysis,
+                    args=(entry["company"],),
+                )
+
+    @staticmethod
+    def _reopen_analysis(company_name: str):
+        """Load the newest stored result of each analysis type for a company into the session"""
+        records = get_result_store().latest(company_name)
+        for analysis_type in ("competitor", "sentiment", "metrics"):
+            record = records.get(analysis_type)
+            st.session_state[f"{analysis_type}_result"] = record["content"] if record else None
+        st.session_state.company_name = company_name
+        st.session_state.company_input_main = company_name
+        st.session_state.report_cache_pdf = None
+        st.session_state.report_cache_html = None
+        st.session_state.last_report_company = company_name
@@ -0,0 +1,66 @@
+# ui/utils/jobs.py
+import hashlib
+import os
+import time
+import streamlit as st
+from services.company_index import company_id
+from services.job_runner import get_job_runner
+
+# Seconds between reruns while a background job is still running
+POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+
+
+def job_key(slot: str, company_name: str, force_refresh: bool = False, coordinator=None) -> str:
+    """Key identifying the same piece of work across reruns and sessions
+
+    The key includes a hash of the coordinator's API keys, so a session only
+    picks up jobs started with the same credentials, never another user's.
+    """
+    credentials = f"{getattr(coordinator, 'google_api_key', '')}:{getattr(coordinator, 'firecrawl_api_key', '')}"
+    owner = hashlib.sha256(credentials.encode("utf-8")).hexdigest()[:16]
+    return f"{slot}:{owner}:{company_id(company_name)}:{int(force_refresh)}"
+
+
+def submit(slot: str, fn, key: str, label: str = "") -> str:
+    """Start `fn(handle)` in the background and remember its id for this session"""
+    job_id = get_job_runner().submit(fn, kind=slot, label=label, key=key)
+    st.session_state.setdefault("analysis_jobs", {})[slot] = job_id
+    return job_id
+
+
+def current(slot: str, key: str = None):
+    """Latest job for `slot` in this session, else the latest one submitted under `key`
+
+    The key fallback lets a reloaded page or a new session with the same API
+    keys pick up work that was started before the disconnect.
+    """
+    runner = get_job_runner()
+    job_id = st.session_state.get("analysis_jobs", {}).get(slot)
+    job = runner.get(job_id) if job_id else None
+    if key is not None and (job is None or job.key != key):
+        job = runner.find(key)
+        if job is not None:
+            st.session_state.setdefault("analysis_jobs", {})[slot] = job.id
+    return job
+
+
+def consume(job) -> bool:
+    """True the first time this session sees `job` finished, so results are applied only once"""
+    seen = st.session_state.setdefault("consumed_jobs", set())
+    if job is None or not job.finished or job.id in seen:
+        return False
+    seen.add(job.id)
+    return True
+
+
+def poll_active():
+    """Rerun the script shortly while any of this session's jobs is still queued or running
+
+    Call at the very end of the script so the whole page renders before the pause.
+    """
+    runner = get_job_runner()
+    for job_id in st.session_state.get("analysis_jobs", {}).values():
+        job = runner.get(job_id)
+        if job is not None and not job.finished:
+            time.sleep(POLL_INTERVAL)
+            st.rerun()
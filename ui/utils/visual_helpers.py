@@ -1,6 +1,4 @@
 # ui/utils/visual_helpers.py
-import requests
-from PIL import Image, ImageDraw, ImageFont
 import io
 import streamlit as st
 import random
@@ -9,6 +7,10 @@ class VisualHelpers:
     @staticmethod
     def get_company_logo(company_name: str, size: int = 100):
         """Fetch or generate company logo"""
+        # requests and PIL load on first use; most reruns never draw a logo
+        import requests
+        from PIL import Image
+
         try:
             # Try Clearbit API
             logo_url = f"https://logo.clearbit.com/{company_name.lower().replace(' ', '')}.com"
@@ -26,6 +28,8 @@ class VisualHelpers:
     @staticmethod
     def _generate_avatar(company_name: str, size: int = 100):
         """Generate a colorful avatar with company initial"""
+        from PIL import Image, ImageDraw, ImageFont
+
         colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD']
         color = colors[hash(company_name) % len(colors)]
         